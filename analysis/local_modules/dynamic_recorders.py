@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+''' Recorders that store the results of dynamic analyses in NumPy arrays
+instead of appending them to Python lists from a callbackRecord string
+(which is evaluated for every node at every time step).
+
+NodeQuantityRecorder reads the values of the nodes into a preallocated
+array (XC gives the values node by node, so the nodes are read with a
+single map call and converted to an array in one step).
+NodeArrayRecorder stores the whole time history in a preallocated (or
+memory-mapped) array, EnvelopeRecorder keeps only the running peak
+values (memory proportional to the number of nodes or elements, not to
+the number of steps).
+
+Usage: create the recorder once the model is built and call its
+record method after each call to analysis.analyze(1, dt).
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Luis C. Pérez Tato (LCPT) and Ana Ortega (AOO)"
+__copyright__= "Copyright 2026, LCPT and AOO"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "l.pereztato@gmail.com"
+
+import sys
+import operator
+import numpy as np
+from misc_utils import log_messages as lmsg
+
+# Node methods that return each of the recordable quantities.
+nodeQuantityGetters= {'disp':'getDisp', 'vel':'getVel', 'accel':'getAccel', 'reaction':'getReaction'}
+
+class NodeQuantityRecorder(object):
+    ''' Base class for the recorders of node DOF quantities.
+
+    :ivar nodes: nodes to record.
+    :ivar quantity: quantity to record ('disp', 'vel', 'accel' or
+                    'reaction'; reactions must be computed by the
+                    solution procedure or by calling
+                    domain.calculateNodalReactions before recording).
+    :ivar dofs: indexes of the degrees of freedom to record.
+    '''
+    def __init__(self, nodes, quantity= 'disp', dofs= None):
+        ''' Constructor.
+
+        :param nodes: nodes to record.
+        :param quantity: quantity to record ('disp', 'vel', 'accel' or
+                         'reaction').
+        :param dofs: indexes of the degrees of freedom to record (if None,
+                     the first one).
+        '''
+        if(quantity not in nodeQuantityGetters):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            raise ValueError(className+'.'+methodName+"; unknown quantity: '"+str(quantity)+"'. Candidates are: "+str(list(nodeQuantityGetters.keys())))
+        self.nodes= list(nodes)
+        self.quantity= quantity
+        self.getterName= nodeQuantityGetters[quantity]
+        self.getter= operator.attrgetter(self.getterName)
+        self.dofs= list(dofs) if dofs is not None else [0]
+        self.values= np.empty(self.getShape())
+        self.step= 0 # number of recorded steps.
+
+    def getShape(self):
+        ''' Return the shape of the values recorded in each step
+            (number of nodes, number of DOFs).'''
+        return (len(self.nodes), len(self.dofs))
+
+    def getCurrentTime(self):
+        ''' Return the current time of the domain.'''
+        return self.nodes[0].getDomain.getTimeTracker.getCurrentTime
+
+    def getValues(self):
+        ''' Return the current values of the recorded quantity in an array
+            with shape (number of nodes, number of DOFs). The array is
+            overwritten in the next call (copy it to keep the values).'''
+        nodeValues= np.array(list(map(self.getter, self.nodes)), dtype= float)
+        np.take(nodeValues, self.dofs, axis= 1, out= self.values)
+        return self.values
+
+    def record(self):
+        ''' Record the current values.'''
+        self.step+= 1
+
+class NodeArrayRecorder(NodeQuantityRecorder):
+    ''' Write the chosen node DOF quantities straight into a preallocated
+        NumPy buffer (or a memory-mapped .npy file) with shape
+        (number of steps, number of nodes, number of DOFs). Optionally
+        keeps the running maximum and minimum of the values.
+
+    :ivar numSteps: number of steps to record.
+    :ivar times: time of each recorded step.
+    :ivar buffer: recorded values (None if storeHistory is False).
+    :ivar maxValues: running maximum of the values (if computeExtremes is
+                     True).
+    :ivar minValues: running minimum of the values (if computeExtremes is
+                     True).
+    '''
+    def __init__(self, nodes, quantity= 'disp', dofs= None, numSteps= 1, fileName= None, storeHistory= True, computeExtremes= False):
+        ''' Constructor.
+
+        :param nodes: nodes to record.
+        :param quantity: quantity to record ('disp', 'vel', 'accel' or
+                         'reaction').
+        :param dofs: indexes of the degrees of freedom to record (if None,
+                     the first one).
+        :param numSteps: number of steps to record.
+        :param fileName: if not None, name of the .npy file used to store
+                         the buffer (memory-mapped).
+        :param storeHistory: if False, don't store the time history (only
+                             the running extremes are kept).
+        :param computeExtremes: if True, keep the running maximum and minimum
+                                of the values.
+        '''
+        super(NodeArrayRecorder,self).__init__(nodes= nodes, quantity= quantity, dofs= dofs)
+        if(not storeHistory and not computeExtremes):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            raise ValueError(className+'.'+methodName+'; nothing to record (storeHistory and computeExtremes are False).')
+        self.numSteps= numSteps
+        self.times= np.zeros(numSteps)
+        shape= (numSteps,)+self.getShape()
+        self.buffer= None
+        if(storeHistory):
+            if(fileName):
+                self.buffer= np.lib.format.open_memmap(fileName, mode= 'w+', dtype= float, shape= shape)
+            else:
+                self.buffer= np.zeros(shape)
+        self.maxValues= None
+        self.minValues= None
+        if(computeExtremes):
+            self.maxValues= np.full(self.getShape(), -np.inf)
+            self.minValues= np.full(self.getShape(), np.inf)
+
+    def record(self):
+        ''' Record the current values.'''
+        if(self.step>=self.numSteps):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            raise IndexError(className+'.'+methodName+'; buffer full ('+str(self.numSteps)+' steps).')
+        values= self.getValues()
+        self.times[self.step]= self.getCurrentTime()
+        if(self.buffer is not None):
+            self.buffer[self.step]= values
+        if(self.maxValues is not None):
+            np.maximum(self.maxValues, values, out= self.maxValues)
+            np.minimum(self.minValues, values, out= self.minValues)
+        super(NodeArrayRecorder,self).record()
+
+    def getHistory(self):
+        ''' Return the values recorded so far (array with shape
+            (number of recorded steps, number of nodes, number of DOFs)).'''
+        if(self.buffer is None):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            lmsg.error(className+'.'+methodName+'; time history not stored (storeHistory= False).')
+            return None
+        return self.buffer[:self.step]
+
+    def getAbsMaxValues(self):
+        ''' Return the maximum absolute values (array with shape
+            (number of nodes, number of DOFs)).'''
+        if(self.maxValues is not None):
+            retval= np.maximum(np.abs(self.maxValues), np.abs(self.minValues))
+        else:
+            retval= np.max(np.abs(self.getHistory()), axis= 0)
+        return retval
+
+    def flush(self):
+        ''' Write the buffer to disk (if memory-mapped).'''
+        if(hasattr(self.buffer, 'flush')):
+            self.buffer.flush()
+
+class ElementQuantityRecorder(object):
+    ''' Source of element quantities for the recorders.
+
+    :ivar elements: elements to record.
+    :ivar valuesFunction: function that returns the list of values
+                          to record for the element passed as argument
+                          (e.g. lambda e: [e.getN1, e.getN2]). Remember
+                          that the internal forces of the elements are
+                          updated when their resisting force is computed.
+    :ivar numComponents: number of values returned by valuesFunction.
+    '''
+    def __init__(self, elements, valuesFunction, numComponents= 1):
+        ''' Constructor.
+
+        :param elements: elements to record.
+        :param valuesFunction: function that returns the list of values
+                               to record for the element passed as argument.
+        :param numComponents: number of values returned by valuesFunction.
+        '''
+        self.elements= list(elements)
+        self.valuesFunction= valuesFunction
+        self.numComponents= numComponents
+        self.step= 0 # number of recorded steps.
+
+    def getShape(self):
+        ''' Return the shape of the values recorded in each step
+            (number of elements, number of components).'''
+        return (len(self.elements), self.numComponents)
+
+    def getCurrentTime(self):
+        ''' Return the current time of the domain.'''
+        return self.elements[0].getDomain.getTimeTracker.getCurrentTime
+
+    def getValues(self):
+        ''' Return the current values of the recorded quantity in an array
+            with shape (number of elements, number of components).'''
+        retval= np.empty(self.getShape())
+        for i, e in enumerate(self.elements):
+            retval[i]= self.valuesFunction(e)
+        return retval
+
+    def record(self):
+        ''' Record the current values.'''
+        self.step+= 1
+
+class EnvelopeRecorder(object):
+    ''' Keep only the running envelope of a node or element quantity: peak
+        absolute value, time of the peak, maximum, minimum and
+        (optionally) root mean square value. The memory used is
+        proportional to the number of nodes or elements, not to the number
+        of steps.
+
+    :ivar source: NodeQuantityRecorder or ElementQuantityRecorder that
+                  provides the values.
+    :ivar baseAcceleration: if not None, ground acceleration added to the
+                            recorded values to obtain absolute values
+                            (relative accelerations of a uniform excitation
+                            analysis). It can be a sequence with the ground
+                            acceleration of each recorded step or a
+                            function of time.
+    :ivar baseComponents: indexes of the components to which the
+                          base acceleration is added.
+    :ivar computeRMS: if True, compute the root mean square values.
+    :ivar peakValues: running peak absolute values.
+    :ivar peakTimes: time of the peak absolute values.
+    :ivar maxValues: running maximum values.
+    :ivar minValues: running minimum values.
+    '''
+    def __init__(self, source, baseAcceleration= None, baseComponents= None, computeRMS= False):
+        ''' Constructor.
+
+        :param source: NodeQuantityRecorder or ElementQuantityRecorder that
+                       provides the values.
+        :param baseAcceleration: ground acceleration to add to the recorded 
+                                 values (sequence with the value of each
+                                 step or function of time). If None, the
+                                 values are recorded as they are.
+        :param baseComponents: indexes of the components to which the 
+                               base acceleration is added (if None, the
+                               first one).
+        :param computeRMS: if True, compute the root mean square values.
+        '''
+        self.source= source
+        self.baseAcceleration= baseAcceleration
+        self.baseComponents= list(baseComponents) if baseComponents is not None else [0]
+        self.computeRMS= computeRMS
+        shape= source.getShape()
+        self.peakValues= np.zeros(shape)
+        self.peakTimes= np.zeros(shape)
+        self.maxValues= np.full(shape, -np.inf)
+        self.minValues= np.full(shape, np.inf)
+        self.sumSquares= np.zeros(shape) if computeRMS else None
+        self.step= 0 # number of recorded steps.
+
+    def getBaseAcceleration(self, time):
+        ''' Return the ground acceleration at the current step.
+
+        :param time: current time.
+        '''
+        if(callable(self.baseAcceleration)):
+            retval= self.baseAcceleration(time)
+        else:
+            retval= self.baseAcceleration[self.step]
+        return retval
+
+    def record(self):
+        ''' Update the envelope with the current values.'''
+        values= self.source.getValues()
+        time= self.source.getCurrentTime()
+        if(self.baseAcceleration is not None):
+            values[:, self.baseComponents]+= self.getBaseAcceleration(time)
+        absValues= np.abs(values)
+        newPeak= absValues>self.peakValues
+        self.peakValues[newPeak]= absValues[newPeak]
+        self.peakTimes[newPeak]= time
+        np.maximum(self.maxValues, values, out= self.maxValues)
+        np.minimum(self.minValues, values, out= self.minValues)
+        if(self.sumSquares is not None):
+            self.sumSquares+= values**2
+        self.step+= 1
+
+    def getRMSValues(self):
+        ''' Return the root mean square of the values recorded so far.'''
+        if(self.sumSquares is None):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            lmsg.error(className+'.'+methodName+'; RMS values not computed (computeRMS= False).')
+            return None
+        return np.sqrt(self.sumSquares/max(self.step, 1))
@@ -16,48 +16,58 @@ from materials import typical_materials
 from solution import predefined_solutions
 import matplotlib.pyplot as plt
 
-def analyze_SDOF(period, damping_ratio):
-    
-    # natural frequency
-    omega = (2*np.pi)/period
-    # stiffness
-    k = omega**2
-    # Damping
-    c = 2*damping_ratio*omega
-    
+def analyze_SDOFs(periods, damping_ratios, timeValues, accelerationValues, dt= 0.02):
+    ''' Compute the response of the SDOF systems corresponding to each
+        pair (damping ratio, period) subjected to the given ground
+        acceleration. All the oscillators are uncoupled ZeroLength elements
+        of the same model (as in xc_gen_response_spectrum.py), so a single
+        FE problem and a single time integration serve the whole grid.
+
+    :param periods: natural periods of the oscillators.
+    :param damping_ratios: damping ratios of the oscillators.
+    :param timeValues: time values of the accelerogram.
+    :param accelerationValues: ground acceleration values.
+    :param dt: time integration step.
+    :returns: dictionary containing the time histories of the relative 
+              displacement ('D'), velocity ('V') and acceleration ('A')
+              of the oscillators (arrays with shape: 
+              (number of steps, number of damping ratios, number of periods))
+              and their maximum absolute values ('SD', 'SV', 'SA' and
+              'absSA') with shape (number of damping ratios, number of 
+              periods).
+    '''
     # Model Definition
     feProblem= xc.FEProblem()
     preprocessor=  feProblem.getPreprocessor
     nodeHandler= preprocessor.getNodeHandler
     modelSpace= predefined_spaces.SolidMechanics1D(nodeHandler)
-
-    n1= modelSpace.newNode(0.0)
-    n2= modelSpace.newNode(0.0)
-    matElast= typical_materials.defElasticMaterial(preprocessor, name= "matElast", E= k)
-    modelSpace.setDefaultMaterial(matElast)
     modelSpace.setElementDimension(1)
-    zl= modelSpace.newElement('ZeroLength', [n1.tag, n2.tag])
-
-    # unit mass is assumed
-    n2.mass= xc.Matrix([[1.0]])  # node mass matrix.
-
-    # Rayleigh damping factors.
-    alphaM= c # factor applied to elements or nodes mass matrix
-    betaK= 0.0 # factor applied to elements current stiffness matrix.
-    betaKinit= 0.0 # factor applied to elements initial stiffness matrix.
-    betaKcomm= 0.0 # factor applied to elements committed stiffness matrix.
-    rayleigh= xc.RayleighDampingFactors(alphaM, betaK, betaKinit, betaKcomm)
-    # print('damping factors: ', rayleigh)
-    # preprocessor.getDomain.setRayleighDampingFactors(rayleigh)
-    #zl.setRayleighDampingFactors(rayleigh)
-    #zl.setUseRayleighDampingFlag(1) # Compute the element damping matrix
-                                    # from its damping coefficients.
-    n2.setRayleighDampingFactor(alphaM)
-
-    modelSpace.fixNode0(n1.tag)
+
+    oscillatorNodes= list()
+    for i, damping_ratio in enumerate(damping_ratios):
+        for j, period in enumerate(periods):
+            # natural frequency
+            omega = (2*np.pi)/period
+            # stiffness
+            k = omega**2
+            # Damping
+            c = 2*damping_ratio*omega
+
+            n1= modelSpace.newNode(0.0)
+            n2= modelSpace.newNode(0.0)
+            matElast= typical_materials.defElasticMaterial(preprocessor, name= 'matElast_'+str(i)+'_'+str(j), E= k)
+            modelSpace.setDefaultMaterial(matElast)
+            modelSpace.newElement('ZeroLength', [n1.tag, n2.tag])
+
+            # unit mass is assumed
+            n2.mass= xc.Matrix([[1.0]])  # node mass matrix.
+            # Rayleigh damping factor applied to the node mass matrix.
+            n2.setRayleighDampingFactor(c)
+
+            modelSpace.fixNode0(n1.tag)
+            oscillatorNodes.append(n2)
 
     ## Loading
-    dt= 0.02
     # loads definition
     loadHandler= preprocessor.getLoadHandler
     lPatterns= loadHandler.getLoadPatterns
@@ -65,12 +75,9 @@ def analyze_SDOF(period, damping_ratio):
     gm= lPatterns.newLoadPattern("uniform_excitation","gm")
     mr= gm.motionRecord
     hist= mr.history
-    timeValues= el_centro_raw[:,0]
-    accelerationValues= list(el_centro_raw[:,1]*g)
-    #velocityValues=[acc/omega for acc in accelerationValues]
 
     accel= lPatterns.newTimeSeries("path_ts","accel")
-    accel.path= xc.Vector(accelerationValues)
+    accel.path= xc.Vector(list(accelerationValues))
     accel.timeIncr= timeValues[1]-timeValues[0] 
     hist.accel= accel
     hist.delta= dt # Time integration step.
@@ -81,22 +88,31 @@ def analyze_SDOF(period, damping_ratio):
     solProc= predefined_solutions.PlainLinearNewmark(feProblem, numSteps= 1, timeStep= dt, constraintHandlerType= 'transformation', maxNumIter= 10, printFlag= 0)
     solProc.setup()
     analysis= solProc.getAnalysis()
-    
-    results= {'D':[],'V':[], 'A':[],'absA':[]}
-    for i in range(len(timeValues)):
+
+    # Preallocated time histories.
+    numSteps= len(timeValues)
+    numOscillators= len(oscillatorNodes)
+    D= np.empty((numSteps, numOscillators))
+    V= np.empty((numSteps, numOscillators))
+    A= np.empty((numSteps, numOscillators))
+    for i in range(numSteps):
         analysis.analyze(1, dt)
-        results['D'].append(n2.getDisp[0])
-        results['V'].append(n2.getVel[0])
-        results['A'].append(n2.getAccel[0])    
-    # Maximum value of relative displacement ('SD') , velocity ('SV') and acceleration ('SA') for the considered period
-    # Maximum value of the absolute acceleration 'absSA', for which the ground acceleration is added to the time-history calculated accelerations for the oscillator correponding to the period.
-    results['absA']=[results['A'][i]+accelerationValues[i] for i in range(len(accelerationValues))]
-    return {'SD': np.max(np.abs(results['D'])),
-            'SV': np.max(np.abs(results['V'])),
-            'SA': np.max(np.abs(results['A'])),
-            'absSA': np.max(np.abs(results['absA'])),
-            
-            
+        D[i]= [n.getDisp[0] for n in oscillatorNodes]
+        V[i]= [n.getVel[0] for n in oscillatorNodes]
+        A[i]= [n.getAccel[0] for n in oscillatorNodes]
+    shape= (numSteps, len(damping_ratios), len(periods))
+    D= D.reshape(shape)
+    V= V.reshape(shape)
+    A= A.reshape(shape)
+    # Absolute acceleration: the ground acceleration is added to the
+    # time-history calculated accelerations of the oscillators.
+    absA= A+np.asarray(accelerationValues)[:numSteps, None, None]
+    # Maximum value of relative displacement ('SD') , velocity ('SV') and acceleration ('SA') for each period and damping ratio.
+    return {'D': D, 'V': V, 'A': A,
+            'SD': np.max(np.abs(D), axis= 0),
+            'SV': np.max(np.abs(V), axis= 0),
+            'SA': np.max(np.abs(A), axis= 0),
+            'absSA': np.max(np.abs(absA), axis= 0)
             }
 
 silent= False
@@ -126,20 +142,19 @@ s= 1.0
 # Gravitational constant
 g= 981*cm/s**2
 
-# Use nested loops to analyse the system for various damping ratios and periods.
+# Analyse the system for all the damping ratios and periods at once.
+timeValues= el_centro_raw[:,0]
+accelerationValues= el_centro_raw[:,1]*g
+periods= np.arange(T_min, T_max, dT)
+SR= analyze_SDOFs(periods, zeta_list, timeValues, accelerationValues)
 data_frame = dict()
 
-for z in zeta_list:    
-    # re-initialization
-    resp = {'T':[0],'SD':[0], 'SV':[0], 'SA':[0], 'absSA':[0]}
-    
-    for T in np.arange(T_min, T_max, dT):
-        SR = analyze_SDOF(T, z)
-        resp['SD'].append(SR['SD'])
-        resp['SV'].append(SR['SV'])
-        resp['SA'].append(SR['SA'])
-        resp['absSA'].append(SR['absSA'])
-        resp['T'].append(T)
+for i, z in enumerate(zeta_list):    
+    resp = {'T':[0]+list(periods),
+            'SD':[0]+list(SR['SD'][i]),
+            'SV':[0]+list(SR['SV'][i]),
+            'SA':[0]+list(SR['SA'][i]),
+            'absSA':[0]+list(SR['absSA'][i])}
     # Appending keys and values dynamically
     data_frame[z] = resp
     if(not silent):
@@ -21,6 +21,12 @@ from materials import typical_materials
 from solution import predefined_solutions
 from misc_utils import log_messages as lmsg
 
+# import local modules
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../local_modules'))
+import dynamic_recorders as dr
+
 solve= True
 # Data
 goundAccSeriesFile= './LOR_20110511_164726.acc' # file containinig the ground acceleration values. 
@@ -84,7 +90,7 @@ for T in periods:
     matElast= typical_materials.defElasticMaterial(preprocessor= prep, name= "matElast"+str(T), E= K)
     elements.defaultMaterial= matElast.name
     el=elements.newElement("ZeroLength",xc.ID([n1.tag,n2.tag]))
-    caseDct[T]={'elem':el,'n2Tag':n2.tag,'K':K}
+    caseDct[T]={'elem':el,'n2Tag':n2.tag,'node':n2,'K':K}
     Klist.append((T,K))
 
 # loads definition
@@ -105,37 +111,30 @@ lPatterns.addToDomain(gm.name)
 
 ## Dynamic analysis.
 # Define RECORDERS
-
-nodeTags= list()
-cAccel= dict()
-
-for T in periods:
-    nTag= caseDct[T]['n2Tag']
-    nodeTags.append(nTag)
-    cAccel[nTag]= list()
-    
-recAccel= prep.getDomain.newRecorder("node_prop_recorder",None)
-recAccel.setNodes(xc.ID(nodeTags))
-recAccel.callbackRecord= "cAccel[self.tag].append((self.getDomain.getTimeTracker.getCurrentTime,self.getAccel[0]))"
-
+# The accelerations of the oscillators are written in a preallocated
+# array with shape (number of steps, number of nodes, number of DOFs)
+# (pass fileName to store it in a memory-mapped .npy file).
+numSteps= len(timeVals)
+oscillatorNodes= [caseDct[T]['node'] for T in periods]
+recAccel= dr.NodeArrayRecorder(nodes= oscillatorNodes, quantity= 'accel', dofs= [0], numSteps= numSteps)
 
 prep.getDomain.setTime(timeVals[0])
-solProc= predefined_solutions.PlainNewmarkNewtonRaphson(feProblem, numSteps= len(timeVals), timeStep= timeStep, convergenceTestTol= 1e-6, maxNumIter= 10, printFlag= 0)
+solProc= predefined_solutions.PlainNewmarkNewtonRaphson(feProblem, numSteps= 1, timeStep= timeStep, convergenceTestTol= 1e-6, maxNumIter= 10, printFlag= 0)
 if(solve):
-    result= solProc.solve()
-    if(result!=0):
-        lmsg.error('Dynamic analysis failed.')
-        quit()
-    for T in periods:
-        max_acc=0
-        nTag=caseDct[T]['n2Tag']
-        resAcc=cAccel[nTag]
-        # add ground acceleration to results to obtain the absolute acceleration
-        totalAcc=[resAcc[i][1]+grAccelVals[i] for i in range(len(resAcc))]
-        nodeAbsAcc=[abs(res) for res in  totalAcc]
-        maxAccel= max(nodeAbsAcc)
+    solProc.setup()
+    analysis= solProc.getAnalysis()
+    for i in range(numSteps):
+        result= analysis.analyze(1, timeStep)
+        if(result!=0):
+            lmsg.error('Dynamic analysis failed.')
+            quit()
+        recAccel.record()
+    resAcc= recAccel.getHistory()[:,:,0]
+    # add ground acceleration to results to obtain the absolute acceleration
+    totalAcc= resAcc+np.array(grAccelVals[:len(resAcc)])[:,None]
+    maxAccelPeriods= np.max(np.abs(totalAcc), axis= 0)
+    for T, maxAccel in zip(periods, maxAccelPeriods):
         caseDct[T]['maxAccel']= maxAccel
-    maxAccelPeriods=[caseDct[T]['maxAccel'] for T in periods]
 
 # 5. Visualización
 # Plot accelerogram
@@ -173,10 +172,7 @@ if(solve):
     # Plot time-history accelerations for each period
     for i in range(0,len(periods),10):
         T=periods[i] # period for the graphic
-        nTag=caseDct[T]['n2Tag']
-        resAcc=cAccel[nTag]
-        nodeAbsAcc=[abs(res[1]) for res in  resAcc]
-        nodeAcc=[res[1] for res in  resAcc]
+        nodeAcc= resAcc[:,i]
         plt.figure(figsize=(20, 5))
         plt.plot(timeVals, nodeAcc)
         plt.title('Time-history accelerations for period T='+str(T)+' s')
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+''' Compare the response spectra computed with the FFT convolution back end
+of spectral_matching.sdof_response_spectra with those obtained with the
+exact piecewise-linear recursion (Nigam & Jennings, 1969), which is used
+as reference.
+'''
+
+import sys
+import time
+import numpy as np
+import spectral_matching as sm
+
+silent= False
+# Check if silent execution has been requested.
+argv= sys.argv
+if(len(argv)>1):
+    if 'silent' in argv[1:]:
+        silent= True
+
+# Long synthetic record: 60 s at 200 Hz.
+dt= 0.005
+t, acc= sm.generate_seed_motion(duration= 60.0, dt= dt, seed= 42)
+periods= np.concatenate(([0.0], sm.make_period_grid(t_min= 0.02, t_max= 10.0, n= 40)))
+zetas= np.array([0.02, 0.05, 0.10])
+
+# Reference: exact recursion.
+t0= time.time()
+refSa, refSv, refSd= sm.sdof_response_spectra(acc, dt, periods, zetas, method= 'recursion')
+t1= time.time()
+# FFT convolution.
+Sa, Sv, Sd= sm.sdof_response_spectra(acc, dt, periods, zetas, method= 'fft')
+t2= time.time()
+# Automatic choice.
+autoMethod= sm.select_spectrum_method(len(acc), len(periods)*len(zetas))
+autoSa, autoSv, autoSd= sm.sdof_response_spectra(acc, dt, periods, zetas, method= 'auto')
+
+# Check results (maximum relative error).
+err= 0.0
+for values, refValues in [(Sa, refSa), (Sv, refSv), (Sd, refSd), (autoSa, refSa), (autoSv, refSv), (autoSd, refSd)]:
+    err= max(err, np.max(np.abs(values-refValues)/np.maximum(np.abs(refValues), 1e-12)))
+
+if(not silent):
+    print('recursion time: ', t1-t0, 's')
+    print('FFT time: ', t2-t1, 's')
+    print('method chosen by auto: ', autoMethod)
+    print('max. relative error: ', err)
+
+import os
+from misc_utils import log_messages as lmsg
+fname= os.path.basename(__file__)
+if err<1e-9:
+    print('test '+fname+': ok.')
+else:
+    lmsg.error(fname+' ERROR.')
@@ -25,6 +25,11 @@ USAGE
         --seed-csv my_seed_accel.csv --seed-dt 0.005 \
         --out-prefix results/site1
 
+    # Generate a suite of motions (one per RNG seed) in parallel:
+    python generate_spectrum_compatible_motion.py \
+        --target-csv my_target_spectrum.csv \
+        --suite-seeds 42 25 10 --out-prefix results/motion
+
 Outputs (written next to --out-prefix):
     <prefix>_acc.csv        time, acceleration (matched motion)
     <prefix>_vel.csv        time, velocity
@@ -68,10 +73,27 @@ def get_argument_parser():
                         "(often oscillates instead of converging).")
     retval.add_argument("--tol", type=float, default=0.03,
                    help="Convergence tolerance on max relative spectral misfit.")
+    retval.add_argument("--adaptive", action="store_true",
+                   help="Keep the converged periods frozen and recompute only the oscillators "
+                        "whose FFT bins were scaled (with a full-spectrum check at convergence; "
+                        "faster with --spectrum-method fft).")
+    retval.add_argument("--spectrum-method", type=str, default="recursion",
+                   choices=["recursion", "fft", "auto"],
+                   help="Response spectrum back end: exact time-stepping recursion (reference), "
+                        "FFT convolution (faster for long records and few periods) or auto.")
     retval.add_argument("--random-seed", type=int, default=42,
                    help="RNG seed for synthetic seed motion generation (reproducibility).")
     retval.add_argument("--out-prefix", type=str, default="output/motion",
                    help="Path prefix for output files (directories created as needed).")
+    retval.add_argument("--suite-seeds", type=int, nargs="+", default=None,
+                   help="Generate a suite of motions, one for each of the given RNG seeds, "
+                        "matched in parallel. Motion i is written with prefix "
+                        "<out-prefix>i/<name>i and a manifest in <out-prefix>_suite.json.")
+    retval.add_argument("--no-csv", action="store_true",
+                   help="In suite mode, write only the binary suite container "
+                        "(<out-prefix>_suite.npz), not the CSV files of each motion.")
+    retval.add_argument("--num-processes", type=int, default=None,
+                   help="Number of worker processes for --suite-seeds (default: number of CPUs).")
     return retval
 
 def getSpectralMatchingFromArgs(args):
@@ -79,7 +101,7 @@ def getSpectralMatchingFromArgs(args):
 
     :param args: arguments extracted from the command line.
     '''
-    return sm.SpectralMatching(demo= args.demo, targetCSV= args.target_csv, seedCSV= args.seed_csv, seedDt= args.seed_dt, duration= args.duration, timeStep= args.dt, dampingRatio= args.damping, maxIter= args.max_iter, relaxation= args.relaxation, tol= args.tol, outputPrefix= args.out_prefix)
+    return sm.SpectralMatching(demo= args.demo, targetCSV= args.target_csv, seedCSV= args.seed_csv, seedDt= args.seed_dt, duration= args.duration, timeStep= args.dt, dampingRatio= args.damping, maxIter= args.max_iter, relaxation= args.relaxation, tol= args.tol, outputPrefix= args.out_prefix, spectrumMethod= args.spectrum_method, adaptive= args.adaptive)
     
 
 def main():
@@ -88,6 +110,13 @@ def main():
     args= p.parse_args()
     spectralMatching= getSpectralMatchingFromArgs(args)
 
+    if args.suite_seeds:
+        results= spectralMatching.getSpectralMatchingSuite(seeds= args.suite_seeds, numProcesses= args.num_processes, writeCSV= not args.no_csv)
+        for seed, result in zip(args.suite_seeds, results):
+            print(f"Seed {seed}: iterations: {len(result.history_misfit)}, final misfit: {result.getFinalMisfit():.4f}")
+        print(f"Suite written in: {args.out_prefix}_suite.npz (manifest: {args.out_prefix}_suite.json)")
+        return
+
     result= spectralMatching.getSpectralMatchingMotion(randomSeed= args.random_seed)
     pga = result.getPGA()
     pgv = result.getPGV()
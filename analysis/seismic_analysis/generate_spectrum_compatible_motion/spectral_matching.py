@@ -46,6 +46,7 @@ __email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
 
 import os
 import sys
+import time
 import numpy as np
 from dataclasses import dataclass, field
 from misc_utils import log_messages as lmsg
@@ -54,7 +55,262 @@ from misc_utils import log_messages as lmsg
 # 1. Exact piecewise-linear SDOF response (Nigam & Jennings recursion)
 # --------------------------------------------------------------------------
 
-def sdof_response_spectrum(acc, dt, periods, zeta=0.05):
+def nigam_jennings_coefficients(wn, zeta, dt):
+    '''
+    Return the coefficients of the exact piecewise-linear recursion
+    (Nigam & Jennings, 1969) for oscillators with natural circular
+    frequencies `wn` and damping ratios `zeta`:
+
+        u_{i+1} = A*u_i + B*v_i + C*p_i + D*p_{i+1}
+        v_{i+1} = Ap*u_i + Bp*v_i + Cp*p_i + Dp*p_{i+1}
+
+    :param wn: natural circular frequencies (rad/s), scalar or ndarray.
+    :param zeta: damping ratios, scalar or ndarray broadcastable with wn.
+    :param dt: time step (s).
+    :returns: A, B, C, D, Ap, Bp, Cp, Dp (same shape as wn*zeta).
+    '''
+    wd = wn * np.sqrt(1.0 - zeta ** 2)
+    w2 = wn ** 2
+
+    ewt = np.exp(-zeta * wn * dt)
+    cwd = np.cos(wd * dt)
+    swd = np.sin(wd * dt)
+
+    A = ewt * (zeta / np.sqrt(1 - zeta ** 2) * swd + cwd)
+    B = ewt * (swd / wd)
+    C = (1.0 / w2) * (
+        (2 * zeta / (wn * dt)) +
+        ewt * (
+            ((1 - 2 * zeta ** 2) / (wd * dt) - zeta / np.sqrt(1 - zeta ** 2))
+            * swd
+            - (1 + 2 * zeta / (wn * dt)) * cwd
+        )
+    )
+    D = (1.0 / w2) * (
+        1 - (2 * zeta / (wn * dt)) +
+        ewt * (
+            ((2 * zeta ** 2 - 1) / (wd * dt)) * swd
+            + (2 * zeta / (wn * dt)) * cwd
+        )
+    )
+    Ap = -ewt * ((wn / np.sqrt(1 - zeta ** 2)) * swd)
+    Bp = ewt * (cwd - (zeta / np.sqrt(1 - zeta ** 2)) * swd)
+    Cp = (1.0 / w2) * (
+        -1.0 / dt
+        + ewt * (
+            ((wn / np.sqrt(1 - zeta ** 2)) + (zeta / (dt * np.sqrt(1 - zeta ** 2)))) * swd
+            + (1.0 / dt) * cwd
+        )
+    )
+    Dp = (1.0 / (w2 * dt)) * (1 - ewt * (cwd + (zeta / np.sqrt(1 - zeta ** 2)) * swd))
+    return A, B, C, D, Ap, Bp, Cp, Dp
+
+
+def sdof_response_spectra(acc, dt, periods, zetas=0.05, method='recursion'):
+    '''
+    Batched version of `sdof_response_spectrum`: all the oscillators of
+    the (damping ratio x period) grid are advanced at once as arrays, so a
+    single loop over the time samples serves the whole period grid and
+    every damping ratio. The arithmetic is the same, operation by
+    operation, as in the one-oscillator-at-a-time recursion, so the
+    results are identical to those of the scalar loop.
+
+    :param acc: ndarray
+        Ground acceleration time history.
+    :param dt: float
+        Time step (s).
+    :param periods: ndarray
+        Natural periods (s) at which to evaluate the spectrum. T=0 is
+        handled as a special case (Sa = PGA).
+    :param zetas: float or ndarray
+        Damping ratio(s) (default 5%).
+    :param method: str
+        'recursion' (time-stepping recursion, the reference solution),
+        'fft' (FFT convolution, see `sdof_response_spectra_fft`) or
+        'auto' (pick the faster one, see `select_spectrum_method`).
+
+    :returns: Sa, Sv, Sd: ndarrays with shape (len(zetas), len(periods)).
+    '''
+    acc = np.asarray(acc, dtype=float)
+    n = len(acc)
+    periods = np.asarray(periods, dtype=float)
+    zetas = np.atleast_1d(np.asarray(zetas, dtype=float))
+    if method == 'auto':
+        method = select_spectrum_method(n, len(periods) * len(zetas))
+    if method == 'fft':
+        return sdof_response_spectra_fft(acc, dt, periods, zetas)
+    elif method != 'recursion':
+        methodName= sys._getframe(0).f_code.co_name
+        lmsg.error(methodName+"; unknown method: '"+str(method)+"'.")
+        sys.exit(1)
+    shape = (len(zetas), len(periods))
+    Sa = np.zeros(shape)
+    Sv = np.zeros(shape)
+    Sd = np.zeros(shape)
+
+    pga = np.max(np.abs(acc))
+    Sa[:, periods <= 1e-8] = pga
+
+    # Flatten the (damping, period) grid of the non-trivial oscillators.
+    k_dyn = np.nonzero(periods > 1e-8)[0]
+    if len(k_dyn) == 0:
+        return Sa, Sv, Sd
+    zeta = np.repeat(zetas, len(k_dyn))
+    wn = np.tile(2.0 * np.pi / periods[k_dyn], len(zetas))
+    A, B, C, D, Ap, Bp, Cp, Dp = nigam_jennings_coefficients(wn, zeta, dt)
+
+    u = np.zeros_like(wn)
+    v = np.zeros_like(wn)
+    umax = np.zeros_like(wn)
+    vmax = np.zeros_like(wn)
+    p = -acc
+    for i in range(n - 1):
+        p1 = p[i]
+        p2 = p[i + 1]
+        u_new = A * u + B * v + C * p1 + D * p2
+        v_new = Ap * u + Bp * v + Cp * p1 + Dp * p2
+        u, v = u_new, v_new
+        np.maximum(umax, np.abs(u), out=umax)
+        np.maximum(vmax, np.abs(v), out=vmax)
+
+    umax = umax.reshape(len(zetas), len(k_dyn))
+    vmax = vmax.reshape(len(zetas), len(k_dyn))
+    Sd[:, k_dyn] = umax
+    Sv[:, k_dyn] = vmax
+    Sa[:, k_dyn] = umax * wn.reshape(len(zetas), len(k_dyn)) ** 2  # pseudo-spectral acceleration = wn^2 * Sd
+    return Sa, Sv, Sd
+
+
+def impulse_response_fft_size(n):
+    '''
+    Return the FFT length used to convolve a record of `n` samples with
+    an impulse response of the same length without wrap-around (next
+    power of two >= 2n-1).
+    '''
+    return 1 << int(np.ceil(np.log2(max(2 * n - 1, 2))))
+
+
+def select_spectrum_method(n, num_oscillators):
+    '''
+    Return the faster response spectrum back end ('recursion' or 'fft')
+    for a record of `n` samples and `num_oscillators` oscillators.
+
+    The cost of the batched recursion is dominated by the interpreted
+    loop over the time samples (roughly proportional to n, almost
+    independent of the number of oscillators), while the cost of the FFT
+    convolution grows as num_oscillators * nfft * log(nfft). The constants
+    below have been calibrated on a typical workstation.
+
+    :param n: number of samples of the record.
+    :param num_oscillators: number of (period, damping) pairs.
+    '''
+    nfft = impulse_response_fft_size(n)
+    recursion_cost = n * (1.0 + 0.002 * num_oscillators)
+    fft_cost = 4e-4 * num_oscillators * nfft * np.log2(nfft)
+    return 'fft' if fft_cost < recursion_cost else 'recursion'
+
+
+def sdof_response_spectra_fft(acc, dt, periods, zetas=0.05, chunk_size=None):
+    '''
+    Frequency-domain back end of `sdof_response_spectra`: the response of
+    each oscillator is obtained by FFT convolution of the ground
+    acceleration with the discrete impulse response of the exact
+    piecewise-linear recursion (Nigam & Jennings, 1969). Since the
+    recursion is a linear time-invariant system, the convolution
+    reproduces its response up to floating-point round-off (no extra
+    discretization error is introduced) and the cost no longer depends on
+    an interpreted loop over the time samples, which makes it the
+    faster choice for long records.
+
+    The state of the recursion after k steps of free vibration is
+    M^k = expm(F*k*dt), with F the state matrix of the oscillator, so the
+    impulse responses are evaluated in closed form for all the lags at
+    once.
+
+    :param acc: ndarray
+        Ground acceleration time history.
+    :param dt: float
+        Time step (s).
+    :param periods: ndarray
+        Natural periods (s) at which to evaluate the spectrum. T=0 is
+        handled as a special case (Sa = PGA).
+    :param zetas: float or ndarray
+        Damping ratio(s) (default 5%).
+    :param chunk_size: int
+        Number of oscillators convolved at once (limits the memory used
+        by the 2-D FFT arrays). If None, it is chosen so each chunk
+        holds about 2^24 complex values.
+
+    :returns: Sa, Sv, Sd: ndarrays with shape (len(zetas), len(periods)).
+    '''
+    acc = np.asarray(acc, dtype=float)
+    n = len(acc)
+    periods = np.asarray(periods, dtype=float)
+    zetas = np.atleast_1d(np.asarray(zetas, dtype=float))
+    shape = (len(zetas), len(periods))
+    Sa = np.zeros(shape)
+    Sv = np.zeros(shape)
+    Sd = np.zeros(shape)
+
+    pga = np.max(np.abs(acc))
+    Sa[:, periods <= 1e-8] = pga
+
+    k_dyn = np.nonzero(periods > 1e-8)[0]
+    if len(k_dyn) == 0 or n < 2:
+        return Sa, Sv, Sd
+    zeta = np.repeat(zetas, len(k_dyn))
+    wn = np.tile(2.0 * np.pi / periods[k_dyn], len(zetas))
+    _, _, C, D, _, _, Cp, Dp = nigam_jennings_coefficients(wn, zeta, dt)
+
+    nfft = impulse_response_fft_size(n)
+    p = -acc
+    P = np.fft.rfft(p, n=nfft)
+    lags = np.arange(n) * dt
+    if chunk_size is None:
+        chunk_size = max(1, (1 << 24) // nfft)
+
+    umax = np.zeros_like(wn)
+    vmax = np.zeros_like(wn)
+    for start in range(0, len(wn), chunk_size):
+        sl = slice(start, start + chunk_size)
+        w = wn[sl, None]
+        z = zeta[sl, None]
+        wd = w * np.sqrt(1.0 - z ** 2)
+        # free vibration matrix M^k = expm(F*k*dt) for every lag k.
+        e = np.exp(-z * w * lags)
+        c = np.cos(wd * lags)
+        sn = np.sin(wd * lags)
+        M00 = e * (c + (z * w / wd) * sn)
+        M01 = e * (sn / wd)
+        M10 = -e * (w ** 2 / wd) * sn
+        M11 = e * (c - (z * w / wd) * sn)
+        # response to p_j (through C, Cp) and p_{j+1} (through D, Dp).
+        gc_u = M00 * C[sl, None] + M01 * Cp[sl, None]
+        gd_u = M00 * D[sl, None] + M01 * Dp[sl, None]
+        gc_v = M10 * C[sl, None] + M11 * Cp[sl, None]
+        gd_v = M10 * D[sl, None] + M11 * Dp[sl, None]
+        # impulse response: h(0) = gd(0), h(m) = gc(m-1) + gd(m)
+        h_u = gd_u
+        h_u[:, 1:] += gc_u[:, :-1]
+        h_v = gd_v
+        h_v[:, 1:] += gc_v[:, :-1]
+        u = np.fft.irfft(np.fft.rfft(h_u, n=nfft, axis=1) * P, n=nfft, axis=1)[:, :n]
+        v = np.fft.irfft(np.fft.rfft(h_v, n=nfft, axis=1) * P, n=nfft, axis=1)[:, :n]
+        # the recursion starts at rest: p_0 only acts through C, Cp.
+        u -= (M00 * D[sl, None] + M01 * Dp[sl, None]) * p[0]
+        v -= (M10 * D[sl, None] + M11 * Dp[sl, None]) * p[0]
+        umax[sl] = np.max(np.abs(u[:, 1:]), axis=1)
+        vmax[sl] = np.max(np.abs(v[:, 1:]), axis=1)
+
+    umax = umax.reshape(len(zetas), len(k_dyn))
+    vmax = vmax.reshape(len(zetas), len(k_dyn))
+    Sd[:, k_dyn] = umax
+    Sv[:, k_dyn] = vmax
+    Sa[:, k_dyn] = umax * wn.reshape(len(zetas), len(k_dyn)) ** 2  # pseudo-spectral acceleration = wn^2 * Sd
+    return Sa, Sv, Sd
+
+
+def sdof_response_spectrum(acc, dt, periods, zeta=0.05, method='recursion'):
     '''
     Compute pseudo-spectral acceleration (Sa), spectral velocity (Sv),
     spectral displacement (Sd) for a suite of SDOF oscillators subjected
@@ -62,6 +318,8 @@ def sdof_response_spectrum(acc, dt, periods, zeta=0.05):
     recursive solution (assumes ground acceleration varies linearly
     between samples -- exact for that assumption, no time-step error).
 
+    All the periods are advanced together by `sdof_response_spectra`.
+
     :param acc: ndarray
         Ground acceleration time history (same units as g or m/s^2 -- be
         consistent; output Sa will be in the same units).
@@ -72,85 +330,14 @@ def sdof_response_spectrum(acc, dt, periods, zeta=0.05):
         handled as a special case (Sa = PGA).
     :param zeta: float
         Damping ratio (default 5%).
+    :param method: str
+        'recursion' (default, reference solution), 'fft' or 'auto' (see
+        `sdof_response_spectra`).
 
     :returns: Sa, Sv, Sd: ndarrays, same shape as `periods`
     '''
-    acc = np.asarray(acc, dtype=float)
-    n = len(acc)
-    periods = np.asarray(periods, dtype=float)
-    Sa = np.zeros_like(periods)
-    Sv = np.zeros_like(periods)
-    Sd = np.zeros_like(periods)
-
-    pga = np.max(np.abs(acc))
-
-    for k, T in enumerate(periods):
-        if T <= 1e-8:
-            Sa[k] = pga
-            Sv[k] = 0.0
-            Sd[k] = 0.0
-            continue
-
-        wn = 2.0 * np.pi / T
-        wd = wn * np.sqrt(1.0 - zeta ** 2)
-        w2 = wn ** 2
-        w3 = wn ** 3
-
-        # Precompute recursion coefficients (Nigam & Jennings, 1969)
-        ewt = np.exp(-zeta * wn * dt)
-        cwd = np.cos(wd * dt)
-        swd = np.sin(wd * dt)
-
-        A = ewt * (zeta / np.sqrt(1 - zeta ** 2) * swd + cwd)
-        B = ewt * (swd / wd)
-        C = (1.0 / w2) * (
-            (2 * zeta / (wn * dt)) +
-            ewt * (
-                ((1 - 2 * zeta ** 2) / (wd * dt) - zeta / np.sqrt(1 - zeta ** 2))
-                * swd
-                - (1 + 2 * zeta / (wn * dt)) * cwd
-            )
-        )
-        D = (1.0 / w2) * (
-            1 - (2 * zeta / (wn * dt)) +
-            ewt * (
-                ((2 * zeta ** 2 - 1) / (wd * dt)) * swd
-                + (2 * zeta / (wn * dt)) * cwd
-            )
-        )
-        Ap = -ewt * ((wn / np.sqrt(1 - zeta ** 2)) * swd)
-        Bp = ewt * (cwd - (zeta / np.sqrt(1 - zeta ** 2)) * swd)
-        Cp = (1.0 / w2) * (
-            -1.0 / dt
-            + ewt * (
-                ((wn / np.sqrt(1 - zeta ** 2)) + (zeta / (dt * np.sqrt(1 - zeta ** 2)))) * swd
-                + (1.0 / dt) * cwd
-            )
-        )
-        Dp = (1.0 / (w2 * dt)) * (1 - ewt * (cwd + (zeta / np.sqrt(1 - zeta ** 2)) * swd))
-
-        u = 0.0
-        v = 0.0
-        umax = 0.0
-        vmax = 0.0
-        for i in range(n - 1):
-            p1 = -acc[i]
-            p2 = -acc[i + 1]
-            u_new = A * u + B * v + C * p1 + D * p2
-            v_new = Ap * u + Bp * v + Cp * p1 + Dp * p2
-            u, v = u_new, v_new
-            au = abs(u)
-            av = abs(v)
-            if au > umax:
-                umax = au
-            if av > vmax:
-                vmax = av
-
-        Sd[k] = umax
-        Sv[k] = vmax
-        Sa[k] = umax * w2  # pseudo-spectral acceleration = wn^2 * Sd
-
-    return Sa, Sv, Sd
+    Sa, Sv, Sd = sdof_response_spectra(acc, dt, periods, zetas=zeta, method=method)
+    return Sa[0], Sv[0], Sd[0]
 
 
 # --------------------------------------------------------------------------
@@ -163,6 +350,10 @@ def saragoni_hart_envelope(t, t1=0.1, t2_frac=0.6, eps=0.2, eta=0.05):
     holds a strong-motion plateau, then decays exponentially. Produces a
     realistic non-stationary amplitude shape for a synthetic seed.
 
+    The parameters can also be arrays (one value for each record), in
+    which case one envelope per record is returned as a 2-D array
+    (records x time samples).
+
     :param t: time vector
     :param t1: time (s) at which the rise ends / plateau begins
     :param t2_frac: fraction of total duration marking end of plateau
@@ -171,18 +362,37 @@ def saragoni_hart_envelope(t, t1=0.1, t2_frac=0.6, eps=0.2, eta=0.05):
                 const)
     :returns: envelope.
     '''
+    t = np.asarray(t, dtype=float)
+    params = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (t1, t2_frac, eta)])
+    if params[0].ndim > 0:
+        # one envelope for each record.
+        t1, t2_frac, eta = [x.reshape(-1, 1) for x in params]
     T = t[-1]
     t2 = t2_frac * T
-    env = np.ones_like(t)
-    rise = t < t1
-    env[rise] = (t[rise] / t1) ** 2
-    decay = t > t2
     # exponential decay constant so envelope hits `eta` at T
     b = -np.log(eta) / (T - t2)
-    env[decay] = np.exp(-b * (t[decay] - t2))
+    env = np.where(t < t1, (t / t1) ** 2, 1.0)
+    env = np.where(t > t2, np.exp(-b * (t - t2)), env)
     return env
 
 
+def _seed_motion_fft_shape(freqs, corner_freq, kappa):
+    '''
+    Return the simple omega-squared-like shaping + kappa high-frequency
+    decay applied to the white noise of the synthetic seed motions.
+
+    :param freqs: FFT bin frequencies (Hz).
+    :param corner_freq: approx corner frequency (Hz) of the source spectrum shape
+    :param kappa: high-frequency spectral decay parameter (site kappa, s)
+    '''
+    # avoids divide-by-zero at f=0
+    f_safe = np.where(freqs == 0, freqs[1] if len(freqs) > 1 else 1.0, freqs)
+    shape = (f_safe ** 2) / (1.0 + (f_safe / corner_freq) ** 2)
+    shape *= np.exp(-np.pi * kappa * f_safe)
+    shape[0] = 0.0
+    return shape
+
+
 def generate_seed_motion(duration, dt, envelope_params=None, seed=None,
                           corner_freq=0.3, kappa=0.03):
     '''
@@ -193,6 +403,9 @@ def generate_seed_motion(duration, dt, envelope_params=None, seed=None,
 
     :param duration: total duration (s)
     :param dt: time step (s)
+    :param envelope_params: optional dictionary with the arguments of
+                            saragoni_hart_envelope.
+    :param seed: RNG seed.
     :param corner_freq: approx corner frequency (Hz) of the source spectrum shape
     :param kappa: high-frequency spectral decay parameter (site kappa, s)
 
@@ -209,18 +422,14 @@ def generate_seed_motion(duration, dt, envelope_params=None, seed=None,
     F = np.fft.rfft(white)
     freqs = np.fft.rfftfreq(n, d=dt)
 
-    # simple omega-squared-like shaping + kappa high-freq decay, avoids
-    # divide-by-zero at f=0
-    f_safe = np.where(freqs == 0, freqs[1] if len(freqs) > 1 else 1.0, freqs)
-    shape = (f_safe ** 2) / (1.0 + (f_safe / corner_freq) ** 2)
-    shape *= np.exp(-np.pi * kappa * f_safe)
-    shape[0] = 0.0
+    # simple omega-squared-like shaping + kappa high-freq decay
+    shape = _seed_motion_fft_shape(freqs, corner_freq, kappa)
 
     F_shaped = F * shape
     acc = np.fft.irfft(F_shaped, n=n)
 
     # apply amplitude envelope
-    env = saragoni_hart_envelope(t)
+    env = saragoni_hart_envelope(t, **(envelope_params or {}))
     acc = acc * env
 
     # normalize to unit std before returning (matching stage will scale it)
@@ -228,6 +437,72 @@ def generate_seed_motion(duration, dt, envelope_params=None, seed=None,
     return t, acc
 
 
+def generate_seed_motions(num_records, duration, dt, envelope_params=None,
+                          seed=None, seeds=None, corner_freq=0.3,
+                          kappa=0.03, band=None):
+    '''
+    Batch version of `generate_seed_motion`: generate `num_records` seed
+    accelerograms at once as a 2-D array (records x time samples). The
+    spectral shaping, the optional band-pass filter and the envelopes are
+    applied along the time axis of the whole array.
+
+    Each record has its own reproducible RNG stream: if `seeds` is given,
+    record i uses np.random.default_rng(seeds[i]) (so it is identical to
+    generate_seed_motion(duration, dt, seed= seeds[i]) when no band-pass
+    filter is used); otherwise the streams are spawned from `seed`
+    with np.random.SeedSequence.
+
+    :param num_records: number of records to generate (ignored if seeds
+                        is given).
+    :param duration: total duration (s)
+    :param dt: time step (s)
+    :param envelope_params: optional dictionary with the arguments of
+                            saragoni_hart_envelope; each value can be a
+                            scalar or an array with one value per record.
+    :param seed: root RNG seed of the per-record streams.
+    :param seeds: optional list with the RNG seed of each record.
+    :param corner_freq: approx corner frequency (Hz) of the source spectrum shape
+    :param kappa: high-frequency spectral decay parameter (site kappa, s)
+    :param band: optional (f_low, f_high) corner frequencies (Hz) of a
+                 4th order Butterworth band-pass filter applied (forward
+                 and backward) after the envelope. Requires scipy.
+
+    :returns: t, acc  (acc has shape (num_records, n) and unit std per
+              record -- spectral matching will rescale it)
+    '''
+    if seeds is None:
+        streams = np.random.SeedSequence(seed).spawn(num_records)
+    else:
+        streams = list(seeds)
+    n = int(np.round(duration / dt))
+    if n % 2 == 1:
+        n += 1
+    t = np.arange(n) * dt
+
+    # white noise (one reproducible stream per record) -> FFT
+    white = np.empty((len(streams), n))
+    for i, stream in enumerate(streams):
+        white[i] = np.random.default_rng(stream).standard_normal(n)
+    F = np.fft.rfft(white, axis=1)
+    freqs = np.fft.rfftfreq(n, d=dt)
+    shape = _seed_motion_fft_shape(freqs, corner_freq, kappa)
+    acc = np.fft.irfft(F * shape, n=n, axis=1)
+
+    # apply amplitude envelopes
+    env = saragoni_hart_envelope(t, **(envelope_params or {}))
+    acc = acc * env
+
+    if band is not None:
+        from scipy.signal import butter, filtfilt
+        fs = 1.0 / dt
+        b, a = butter(4, [band[0] / (fs / 2), band[1] / (fs / 2)], btype='band')
+        acc = filtfilt(b, a, acc, axis=1)
+
+    # normalize each record to unit std
+    acc = acc / (np.std(acc, axis=1, keepdims=True) + 1e-12)
+    return t, acc
+
+
 # --------------------------------------------------------------------------
 # 3. Baseline correction
 # --------------------------------------------------------------------------
@@ -271,6 +546,8 @@ class MatchResult:
     seed_Sa: np.ndarray
     history_misfit: list = field(default_factory=list)
     achieved_misfit: float = float("nan")  # misfit of the RETURNED motion (best iterate)
+    history_time: list = field(default_factory=list)  # wall time (s) of each iteration
+    history_num_updated: list = field(default_factory=list)  # oscillators recomputed in each iteration
 
     def getPGA(self):
         ''' Get peak ground acceleration.'''
@@ -307,6 +584,10 @@ def match_spectrum(
     scale_limit=(0.3, 3.0),
     relaxation=0.75,
     patience=40,
+    method='recursion',
+    adaptive=False,
+    full_check_interval=10,
+    freeze_fraction=0.5,
 ):
     '''
     Iteratively adjust the Fourier amplitude spectrum of `seed_acc` so its
@@ -361,6 +642,30 @@ def match_spectrum(
         if `patience` iterations pass with no improvement on the best
         misfit found so far, to avoid wasting iterations once the
         result has plateaued.
+    :param method: str
+        Response spectrum back end: 'recursion', 'fft' or 'auto' (see
+        `sdof_response_spectra`).
+    :param adaptive: bool
+        If True, the periods whose misfit is well inside the tolerance
+        (below freeze_fraction*tol) are frozen (their correction ratio is
+        set to 1) and, on the next iteration, only the oscillators whose
+        neighboring FFT bins were actually scaled are recomputed; the
+        spectral values of the other periods are taken from the previous
+        evaluation. Scaling some bins changes the whole time history, so
+        the frozen periods drift slightly: a full-spectrum evaluation is
+        done every `full_check_interval` iterations and before accepting
+        convergence, and only the full evaluations are candidates for the
+        best iterate. The saving is proportional to the number of frozen
+        periods with the 'fft' back end (whose cost grows with the number
+        of oscillators); with the batched 'recursion' it is small, since
+        its cost is dominated by the loop over the time samples.
+    :param full_check_interval: int
+        Number of iterations between full-spectrum evaluations in
+        adaptive mode.
+    :param freeze_fraction: float in (0, 1]
+        A period is frozen in adaptive mode when its misfit is below
+        freeze_fraction*tol (the margin absorbs the drift between full
+        evaluations).
 
     :returns: MatchResult
     '''
@@ -372,6 +677,8 @@ def match_spectrum(
 
     freqs = np.fft.rfftfreq(n, d=dt)
     history = []
+    history_time = []
+    history_num_updated = []
 
     # avoid T=0 in matching frequencies (handled as PGA anchor already in
     # sdof solver); ensure periods sorted ascending
@@ -383,30 +690,62 @@ def match_spectrum(
     best_misfit = np.inf
     iters_since_best = 0
 
+    log_T_targets = np.log(T_targets)
+    Sa_current = None
+    to_update = None  # periods to recompute in adaptive mode (None: all)
+    last_full = 0
+
     for iteration in range(1, max_iter + 1):
-        Sa_current, _, _ = sdof_response_spectrum(acc, dt, T_targets, zeta=zeta)
+        t_start = time.perf_counter()
+        full = (not adaptive) or (to_update is None) or (iteration - last_full >= full_check_interval)
+        if full:
+            Sa_current, _, _ = sdof_response_spectrum(acc, dt, T_targets, zeta=zeta, method=method)
+            num_updated = len(T_targets)
+        else:
+            num_updated = int(np.count_nonzero(to_update))
+            if num_updated > 0:
+                Sa_current = Sa_current.copy()
+                Sa_current[to_update], _, _ = sdof_response_spectrum(acc, dt, T_targets[to_update], zeta=zeta, method=method)
 
         ratio = Sa_targets / np.maximum(Sa_current, 1e-12)
         misfit = np.max(np.abs(ratio - 1.0))
+        if (misfit < tol or misfit < best_misfit) and not full:
+            # confirm convergence (or a new best iterate) with a
+            # full-spectrum evaluation.
+            Sa_current, _, _ = sdof_response_spectrum(acc, dt, T_targets, zeta=zeta, method=method)
+            num_updated += len(T_targets)
+            full = True
+            ratio = Sa_targets / np.maximum(Sa_current, 1e-12)
+            misfit = np.max(np.abs(ratio - 1.0))
+        if full:
+            last_full = iteration
         history.append(misfit)
+        history_num_updated.append(num_updated)
 
-        if misfit < best_misfit:
+        # only the exact (full) evaluations are candidates for the best
+        # iterate.
+        if full and misfit < best_misfit:
             best_misfit = misfit
             best_acc = acc.copy()
             iters_since_best = 0
         else:
             iters_since_best += 1
 
-        if misfit < tol:
-            break
-        if iters_since_best >= patience:
+        if (full and misfit < tol) or iters_since_best >= patience:
+            history_time.append(time.perf_counter() - t_start)
             break
 
+        if adaptive:
+            # freeze the periods that are well inside the tolerance.
+            frozen = np.abs(ratio - 1.0) < freeze_fraction * tol
+
         # under-relax: move only partway toward the full correction each
         # pass -- prevents the overshoot/oscillation that a full-strength
         # update produces (see `relaxation` docstring above)
         ratio = 1.0 + relaxation * (ratio - 1.0)
         ratio = np.clip(ratio, *scale_limit)
+        if adaptive:
+            ratio[frozen] = 1.0
 
         # Map period-domain ratios onto the FFT frequency axis.
         # For each FFT bin frequency f, find corresponding period T=1/f,
@@ -420,7 +759,6 @@ def match_spectrum(
 
         # interpolate ratio (log-period, linear ratio) with clamping at
         # the ends of the target period range
-        log_T_targets = np.log(T_targets)
         log_T_bins = np.log(T_bins)
         ratio_bins = np.interp(
             log_T_bins, log_T_targets, ratio,
@@ -434,6 +772,13 @@ def match_spectrum(
             ratio_bins = np.convolve(ratio_bins, kernel, mode="same")
 
         scale = np.concatenate(([1.0], ratio_bins))  # keep DC bin unscaled
+        if adaptive:
+            # oscillators to recompute: those whose period bracket (in the
+            # log-period interpolation above) contains a scaled bin.
+            idx = np.searchsorted(log_T_targets, log_T_bins[ratio_bins != 1.0])
+            to_update = np.zeros(len(T_targets), dtype=bool)
+            to_update[np.clip(idx, 0, len(T_targets) - 1)] = True
+            to_update[np.clip(idx - 1, 0, len(T_targets) - 1)] = True
         amp_new = amp * scale
         F_new = amp_new * np.exp(1j * phase)
         acc = np.fft.irfft(F_new, n=n)
@@ -443,10 +788,11 @@ def match_spectrum(
         # targets -- so doing it every iteration makes the loop fight
         # itself and stall well above tolerance. Baseline correction is
         # applied once, after the loop, as pure post-processing.
+        history_time.append(time.perf_counter() - t_start)
 
     acc = baseline_correct(best_acc, dt, poly_order=2)
-    Sa_final, _, _ = sdof_response_spectrum(acc, dt, T_targets, zeta=zeta)
-    Sa_seed0, _, _ = sdof_response_spectrum(seed_acc, dt, T_targets, zeta=zeta)
+    Sa_final, _, _ = sdof_response_spectrum(acc, dt, T_targets, zeta=zeta, method=method)
+    Sa_seed0, _, _ = sdof_response_spectrum(seed_acc, dt, T_targets, zeta=zeta, method=method)
 
     t = np.arange(len(acc)) * dt
     vel, disp = integrate(acc, dt)
@@ -461,6 +807,8 @@ def match_spectrum(
         seed_Sa=Sa_seed0,
         history_misfit=history,
         achieved_misfit=float(np.max(np.abs(Sa_targets / np.maximum(Sa_final, 1e-12) - 1.0))),
+        history_time=history_time,
+        history_num_updated=history_num_updated,
     )
 
 def load_two_col_csv(path):
@@ -579,8 +927,8 @@ def write_result(result, timeStep:float, dampingRatio, tol, outputPrefix:str):
                np.column_stack([result.t, result.disp]),
                delimiter=",", header="time_s,disp", comments="")
     np.savetxt(f"{outputPrefix}_spec.csv",
-               np.column_stack([result.periods, result.target_Sa]),
-               delimiter=",", header="time_s,Sa_g", comments="")
+               np.column_stack([result.periods, result.final_Sa]),
+               delimiter=",", header="period_s,Sa_g", comments="")
     
     pga= result.getPGA()
     pgv= result.getPGV()
@@ -604,6 +952,106 @@ def write_result(result, timeStep:float, dampingRatio, tol, outputPrefix:str):
             f.write(f"  iter {i:3d}: {m:.4f}\n")
 
 
+# Arrays of each motion stored in the suite container.
+suiteMotionArrays= ['t', 'acc', 'vel', 'disp', 'periods', 'target_Sa', 'final_Sa', 'seed_Sa', 'history_misfit']
+
+def write_suite_npz(results, motionNames, timeStep:float, dampingRatio, tol, fileName:str):
+    ''' Write the results of a suite of motions in a single (uncompressed)
+        NPZ container. Each array is stored as a separate member named
+        <motion name>_<array name> (e.g. motion1_acc), so one component
+        can be read without reading the rest (see MotionSuiteFile).
+
+    :param results: list of spectrum compatible motion results.
+    :param motionNames: names of the motions.
+    :param timeStep: time step.
+    :param dampingRatio: Damping ratio.
+    :param tol: convergence tolerance on max relative spectral misfit.
+    :param fileName: name of the output file.
+    '''
+    arrays= {'motion_names': np.array(motionNames), 'time_step': np.array(timeStep), 'damping_ratio': np.array(dampingRatio), 'tol': np.array(tol)}
+    for name, result in zip(motionNames, results):
+        for key in suiteMotionArrays:
+            arrays[name+'_'+key]= np.asarray(getattr(result, key), dtype= float)
+        arrays[name+'_achieved_misfit']= np.array(result.achieved_misfit)
+    np.savez(fileName, **arrays)
+
+
+class MotionSuiteFile(object):
+    ''' Lazy reader of the suite container written by write_suite_npz: the
+        arrays are read from disk only when they are requested.
+
+    :ivar data: NpzFile object.
+    :ivar motionNames: names of the motions of the suite.
+    :ivar timeStep: time step.
+    :ivar dampingRatio: damping ratio.
+    '''
+    def __init__(self, fileName):
+        ''' Constructor.
+
+        :param fileName: name of the NPZ file.
+        '''
+        self.data= np.load(fileName, allow_pickle= False)
+        self.motionNames= [str(name) for name in self.data['motion_names']]
+        self.timeStep= float(self.data['time_step'])
+        self.dampingRatio= float(self.data['damping_ratio'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        ''' Close the underlying file.'''
+        self.data.close()
+
+    def getArray(self, motionName, key):
+        ''' Return the array of the given motion.
+
+        :param motionName: name of the motion.
+        :param key: name of the array ('t', 'acc', 'vel', 'disp', 'periods',
+                    'target_Sa', 'final_Sa', 'seed_Sa' or 'history_misfit').
+        '''
+        return self.data[motionName+'_'+key]
+
+    def getAcceleration(self, motionName):
+        ''' Return the time and acceleration values of the given motion.
+
+        :param motionName: name of the motion.
+        '''
+        return self.getArray(motionName, 't'), self.getArray(motionName, 'acc')
+
+    def getSpectrum(self, motionName, which= 'final'):
+        ''' Return the periods and spectral accelerations of the given
+            motion.
+
+        :param motionName: name of the motion.
+        :param which: spectrum to return: 'final' (matched motion), 'seed'
+                      or 'target'.
+        '''
+        return self.getArray(motionName, 'periods'), self.getArray(motionName, which+'_Sa')
+
+    def getMatchResult(self, motionName):
+        ''' Return the MatchResult object of the given motion (reads all
+            its arrays).
+
+        :param motionName: name of the motion.
+        '''
+        kwargs= {key: self.getArray(motionName, key) for key in suiteMotionArrays}
+        kwargs['history_misfit']= list(kwargs['history_misfit'])
+        kwargs['achieved_misfit']= float(self.getArray(motionName, 'achieved_misfit'))
+        return MatchResult(**kwargs)
+
+    def writeCSV(self, motionName, tol, outputPrefix:str):
+        ''' Export the given motion in the CSV files written by write_result.
+
+        :param motionName: name of the motion.
+        :param tol: convergence tolerance (for the summary).
+        :param outputPrefix: prefix to use when naming the output files.
+        '''
+        write_result(self.getMatchResult(motionName), timeStep= self.timeStep, dampingRatio= self.dampingRatio, tol= tol, outputPrefix= outputPrefix)
+
+
 def plot_result(result, dampingRatio, outputPrefix:str):
     ''' Write computation result using the given prefix when naming the output
         files.
@@ -668,11 +1116,16 @@ class SpectralMatching(object):
                       1.0 = full correction each pass (often oscillates instead 
                             of converging).
     :ivar tol: Convergence tolerance on max relative spectral misfit.
+    :ivar spectrumMethod: response spectrum back end: 'recursion', 'fft' or
+                          'auto' (see sdof_response_spectra).
+    :ivar adaptive: if True, keep the converged periods frozen and recompute
+                    only the oscillators affected by each correction (see
+                    match_spectrum).
     :ivar outPrefix: Path prefix for output files (directories created as 
                      needed).
 
     '''
-    def __init__(self, demo= True, targetCSV= None, seedCSV= None, seedDt= None, duration= 30, timeStep= .005, dampingRatio= .05, maxIter= 150, relaxation= 0.75, tol= .03, outputPrefix= 'output/motion'):
+    def __init__(self, demo= True, targetCSV= None, seedCSV= None, seedDt= None, duration= 30, timeStep= .005, dampingRatio= .05, maxIter= 150, relaxation= 0.75, tol= .03, outputPrefix= 'output/motion', spectrumMethod= 'recursion', adaptive= False):
         ''' Constructor.
 
         :param demo: Run with a built-in demo ASCE7-like target spectrum and 
@@ -700,6 +1153,11 @@ class SpectralMatching(object):
         :param tol: Convergence tolerance on max relative spectral misfit.
         :param outputPrefix: Path prefix for output files (directories created
                             as needed).
+        :param spectrumMethod: response spectrum back end: 'recursion', 'fft'
+                               or 'auto' (see sdof_response_spectra).
+        :param adaptive: if True, keep the converged periods frozen and
+                         recompute only the oscillators affected by each
+                         correction (see match_spectrum).
         '''
         self.demo= demo # Run with a built-in demo.
         self.targetCSV= targetCSV # CSV file with header row, columns: period(s), Sa(g).
@@ -712,17 +1170,13 @@ class SpectralMatching(object):
         self.relaxation= relaxation # Under-relaxation factor.
         self.tol= tol # Convergence tolerance.
         self.outputPrefix= outputPrefix # Path prefix
+        self.spectrumMethod= spectrumMethod # Response spectrum back end.
+        self.adaptive= adaptive # Adaptive (incremental) misfit evaluation.
 
-    def getSpectralMatchingMotion(self, randomSeed= 42):
-        ''' Return a synthetic spectral matching motion.
-
-        :param randomSeed: RNG seed for synthetic seed motion generation
-                           (reproducibility).
+    def getTargetSpectrum(self):
+        ''' Return the periods and spectral accelerations of the target
+            spectrum.
         '''
-        import os
-        os.makedirs(os.path.dirname(self.outputPrefix) or ".", exist_ok=True)
-
-        # ---- 1. Target spectrum ----
         if(self.targetCSV or self.demo):
             T_target, Sa_target = get_target_spectrum(targetCSV= self.targetCSV)
         else:
@@ -730,26 +1184,137 @@ class SpectralMatching(object):
             msg= methodName+'; supply --target-csv <file> or use --demo.'
             lmsg.error(msg)
             sys.exit(1)
+        return T_target, Sa_target
+
+    def matchMotion(self, T_target, Sa_target, randomSeed= 42, seedCSV= None, seedDt= None, outputPrefix= None, writeCSV= True):
+        ''' Match a seed motion against the given target spectrum and write
+            the results.
+
+        :param T_target: periods of the target spectrum.
+        :param Sa_target: spectral accelerations of the target spectrum.
+        :param randomSeed: RNG seed for synthetic seed motion generation
+                           (reproducibility).
+        :param seedCSV: optional CSV (single column) of a seed acceleration 
+                        time history, in g (if None use self.seedCSV).
+        :param seedDt: time step (s) of seedCSV (if None use self.seedDt).
+        :param outputPrefix: path prefix for output files (if None use 
+                             self.outputPrefix).
+        :param writeCSV: if True, write the CSV and summary files
+                         (see write_result).
+        '''
+        if(seedCSV is None):
+            seedCSV= self.seedCSV
+        if(seedDt is None):
+            seedDt= self.seedDt
+        if(outputPrefix is None):
+            outputPrefix= self.outputPrefix
+        os.makedirs(os.path.dirname(outputPrefix) or ".", exist_ok=True)
 
         # ---- 2. Seed motion ----
-        seed_acc, dt= get_seed_motion(T_target= T_target, Sa_target= Sa_target, timeStep= self.timeStep, duration= self.duration, randomSeed= randomSeed, dampingRatio= self.dampingRatio, seedCSV= self.seedCSV, seedDt= self.seedDt)
+        seed_acc, dt= get_seed_motion(T_target= T_target, Sa_target= Sa_target, timeStep= self.timeStep, duration= self.duration, randomSeed= randomSeed, dampingRatio= self.dampingRatio, seedCSV= seedCSV, seedDt= seedDt)
 
         # ---- 3. Spectral matching ----
         result = match_spectrum(
             seed_acc, dt, T_target, Sa_target,
             zeta=self.dampingRatio, max_iter=self.maxIter, tol=self.tol,
             relaxation=self.relaxation,
+            method=self.spectrumMethod, adaptive=self.adaptive,
         )
 
         # ---- 4. Save outputs ----
-        write_result(result, timeStep= self.timeStep, dampingRatio= self.dampingRatio, tol= self.tol, outputPrefix= self.outputPrefix)
+        if(writeCSV):
+            write_result(result, timeStep= self.timeStep, dampingRatio= self.dampingRatio, tol= self.tol, outputPrefix= outputPrefix)
 
         # ---- 5. Plots ----
         try:
-            plot_result(result, dampingRatio= self.dampingRatio, outputPrefix= self.outputPrefix)
+            plot_result(result, dampingRatio= self.dampingRatio, outputPrefix= outputPrefix)
         except ImportError:
             methodName= sys._getframe(0).f_code.co_name
             msg= methodName+'; matplotlib not available -- skipping plots, CSV/summary still written.'
             lmsg.error(msg)
         return result
         
+    def getSpectralMatchingMotion(self, randomSeed= 42):
+        ''' Return a synthetic spectral matching motion.
+
+        :param randomSeed: RNG seed for synthetic seed motion generation
+                           (reproducibility).
+        '''
+        # ---- 1. Target spectrum ----
+        T_target, Sa_target = self.getTargetSpectrum()
+        return self.matchMotion(T_target= T_target, Sa_target= Sa_target, randomSeed= randomSeed)
+
+    def getSuiteRecords(self, seeds):
+        ''' Return the list of records (dictionaries) that define the
+            motions of a suite.
+
+        :param seeds: list whose items can be: an integer (RNG seed of a
+                      synthetic seed motion), a string (CSV file of a seed
+                      accelerogram with time step self.seedDt) or a
+                      dictionary with the optional keys 'randomSeed',
+                      'seedCSV', 'seedDt' and 'name'.
+        '''
+        retval= list()
+        baseName= os.path.basename(self.outputPrefix)
+        for i, seed in enumerate(seeds, 1):
+            if(isinstance(seed, dict)):
+                record= dict(seed)
+            elif(isinstance(seed, str)):
+                record= {'seedCSV': seed}
+            else:
+                record= {'randomSeed': int(seed)}
+            record.setdefault('randomSeed', None)
+            record.setdefault('seedCSV', self.seedCSV)
+            record.setdefault('seedDt', self.seedDt)
+            name= record.setdefault('name', baseName+str(i))
+            # Same layout as generate_spectrum_compatible_motion.sh:
+            # <prefix>1/<name>, <prefix>2/<name>...
+            record['outputPrefix']= os.path.join(self.outputPrefix+str(i), name)
+            retval.append(record)
+        return retval
+
+    def getSpectralMatchingSuite(self, seeds, numProcesses= None, writeCSV= True):
+        ''' Generate a suite of spectrum compatible motions, matching them
+            in parallel using a process pool. Each motion writes the same
+            files as getSpectralMatchingMotion (CSV files only if writeCSV
+            is True), the whole suite is written in the binary container
+            <outputPrefix>_suite.npz (see write_suite_npz and
+            MotionSuiteFile) and a JSON manifest of the suite is written in
+            <outputPrefix>_suite.json.
+
+        :param seeds: list of RNG seeds or seed records (see getSuiteRecords).
+        :param numProcesses: number of worker processes (defaults to the
+                             number of processors of the machine).
+        :param writeCSV: if True, write the CSV files of each motion.
+        :returns: list of MatchResult objects (in the same order as seeds).
+        '''
+        import json
+        import concurrent.futures
+
+        # The target spectrum is read only once.
+        T_target, Sa_target = self.getTargetSpectrum()
+        records= self.getSuiteRecords(seeds)
+        retval= [None]*len(records)
+        with concurrent.futures.ProcessPoolExecutor(max_workers= numProcesses) as executor:
+            futures= {executor.submit(self.matchMotion, T_target, Sa_target, record['randomSeed'], record['seedCSV'], record['seedDt'], record['outputPrefix'], writeCSV): i for i, record in enumerate(records)}
+            for future in concurrent.futures.as_completed(futures):
+                retval[futures[future]]= future.result()
+
+        # ---- Suite container ----
+        os.makedirs(os.path.dirname(self.outputPrefix) or ".", exist_ok=True)
+        suiteFileName= f"{self.outputPrefix}_suite.npz"
+        write_suite_npz(retval, motionNames= [record['name'] for record in records], timeStep= self.timeStep, dampingRatio= self.dampingRatio, tol= self.tol, fileName= suiteFileName)
+
+        # ---- Suite manifest ----
+        manifest= {'targetCSV': self.targetCSV, 'dampingRatio': self.dampingRatio, 'tol': self.tol, 'suiteFile': suiteFileName, 'motions': list()}
+        for record, result in zip(records, retval):
+            motion= dict(record)
+            motion['iterations']= len(result.history_misfit)
+            motion['achievedMisfit']= result.getFinalMisfit()
+            motion['PGA']= float(result.getPGA())
+            motion['PGV']= float(result.getPGV())
+            motion['PGD']= float(result.getPGD())
+            manifest['motions'].append(motion)
+        with open(f"{self.outputPrefix}_suite.json", "w") as f:
+            json.dump(manifest, f, indent= 2)
+        return retval
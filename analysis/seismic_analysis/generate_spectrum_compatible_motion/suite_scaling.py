@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+'''
+suite_scaling.py
+
+Scaling of a suite of pairs of horizontal ground motions according to
+EN 1998-2:2005, ap. 3.2.3: for each pair the SRSS spectrum of its two
+components is computed, the spectra of all the pairs are averaged and the
+mean spectrum must not be less than 1.3 times the 5% damped elastic
+target spectrum in the required period range (0.2T1-1.5T1, T1 being the
+fundamental period of the structure). The resulting scale factor is
+applied to all the individual components.
+
+All the pairs are processed at once as arrays with shape
+(number of pairs, 2, number of periods).
+'''
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import sys
+import numpy as np
+from misc_utils import log_messages as lmsg
+import spectral_matching as sm
+
+def get_spectrum(spectrCSVfile, order= False):
+    '''Return the periods and acceleration of the spectrum
+
+    :param spectrCSVfile: CSV file with header row, columns: period(s), Sa(g).
+    :param order: True if it is required to order the fields by period (defaults to False)
+    '''
+    T_espectr, Sa_spectr= sm.load_two_col_csv(spectrCSVfile)
+    if order:
+        order= np.argsort(T_espectr)
+        T_espectr, Sa_spectr= T_espectr[order], Sa_spectr[order]
+    return T_espectr, Sa_spectr
+
+def load_pair_spectra(pairsSpectrumFnames):
+    ''' Return the periods and the spectral accelerations of the pairs of
+        motions read from CSV files.
+
+    :param pairsSpectrumFnames: list of pairs of CSV spectrum files with
+                                header row, columns: period(s), Sa(g).
+    :returns: periods, Sa_pairs (array with shape (number of pairs, 2,
+              number of periods)).
+    '''
+    periods= None
+    Sa_pairs= list()
+    for pair in pairsSpectrumFnames:
+        Sa_pair= list()
+        for fName in pair:
+            T, Sa= get_spectrum(fName)
+            if periods is None:
+                periods= T
+            elif (len(T) != len(periods)) or not np.allclose(T, periods):
+                methodName= sys._getframe(0).f_code.co_name
+                lmsg.error(methodName+"; periods in "+fName+" don't match those of "+pairsSpectrumFnames[0][0])
+                exit(1)
+            Sa_pair.append(Sa)
+        Sa_pairs.append(Sa_pair)
+    return periods, np.array(Sa_pairs)
+
+def load_suite_pair_spectra(suiteFileName, pairsMotionNames):
+    ''' Return the periods and the spectral accelerations of the pairs of
+        motions read from a suite container (see spectral_matching.write_suite_npz).
+
+    :param suiteFileName: name of the NPZ suite container.
+    :param pairsMotionNames: list of pairs of motion names.
+    :returns: periods, Sa_pairs (array with shape (number of pairs, 2,
+              number of periods)).
+    '''
+    with sm.MotionSuiteFile(suiteFileName) as suite:
+        periods= suite.getArray(pairsMotionNames[0][0], 'periods')
+        Sa_pairs= np.array([[suite.getSpectrum(name)[1] for name in pair] for pair in pairsMotionNames])
+    return periods, Sa_pairs
+
+def calc_SRSS_spectra(Sa_pairs):
+    ''' Return the SRSS spectra (square root of the sum of squares of both
+        components) of each pair of motions.
+
+    :param Sa_pairs: spectral accelerations of the pairs of motions (array
+                     with shape (number of pairs, 2, number of periods)).
+    :returns: array with shape (number of pairs, number of periods).
+    '''
+    Sa_pairs= np.asarray(Sa_pairs)
+    return np.hypot(Sa_pairs[:,0,:], Sa_pairs[:,1,:])
+
+def calc_scale_factor(periods, Sa_mean, T_target, Sa_target, periodRange= None, targetFactor= 1.3):
+    ''' Return the factor that must be applied to the motions so the mean
+        SRSS spectrum is not less than targetFactor times the target
+        spectrum in the given period range (EN 1998-2:2005, ap. 3.2.3).
+
+    :param periods: periods of the mean spectrum.
+    :param Sa_mean: spectral accelerations of the mean SRSS spectrum.
+    :param T_target: periods of the target spectrum (ascending).
+    :param Sa_target: spectral accelerations of the target spectrum.
+    :param periodRange: (T_min, T_max) range of periods where the condition
+                        is checked (0.2T1, 1.5T1). If None, the whole period
+                        range of the mean spectrum is used.
+    :param targetFactor: factor applied to the target spectrum (1.3).
+    :returns: scale factor (a value smaller than one means that the motions
+              can be scaled down).
+    '''
+    periods= np.asarray(periods)
+    inRange= np.ones(len(periods), dtype= bool)
+    if periodRange is not None:
+        inRange= (periods >= periodRange[0]) & (periods <= periodRange[1])
+    if not np.any(inRange):
+        methodName= sys._getframe(0).f_code.co_name
+        lmsg.error(methodName+'; no periods in range: '+str(periodRange))
+        exit(1)
+    Sa_required= targetFactor*np.interp(periods[inRange], T_target, Sa_target)
+    return float(np.max(Sa_required/np.maximum(np.asarray(Sa_mean)[inRange], 1e-12)))
+
+def check_suite(periods, Sa_pairs, T_target, Sa_target, periodRange= None, targetFactor= 1.3):
+    ''' Compute the SRSS spectra of all the pairs, the mean SRSS spectrum
+        and the EN 1998-2 scale factor.
+
+    :param periods: periods of the motion spectra.
+    :param Sa_pairs: spectral accelerations of the pairs of motions (array
+                     with shape (number of pairs, 2, number of periods)).
+    :param T_target: periods of the target spectrum (ascending).
+    :param Sa_target: spectral accelerations of the target spectrum.
+    :param periodRange: (T_min, T_max) range of periods where the condition
+                        is checked (0.2T1, 1.5T1). If None, the whole period
+                        range is used.
+    :param targetFactor: factor applied to the target spectrum (1.3).
+    :returns: dictionary with the SRSS spectra ('SRSS'), the mean spectrum
+              ('mean'), the required spectrum ('required', targetFactor
+              times the target interpolated at periods) and the scale
+              factor ('scaleFactor').
+    '''
+    Sa_SRSS= calc_SRSS_spectra(Sa_pairs)
+    Sa_mean= np.mean(Sa_SRSS, axis= 0)
+    scaleFactor= calc_scale_factor(periods, Sa_mean, T_target, Sa_target, periodRange= periodRange, targetFactor= targetFactor)
+    return {'SRSS': Sa_SRSS, 'mean': Sa_mean, 'required': targetFactor*np.interp(periods, T_target, Sa_target), 'scaleFactor': scaleFactor}
+
+def scale_acceleration_files(accelFnames, scaleFactor, suffix= '_scaled'):
+    ''' Apply the scale factor to the acceleration files (CSV with header
+        row, columns: time(s), acceleration) and write the scaled
+        accelerations in new files (same name with the given suffix).
+
+    :param accelFnames: names of the acceleration files.
+    :param scaleFactor: scale factor.
+    :param suffix: suffix added to the name of the scaled files.
+    :returns: names of the scaled files.
+    '''
+    retval= list()
+    for fName in accelFnames:
+        t, acc= sm.load_two_col_csv(fName)
+        outputFName= fName.replace('.csv', suffix+'.csv')
+        np.savetxt(outputFName, np.column_stack([t, scaleFactor*acc]), delimiter=",", header="time_s,accel_g", comments="")
+        retval.append(outputFName)
+    return retval
+
+def scale_suite(suiteFileName, scaleFactor, outputFileName):
+    ''' Apply the scale factor to all the motions of a suite container
+        (see spectral_matching.write_suite_npz) and write the scaled suite
+        in a new container.
+
+    :param suiteFileName: name of the NPZ suite container.
+    :param scaleFactor: scale factor.
+    :param outputFileName: name of the scaled NPZ suite container.
+    '''
+    scaledKeys= ('acc', 'vel', 'disp', 'final_Sa', 'seed_Sa')
+    with np.load(suiteFileName, allow_pickle= False) as data:
+        arrays= dict()
+        for key in data.files:
+            values= data[key]
+            if key.endswith(scaledKeys):
+                values= scaleFactor*values
+            arrays[key]= values
+    np.savez(outputFileName, **arrays)
+
+def plot_suite(periods, Sa_pairs, suiteCheck, T_target, Sa_target, targetFactor= 1.3):
+    ''' Plot the spectra of each pair of motions with its SRSS spectrum and
+        the mean SRSS spectrum against the target spectrum.
+
+    :param periods: periods of the motion spectra.
+    :param Sa_pairs: spectral accelerations of the pairs of motions.
+    :param suiteCheck: dictionary returned by check_suite.
+    :param T_target: periods of the target spectrum.
+    :param Sa_target: spectral accelerations of the target spectrum.
+    :param targetFactor: factor applied to the target spectrum (1.3).
+    '''
+    import matplotlib.pyplot as plt
+    for i, (Sa_pair, Sa_SRSS) in enumerate(zip(Sa_pairs, suiteCheck['SRSS'])):
+        plt.figure(figsize=(10, 10))
+        plt.plot(periods, Sa_pair[0], label="Espectro "+str(2*i+1), color="blue", linewidth=2)
+        plt.plot(periods, Sa_pair[1], label="Espectro "+str(2*i+2), color="red", linewidth=2)
+        plt.plot(periods, Sa_SRSS, label="Espectro SRSS", color="green", linewidth=2)
+        plt.title('Espectros de acelerogramas '+str(2*i+1)+' y '+str(2*i+2)+' y espectro SRSS')
+        plt.xlabel("T [s]")
+        plt.ylabel("Sa [g]")
+        plt.grid(True, linestyle=":", alpha=0.6)
+        plt.legend(loc="upper right", fontsize=11)
+        plt.show()
+
+    # mean spectrum
+    plt.figure(figsize=(10, 10))
+    plt.plot(periods, suiteCheck['mean'], label="Espectro medio", color="blue", linewidth=2)
+    plt.plot(T_target, Sa_target, label="Espectro EC8", color="red", linewidth=2)
+    plt.plot(T_target, targetFactor*Sa_target, label="Espectro EC8 * "+str(targetFactor), color="green", linewidth=2)
+    plt.plot(periods, suiteCheck['scaleFactor']*suiteCheck['mean'], label="Espectro medio escalado", color="blue", linestyle="--", linewidth=2)
+    plt.xlabel("T [s]")
+    plt.ylabel("Sa [g]")
+    plt.grid(True, linestyle=":", alpha=0.6)
+    plt.legend(loc="upper right", fontsize=11)
+    plt.show()
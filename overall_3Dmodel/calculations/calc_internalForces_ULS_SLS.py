@@ -12,6 +12,13 @@ import xc_init
 import xc_main_fullmodel
 import xc_sets as xcS
 import xc_combinations as xcC
+import xc_lcases as xcLC
+from support_functions import lin_superposition as lsup
+from support_functions import shared_combinations as shc
+from support_functions import comb_pruning as cprun
+from support_functions import comb_parser as cparse
+from support_functions import lc_dependencies as ldep
+from support_functions import lc_results_cache as lcrc
 # Common variables
 modelSpace=xc_init.modelSpace ; prep=xc_init.prep ; out=xc_init.out
 
@@ -53,20 +60,71 @@ limitStates= [lsd.woodNormalStressesResistance,
 lsd.normalStressesResistance.woodArmerAlsoForAxialForces= False
 '''
 
+# Check that the load cases of the combinations are defined.
+combMatrix=cparse.CombinationMatrix.fromCombContainer(xcC.combContainer)
+if combMatrix.checkLoadCaseNames(prep.getLoadHandler.getLoadPatterns.getKeys()):
+    quit()
+
+# Dominance pruning of the combinations: load cases whose effect sign
+# is known (list of the load cases whose effect grows with the factor or
+# dictionary load case name -> sign of its effect, see
+# support_functions/comb_pruning.py). If it is empty only the duplicated
+# combinations are removed.
+signKnownLoadCases=[]
+prunedCombs=cprun.prune_comb_container(xcC.combContainer,signKnownLoadCases)
+if prunedCombs:
+    cprun.write_pruning_report(prunedCombs,env.cfg.projectDirTree.getFullResultsPath()+'pruned_combinations.csv')
+    print('pruned combinations: ', prunedCombs)
+
 linearCalc=True
+# if True (and linearCalc) each load case is solved only once and the
+# results of the combinations are obtained by superposition (the
+# reactions are written only if a set of constrained nodes is passed to
+# LinearSuperposition).
+superposition=False
+# number of worker processes used to solve the combinations when they
+# are not obtained by superposition (None: all the processors).
+numProcesses=1
+# if True (and superposition) only the load cases whose definition has
+# changed since the previous run are solved and only the limit states
+# that use them are rewritten. The changes are detected from the
+# fingerprints of the loads of each load case (see lc_dependencies.py),
+# set it to False if the loads depend on data that can't be hashed.
+incremental=False
 
-if linearCalc:
+if linearCalc and superposition:
+    engine=lsup.LinearSuperposition(xc_init.FEcase,modelSpace,setCalc)
+    if incremental:
+        # the model fingerprint doesn't include the load files, so a
+        # change in a load pattern only affects that load pattern (the
+        # load values are hashed in the fingerprint of each load case).
+        loadFiles=['data_loads.py','xc_loads.py','xc_roadway_loads.py','xc_lcases.py','xc_combinations.py']
+        modelFiles=[f for f in lcrc.get_model_definition_files(workingDirectory) if f.split('/')[-1] not in loadFiles]
+        resultsPath=env.cfg.projectDirTree.getFullResultsPath()
+        tracker=ldep.DependencyTracker(manifestFileName=resultsPath+'lc_dependencies.json',modelFingerprint=lcrc.get_model_fingerprint(setCalc,modelFiles),loadCaseFingerprints=ldep.get_load_case_fingerprints(xcLC.lcLoadDefinitions))
+        print('changed load cases: ', tracker.getChangedLoadCases())
+        engine.setStorage(resultsPath+'lc_results/',tracker)
     for ls in limitStates:
-        ls.saveAll(combContainer=xcC.combContainer,setCalc=setCalc,bucklingMembers=None)
-        print('combinations for ', ls.label, ': ', loadCombinations.getKeys())
+        if incremental and not tracker.isLimitStateAffected(ls,xcC.combContainer):
+            print('results of ', ls.label, ' are up to date')
+            continue
+        combNames=engine.saveAll(limitState=ls,combContainer=xcC.combContainer)
+        print('combinations for ', ls.label, ': ', combNames)
+        if incremental:
+            tracker.setLimitStateUpdated(ls,xcC.combContainer)
+            tracker.write()
+    print('load cases solved or read: ', engine.loadCaseNames)
+elif linearCalc:
+    # each distinct combination is solved once for all the limit states.
+    combUsers=shc.save_all_limit_states(xc_init.FEcase,modelSpace,limitStates,xcC.combContainer,setCalc,numProcesses=numProcesses)
+    print('combinations solved: ', list(combUsers.keys()))
 else:
     class CustomSolver(predefined_solutions.PlainNewtonRaphsonMUMPS):
         def __init__(self, prb):
             super(CustomSolver,self).__init__(prb= prb, name= 'test', maxNumIter= 30, printFlag= 1, convergenceTestTol= 1e-1)
 
-    for ls in limitStates:
-        ls.saveAll(combContainer=xcC.combContainer,setCalc=setCalc,solutionProcedureType=CustomSolver,bucklingMembers=None)
-        print('combinations for ', ls.label, ': ', loadCombinations.getKeys())
+    combUsers=shc.save_all_limit_states(xc_init.FEcase,modelSpace,limitStates,xcC.combContainer,setCalc,solutionProcedureType=CustomSolver,numProcesses=numProcesses)
+    print('combinations solved: ', list(combUsers.keys()))
 
 
 
@@ -74,9 +132,6 @@ else:
 # add the effect of the in-plane Nxy forces to the axial internal forces (defaults to True)
 #lsd.normalStressesResistance.woodArmerAlsoForAxialForces= False
 
-# for ls in limitStates:
-#     ls.saveAll(
-#         combContainer=model.combContainer,
-#         setCalc=setCalc,bucklingMembers=[sMemb.col01a,sMemb.col01b,sMemb.col02a,sMemb.col02b,sMemb.col03,sMemb.beam01]
-#     )
-#     print('combinations for ', ls.label, ': ', loadCombinations.getKeys())
+# steel members: pass the buckling members to update their reduction factors
+# combUsers=shc.save_all_limit_states(xc_init.FEcase,modelSpace,limitStates,xcC.combContainer,setCalc,bucklingMembers=[sMemb.col01a,sMemb.col01b,sMemb.col02a,sMemb.col02b,sMemb.col03,sMemb.beam01])
+# print('combinations solved: ', list(combUsers.keys()))
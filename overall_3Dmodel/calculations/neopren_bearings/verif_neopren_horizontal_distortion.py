@@ -64,6 +64,12 @@ slowLcombs2check=['G1+GNC2',
 mixLcombs2check=combNeopren.mixComb
 dirParall='X' # dirección paralela a la viga o dintel (dimensiones del neopreno expresadas como dimParallxdimPerpxespesorNeto
 dirPerp='Y' # dirección perpendicular a la viga o dintel 
+# load cases whose effect on the horizontal displacements of the
+# bearings has a known sign (none: the sign of the displacements due to
+# each load case changes from one bearing to another, so only the
+# duplicated combinations are removed, see
+# support_functions/comb_pruning.py).
+signKnownLoadCases=[]
 # End data
 
 import os
@@ -78,6 +84,10 @@ import sys
 workingDirectory= default_config.findWorkingDirectory()+'/' #search env_config.py
 sys.path.append(workingDirectory)
 import env_config as env
+from support_functions import comb_pruning as cprun
+slowLcombs2check,slowLpruned=cprun.prune_expressions(slowLcombs2check,signKnownLoadCases,bothSigns=True)
+mixLcombs2check,mixLpruned=cprun.prune_expressions(mixLcombs2check,signKnownLoadCases,bothSigns=True)
+print('pruned combinations: ',slowLpruned,mixLpruned)
 # Json file with dictionary of results (resDict)
 
 inputFname=env.cfg.projectDirTree.getFullResultsPath()+'neopBearing/neopren_bearing_results.json'
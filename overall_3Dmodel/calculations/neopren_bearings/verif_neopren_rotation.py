@@ -43,6 +43,14 @@ rot0=0.003 #0.01 # giro inicial por falta de paralelismo entre tablero y apoyos
 G=800e3  #módulo de cortante del material elastomérico
 rotAxis2check='Y' # eje en torno al cual se produce la rotación del neopreno 
 combs2check=combNeopren.mixComb
+# load cases whose effect on the rotation of the bearings has a known
+# sign (vertical loads: on each bearing all of them rotate the beam end
+# in the same direction, which one depends on the bearing). The
+# combinations that can't give the maximum absolute rotation are not
+# checked (see support_functions/comb_pruning.py). If the results of a
+# bearing don't agree with this assumption all the combinations are
+# checked for it.
+signKnownLoadCases=['G1','G2']+['Q1A'+str(i) for i in range(1,12)]+['Q1B1']+['Q1C'+str(i) for i in range(1,12)]
 # End data
 
 import os
@@ -57,6 +65,10 @@ import sys
 workingDirectory= default_config.findWorkingDirectory()+'/' #search env_config.py
 sys.path.append(workingDirectory)
 import env_config as env
+from support_functions import comb_pruning as cprun
+# Combinations that can give the maximum absolute rotation.
+prunedCombs2check,prunedMap=cprun.prune_expressions(combs2check,signKnownLoadCases,bothSigns=True)
+print('combinations checked: ',len(prunedCombs2check),' of ',len(combs2check))
 # Json file with dictionary of results (resDict)
 
 inputFname=env.cfg.projectDirTree.getFullResultsPath()+'neopBearing/neopren_bearing_results.json'
@@ -87,7 +99,8 @@ for n in  neoprDatasdict.keys():
     dimPar,dimPerp,eneto=[int(d)*1e-3 for d in dimLst] # dimensiones de neopreno: paralelo a la viga, perpendicular a la viga, espesor neto
     S=dimPar*dimPerp/(2*t_layer_elastom*(dimPar+dimPerp)) # factor de forma
     sigma=0
-    for cmb in combs2check:
+    sameSign=cprun.have_same_sign([dataRDict[lc]['rot'+rotAxis2check] for lc in signKnownLoadCases if lc in dataRDict])
+    for cmb in (prunedCombs2check if sameSign else combs2check):
         lstLC=cmb.replace(' ','').split('+')
         rot=abs(sum([dataRDict[lc]['rot'+rotAxis2check] for lc in lstLC]))
         if rot > neoprRotationDict[n]['rotMax']:
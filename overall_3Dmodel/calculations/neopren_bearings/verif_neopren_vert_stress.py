@@ -46,6 +46,13 @@ import combNeopren
 sigma_min_adm= 3e6 # allowable minimum stress over neopren (Pa)
 sigma_max_adm= 12e6 # allowable maximum stress over neopren (Pa)
 combs2check=combNeopren.mixComb
+# load cases whose effect on the vertical reaction of the bearings has a
+# known sign (vertical loads: they compress the bearings). The
+# combinations that can't give the maximum (or the minimum) reaction are
+# not checked (see support_functions/comb_pruning.py). If the results of
+# a bearing don't agree with this assumption all the combinations are
+# checked for it.
+signKnownLoadCases=['G1','G2']+['Q1A'+str(i) for i in range(1,12)]+['Q1B1']+['Q1C'+str(i) for i in range(1,12)]
 
 # End data
 
@@ -61,6 +68,11 @@ import sys
 workingDirectory= default_config.findWorkingDirectory()+'/' #search env_config.py
 sys.path.append(workingDirectory)
 import env_config as env
+from support_functions import comb_pruning as cprun
+# Combinations that can give the maximum and the minimum reaction.
+combsNmax,prunedNmax=cprun.prune_expressions(combs2check,signKnownLoadCases)
+combsNmin,prunedNmin=cprun.prune_expressions(combs2check,{lc:-1 for lc in signKnownLoadCases})
+print('combinations checked for Nmax: ',len(combsNmax),' Nmin: ',len(combsNmin),' of ',len(combs2check))
 # Json file with dictionary of results (resDict)
 
 inputFname=env.cfg.projectDirTree.getFullResultsPath()+'neopBearing/neopren_bearing_results.json'
@@ -90,12 +102,19 @@ for n in  neoprDatasdict.keys():
     neoprVertStressDict[n]['Nmax']=0
     dimLst=dataDict['neopDim'].split('x')
     dimPar,dimPerp,eneto=[int(d)*1e-3 for d in dimLst] # dimensiones de neopreno: paralelo a la viga, perpendicular a la viga, espesor neto
-    for cmb in combs2check:
+    if cprun.have_same_sign([-dataRDict[lc]['Rz'] for lc in signKnownLoadCases if lc in dataRDict],sign=1):
+        combsMax,combsMin=combsNmax,combsNmin
+    else:
+        combsMax,combsMin=combs2check,combs2check
+    for cmb in combsMin:
         lstLC=cmb.replace(' ','').split('+')
         N=sum([-dataRDict[lc]['Rz'] for lc in lstLC])
         if N < neoprVertStressDict[n]['Nmin']:
             neoprVertStressDict[n]['Nmin']=N
             neoprVertStressDict[n]['combSgmin']=cmb
+    for cmb in combsMax:
+        lstLC=cmb.replace(' ','').split('+')
+        N=sum([-dataRDict[lc]['Rz'] for lc in lstLC])
         if N > neoprVertStressDict[n]['Nmax']:
             neoprVertStressDict[n]['Nmax']=N
             neoprVertStressDict[n]['combSgmax']=cmb
@@ -38,6 +38,7 @@ import pot_data as potD
 import load_case_definition as LCdef
 import data_material as datM
 import env_config as env
+from support_functions import lc_results_cache as lcrc
 
 # Json file with dictionary of results (resDict)
 resultFname=env.cfg.projectDirTree.getFullResultsPath()+'potBearing/pot_bearing_results.json'
@@ -66,25 +67,44 @@ f.close()
 solProc= predefined_solutions.SimpleStaticLinear(FEcase)
 solProc.setup()
 analysis= solProc.analysis
+# Results of the load cases stored by previous runs (recomputed when the
+# model or the data of the pot bearings and load cases change).
+definitionFiles=lcrc.get_model_definition_files(workingDirectory)+[model.__file__,potD.__file__,LCdef.__file__,datM.__file__,workingDirectory+'LC_graph.yaml']
+lcCache=lcrc.LoadCaseResultsCache.fromModel(cacheDir=env.cfg.projectDirTree.getFullResultsPath()+'lc_cache/',modelSpace=model.modelSpace,modelSet=model.prep.getSets.getSet('total'),definitionFiles=sorted(set(definitionFiles)))
+resKeys=['Rx','Ry','Rz','dispX','dispY','dispZ','rotX','rotY']
+def getPotResults():
+    ''' Return the stresses and strains of the pot bearings (one value
+    for each pot in the order of potD.potData).'''
+    retval={k:list() for k in resKeys}
+    for potId in potD.potData.keys():
+        potElem=potD.potData[potId]['potElem']
+        retval['Rx'].append(potElem.getMatXlocal().getStress())
+        retval['Ry'].append(potElem.getMatYlocal().getStress())
+        retval['Rz'].append(potElem.getMatZlocal().getStress())
+        retval['dispX'].append(potElem.getMatXlocal().getStrain())
+        retval['dispY'].append(potElem.getMatYlocal().getStrain())
+        retval['dispZ'].append(potElem.getMatZlocal().getStrain())
+        retval['rotX'].append(potElem.getMatTHXlocal().getStrain())
+        retval['rotY'].append(potElem.getMatTHYlocal().getStrain())
+    return retval
+
 for ky in LCdef.LCG_perm+LCdef.LCG_reol+ LCdef.LCG_vert + LCdef.LCG_fren +  LCdef.LCG_centr+ LCdef.LCG_lazo + LCdef.LCG_paseos + LCdef.LCG_viento+ LCdef.LCG_term:
     lcg=dictLCG[ky]
     lcName=lcg['LCname']
     lcDescr=lcg['description']
     model.modelSpace.removeAllLoadPatternsFromDomain()
+    # Solve each load case from the unloaded state: the cache puts the
+    # stored displacements in the nodes, so otherwise the next load case
+    # would start from a state that depends on which ones were cached.
+    model.modelSpace.revertToStart()
     model.modelSpace.addLoadCaseToDomain(lcName)
-    result= analysis.analyze(1)
-    for potId in potD.potData.keys():
-        potElem=potD.potData[potId]['potElem']
+    lcResults=lcCache.solve(lcName,analysis,elementResultsFunction=getPotResults)
+    potRes=lcResults['elementResults']
+    for i,potId in enumerate(potD.potData.keys()):
         potResdict[potId]['LCres'][lcName]=dict()
         potResdict[potId]['LCres'][lcName]['loadDescr']=lcDescr
-        potResdict[potId]['LCres'][lcName]['Rx']=potElem.getMatXlocal().getStress()
-        potResdict[potId]['LCres'][lcName]['Ry']=potElem.getMatYlocal().getStress()
-        potResdict[potId]['LCres'][lcName]['Rz']=potElem.getMatZlocal().getStress()
-        potResdict[potId]['LCres'][lcName]['dispX']=potElem.getMatXlocal().getStrain()
-        potResdict[potId]['LCres'][lcName]['dispY']=potElem.getMatYlocal().getStrain()
-        potResdict[potId]['LCres'][lcName]['dispZ']=potElem.getMatZlocal().getStrain()
-        potResdict[potId]['LCres'][lcName]['rotX']=potElem.getMatTHXlocal().getStrain()
-        potResdict[potId]['LCres'][lcName]['rotY']=potElem.getMatTHYlocal().getStrain()
+        for k in resKeys:
+            potResdict[potId]['LCres'][lcName][k]=float(potRes[k][i])
 
     
 # Dump the dictionary to json file
@@ -9,6 +9,9 @@ from misc_utils import log_messages as lmsg
 workingDirectory= default_config.setWorkingDirectory() 
 import env_config as env
 import xc_sets as xcS
+from support_functions import lc_dependencies as ldep
+from support_functions import batched_rc_check as brc
+from support_functions import rc_diagram_cache as rcdc
 
 import RC_sections_def
 if  RC_sections_def.plotSection:
@@ -22,8 +25,33 @@ lsd.LimitStateData.setEnvConfig(env.cfg)
 reinfConcreteSections= RC_sections_def.reinfConcreteSectionDistribution
 
 limitState=lsd.normalStressesResistance
-controller= lscheck.BiaxialBendingNormalStressController(limitState.label)
-mean=lsd.normalStressesResistance.check(crossSections= reinfConcreteSections, setCalc=setCalc,appendToResFile='N',listFile='N',calcMeanCF='Y', controller= controller)
+# if True, the elements are checked grouped by section (the interaction
+# diagram of each section is built only once and all the internal forces
+# are checked with a vectorized call). The results are written in a CSV
+# file (the display scripts use the results of the XC controller).
+batchedCheck=False
+verifName='verif_normStrsULS_batched' if batchedCheck else 'verif_normStrsULS'
+intForcesFileName=env.cfg.projectDirTree.getInternalForcesResultsPath()+'intForce_'+limitState.label+'.json'
+# skip the verification if neither the internal forces nor the sections
+# have changed since the last run (see calc_internalForces_ULS_SLS.py).
+depManifest=env.cfg.projectDirTree.getFullResultsPath()+'lc_dependencies.json'
+verifInput=ldep.get_files_fingerprint([RC_sections_def.__file__,intForcesFileName])
+if ldep.DependencyTracker.isVerificationUpToDate(depManifest,limitState.label,verifName,verifInput):
+    lmsg.warning('verification of '+limitState.label+' is up to date.')
+    quit()
+if batchedCheck:
+    # interaction surfaces stored by previous runs (recomputed only for
+    # the sections whose definition changes).
+    diagramCache=rcdc.InteractionDiagramCache(env.cfg.projectDirTree.getFullResultsPath()+'diagram_cache/')
+    checker=brc.BatchedNormalStressChecker(reinfConcreteSections,preprocessor=xcS.prep,matDiagType='d',diagramCache=diagramCache)
+    results=checker.check(intForcesFileName=intForcesFileName,elementTags=[e.tag for e in setCalc.elements])
+    brc.write_check_results(results,env.cfg.projectDirTree.getFullResultsPath()+'verifRsl_normStrsULS_batched.csv')
+    cfValues=[results[k][1] for k in results]
+    print('elements checked: ',len(set(k[0] for k in results)),' max. CF: ',max(cfValues),' mean CF: ',sum(cfValues)/len(cfValues))
+else:
+    controller= lscheck.BiaxialBendingNormalStressController(limitState.label)
+    mean=lsd.normalStressesResistance.check(crossSections= reinfConcreteSections, setCalc=setCalc,appendToResFile='N',listFile='N',calcMeanCF='Y', controller= controller)
+ldep.DependencyTracker.setVerified(depManifest,limitState.label,verifName,verifInput)
 
 
 
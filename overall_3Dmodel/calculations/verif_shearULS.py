@@ -11,6 +11,7 @@ from misc_utils import log_messages as lmsg
 workingDirectory= default_config.setWorkingDirectory() # search env_config.py
 import env_config as env
 import xc_sets as xcS
+from support_functions import lc_dependencies as ldep
 import shutil
 shutil.copyfile(env.cfg.projectDirTree.getInternalForcesResultsPath()+'intForce_ULS_normalStressesResistance.json', env.cfg.projectDirTree.getInternalForcesResultsPath()+'intForce_ULS_shearResistance.json')
 
@@ -31,8 +32,16 @@ class CustomSolver(predefined_solutions.PlainNewtonRaphsonMUMPS):
         super(CustomSolver,self).__init__(prb= prb, name= 'test', maxNumIter= 20, printFlag= 1, convergenceTestTol= 1e-3)
 
 limitState= lsd.shearResistance
+# skip the verification if neither the internal forces nor the sections
+# have changed since the last run (see calc_internalForces_ULS_SLS.py).
+depManifest=env.cfg.projectDirTree.getFullResultsPath()+'lc_dependencies.json'
+verifInput=ldep.get_files_fingerprint([RC_sections_def.__file__,env.cfg.projectDirTree.getInternalForcesResultsPath()+'intForce_'+limitState.label+'.json'])
+if ldep.DependencyTracker.isVerificationUpToDate(depManifest,limitState.label,'verif_shearULS',verifInput):
+    lmsg.warning('verification of '+limitState.label+' is up to date.')
+    quit()
 controller= lschck.ShearController(limitState.label, solutionProcedureType= CustomSolver)
 limitState.check(crossSections= reinfConcreteSections,setCalc=setCalc,appendToResFile='N',listFile='N', controller= controller)
+ldep.DependencyTracker.setVerified(depManifest,limitState.label,'verif_shearULS',verifInput)
 
 
 
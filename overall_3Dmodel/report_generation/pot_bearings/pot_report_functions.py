@@ -1,4 +1,5 @@
 from misc_utils import log_messages as lmsg
+from support_functions import comb_parser
 
 def gen_longtable_head(headTitles,justif,caption,tit2ndLine=None):
     '''Generate the heading tex lines for a long table
@@ -32,20 +33,14 @@ def gen_longtable_head(headTitles,justif,caption,tit2ndLine=None):
 def combs_diasggr(combDict):
     ''' Return a new dictionary of combinations with the keys 'combExpr': combination as usually expressed and 'combDisaggr'combination expressed as a list of [[factor,lcName],..] 
     '''
+    combMatrix=comb_parser.CombinationMatrix.fromDict(combDict)
     retval=dict()
     for k in combDict.keys():
         retval[k]=dict()
-        compExpr=combDict[k]
-        retval[k]['combExpr']=compExpr
-        disaggr=compExpr.split('+')
-        for i in range(len(disaggr)):
-            disaggr[i]=disaggr[i].split('*')
-            disaggr[i][0]=eval(disaggr[i][0])
-        retval[k]['combDisaggr']=disaggr
+        retval[k]['combExpr']=combDict[k]
+        retval[k]['combDisaggr']=combMatrix.getCombinationTerms(k)
     return retval
 
-
-            
 def gen_dict_Rmaxmin(combs,potResdict):
     ''' Generates the dictionary with maximum and minimum reactions:
         {'PU-P1':
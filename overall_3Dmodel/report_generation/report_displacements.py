@@ -10,6 +10,7 @@ import env_config as env
 import xc_init
 import xc_main_fullmodel
 import xc_lcases as xcLC
+from support_functions import lc_results_cache as lcrc
 # Common variables
 out=xc_init.out ; modelSpace=xc_init.modelSpace ; prep=xc_init.prep ; FEcase=xc_init.FEcase
 #
@@ -22,6 +23,9 @@ reportFile= reportPath+'report_displacements.tex'  #laTex file where to include
 solProc= predefined_solutions.SimpleStaticLinear(FEcase)
 solProc.setup()
 analysis= solProc.analysis # do not define analysis more than one
+# Results of the load cases stored by previous runs (recomputed when the
+# model changes).
+lcCache=lcrc.LoadCaseResultsCache.fromModel(cacheDir=env.cfg.projectDirTree.getFullResultsPath()+'lc_cache/',modelSpace=modelSpace,modelSet=prep.getSets.getSet('total'),definitionFiles=lcrc.get_model_definition_files(workingDirectory))
 textfl=open(reportFile,'w')  #tex file to be generated
 for ky in dictLCG.keys():
     lcg=dictLCG[ky]
@@ -30,7 +34,7 @@ for ky in dictLCG.keys():
     modelSpace.removeAllLoadPatternsFromDomain()
     modelSpace.revertToStart()
     modelSpace.addLoadCaseToDomain(lcName)
-    result= analysis.analyze(1)
+    lcResults=lcCache.solve(lcName,analysis)
     fLabel=lcName+'uX'
     grFileName=fLabel+'.png'
     caption=lcDescr+'. Desplazamiento transversal X (mm)'
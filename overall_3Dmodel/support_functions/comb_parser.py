@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+''' Parser of load combination expressions.
+
+Transforms load combination expressions like "1.35*G + 1.45*LM6 +
+0.90*TNeg" (or "G1+G2+GNC2" when all the factors are one) into a sparse
+factor matrix (number of combinations x number of load cases) with
+indexes of combination and load case names. The expressions are
+tokenized with a regular expression (no eval) and the whole set of
+combinations is parsed in a single pass, so the envelopes, the
+superposition of load cases and the report tables can work with the
+matrix instead of parsing the strings again.
+
+Usage:
+
+    combMatrix= CombinationMatrix.fromCombContainer(combContainer)
+    combMatrix.checkLoadCaseNames(loadPatternNames)
+    combResults= combMatrix.combine(loadCaseResults)
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import re
+import sys
+import numpy as np
+import scipy.sparse
+from misc_utils import log_messages as lmsg
+
+# Design situations of the combination containers.
+slsSituations= ['rare', 'freq', 'qp', 'earthquake']
+ulsSituations= ['perm', 'acc', 'fatigue', 'earthquake']
+
+_number= r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+# Term of a combination: sign, factors (optional) and load case name.
+_termRegex= re.compile(r'\s*([+-]?)\s*((?:'+_number+r'\s*\*\s*)*)([A-Za-z_][\w.]*)\s*')
+_factorRegex= re.compile(_number)
+
+def parse_combination_expression(expr):
+    ''' Return the list of (factor, load case name) pairs of the
+        combination expression argument (i.e. "1.35*G + 1.5*0.6*Q1 - T"
+        returns [(1.35, 'G'), (0.9, 'Q1'), (-1.0, 'T')]).
+
+    :param expr: combination expression.
+    '''
+    retval= list()
+    pos= 0
+    expr= expr.strip()
+    while pos<len(expr):
+        match= _termRegex.match(expr, pos)
+        if (match is None) or (match.end()==pos) or (retval and not match.group(1)):
+            methodName= sys._getframe(0).f_code.co_name
+            lmsg.error(methodName+"; can't parse combination expression: '"+expr+"' at position "+str(pos))
+            exit(1)
+        sign, factors, lcName= match.groups()
+        factor= -1.0 if sign=='-' else 1.0
+        for f in _factorRegex.findall(factors):
+            factor*= float(f)
+        retval.append((factor, lcName))
+        pos= match.end()
+    return retval
+
+def get_combination_dict(expr):
+    ''' Return a dictionary (load case name -> factor) for the combination
+        expression argument. The factors of repeated load cases are added.
+
+    :param expr: combination expression.
+    '''
+    retval= dict()
+    for factor, lcName in parse_combination_expression(expr):
+        retval[lcName]= retval.get(lcName, 0.0)+factor
+    return retval
+
+class CombinationMatrix(object):
+    ''' Sparse factor matrix of a set of load combinations.
+
+    :ivar combNames: names of the combinations (rows).
+    :ivar combExprs: expressions of the combinations.
+    :ivar loadCaseNames: names of the load cases (columns).
+    :ivar factors: sparse matrix of factors (CSR format).
+    '''
+    def __init__(self, combNames, combExprs, loadCaseNames= None):
+        ''' Constructor.
+
+        :param combNames: names of the combinations.
+        :param combExprs: expressions of the combinations.
+        :param loadCaseNames: names of the load cases (columns of the
+                              matrix). If None, the load cases that appear
+                              in the combinations are used, in order of
+                              appearance.
+        '''
+        self.combNames= list(combNames)
+        self.combExprs= list(combExprs)
+        self.combIndexes= {name: i for i, name in enumerate(self.combNames)}
+        fixedColumns= loadCaseNames is not None
+        self.loadCaseNames= list(loadCaseNames) if fixedColumns else list()
+        self.loadCaseIndexes= {name: j for j, name in enumerate(self.loadCaseNames)}
+        rows= list(); columns= list(); values= list()
+        for i, expr in enumerate(self.combExprs):
+            for factor, lcName in parse_combination_expression(expr):
+                if lcName not in self.loadCaseIndexes:
+                    if fixedColumns:
+                        className= type(self).__name__
+                        methodName= sys._getframe(0).f_code.co_name
+                        lmsg.error(className+'.'+methodName+"; load case: '"+lcName+"' of combination: '"+self.combNames[i]+"' not in the list of load cases.")
+                        exit(1)
+                    self.loadCaseIndexes[lcName]= len(self.loadCaseNames)
+                    self.loadCaseNames.append(lcName)
+                rows.append(i)
+                columns.append(self.loadCaseIndexes[lcName])
+                values.append(factor)
+        shape= (len(self.combNames), len(self.loadCaseNames))
+        # Duplicated entries are added by the conversion to CSR.
+        self.factors= scipy.sparse.coo_matrix((values, (rows, columns)), shape= shape).tocsr()
+
+    @classmethod
+    def fromDict(cls, combDict, loadCaseNames= None):
+        ''' Create the matrix from a dictionary (combination name ->
+            expression or object with an expr attribute).
+
+        :param combDict: dictionary of combinations.
+        :param loadCaseNames: names of the load cases (columns).
+        '''
+        combNames= list(combDict.keys())
+        combExprs= [getattr(combDict[key], 'expr', combDict[key]) for key in combNames]
+        return cls(combNames, combExprs, loadCaseNames)
+
+    @classmethod
+    def fromExpressions(cls, combExprs, loadCaseNames= None):
+        ''' Create the matrix from a list of combination expressions (the
+            expressions are used also as names).
+
+        :param combExprs: list of combination expressions.
+        :param loadCaseNames: names of the load cases (columns).
+        '''
+        return cls(combExprs, combExprs, loadCaseNames)
+
+    @classmethod
+    def fromCombContainer(cls, combContainer, loadCaseNames= None):
+        ''' Create the matrix with all the combinations of the container
+            argument.
+
+        :param combContainer: container of load combinations.
+        :param loadCaseNames: names of the load cases (columns).
+        '''
+        combNames= list()
+        combExprs= list()
+        for limitStateCombs, situations in [(combContainer.SLS, slsSituations), (combContainer.ULS, ulsSituations)]:
+            for situation in situations:
+                situationCombs= getattr(limitStateCombs, situation, None)
+                if situationCombs:
+                    for key in situationCombs:
+                        combNames.append(key)
+                        combExprs.append(situationCombs[key].expr)
+        return cls(combNames, combExprs, loadCaseNames)
+
+    def getNumberOfCombinations(self):
+        ''' Return the number of combinations.'''
+        return len(self.combNames)
+
+    def getNumberOfLoadCases(self):
+        ''' Return the number of load cases.'''
+        return len(self.loadCaseNames)
+
+    def getDenseFactors(self):
+        ''' Return the factor matrix as a NumPy array.'''
+        return self.factors.toarray()
+
+    def getCombinationFactors(self, combName):
+        ''' Return the factors of the combination argument as a NumPy
+            array (one value for each load case).
+
+        :param combName: name of the combination.
+        '''
+        return self.factors.getrow(self.combIndexes[combName]).toarray().ravel()
+
+    def getCombinationDict(self, combName):
+        ''' Return the dictionary (load case name -> factor) of the
+            combination argument.
+
+        :param combName: name of the combination.
+        '''
+        row= self.factors.getrow(self.combIndexes[combName])
+        return {self.loadCaseNames[j]: float(v) for j, v in zip(row.indices, row.data)}
+
+    def getCombinationTerms(self, combName):
+        ''' Return the list of [factor, load case name] pairs of the
+            combination argument.
+
+        :param combName: name of the combination.
+        '''
+        return [[factor, lcName] for lcName, factor in self.getCombinationDict(combName).items()]
+
+    def getSubMatrix(self, combNames):
+        ''' Return the matrix of the combinations argument.
+
+        :param combNames: names of the combinations.
+        '''
+        rows= [self.combIndexes[name] for name in combNames]
+        retval= CombinationMatrix([], [], self.loadCaseNames)
+        retval.combNames= list(combNames)
+        retval.combExprs= [self.combExprs[i] for i in rows]
+        retval.combIndexes= {name: i for i, name in enumerate(retval.combNames)}
+        retval.factors= self.factors[rows]
+        return retval
+
+    def checkLoadCaseNames(self, loadPatternNames):
+        ''' Check that all the load cases of the combinations are in the
+            list of defined load patterns. Return the names of the
+            undefined load cases.
+
+        :param loadPatternNames: names of the defined load patterns (i.e.
+                                 preprocessor.getLoadHandler.getLoadPatterns.getKeys()).
+        '''
+        defined= set(loadPatternNames)
+        retval= [lcName for lcName in self.loadCaseNames if lcName not in defined]
+        if retval:
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            lmsg.error(className+'.'+methodName+'; undefined load cases: '+str(retval))
+        return retval
+
+    def combine(self, loadCaseResults):
+        ''' Return the results of the combinations (array with shape
+            (number of combinations, ...)) from the results of the load
+            cases (array with shape (number of load cases, ...)).
+
+        :param loadCaseResults: results of the load cases (in the order of
+                                loadCaseNames).
+        '''
+        loadCaseResults= np.asarray(loadCaseResults, dtype= float)
+        shape= loadCaseResults.shape
+        values= self.factors @ loadCaseResults.reshape(shape[0], -1)
+        return np.asarray(values).reshape((self.getNumberOfCombinations(),)+shape[1:])
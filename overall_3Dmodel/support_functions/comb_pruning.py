@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+''' Dominance pruning of load combinations.
+
+A combination B is dominated by another combination A when, for each
+of the actions whose effect has a known sign, the contribution of the
+action to the governing effect in A is equal or larger than in B (the
+factor times the sign of the effect is equal or larger). Then B cannot
+govern and it doesn't need to be solved. The sign of the effect is +1
+when the governing effect grows with the factor (i.e. the unfavourable
+permanent loads or the traffic loads on a bearing) and -1 when it
+decreases.
+
+The actions whose effect sign is not known must have exactly the same
+factor in both combinations (a larger factor of an action that can be
+favourable or unfavourable doesn't make the combination more
+demanding). If no action is declared sign-known only the duplicated
+combinations are pruned.
+
+When both the maximum and the minimum of the effect are checked (or
+its absolute value) a combination is pruned only if it is dominated
+for both signs (bothSigns argument).
+
+The pruning returns the mapping from each pruned combination to the
+combination that dominates it, so it can be traced in the calculation
+report.
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import csv
+import numpy as np
+from support_functions import lin_superposition as lsup
+from support_functions.comb_parser import CombinationMatrix, slsSituations, ulsSituations
+
+def get_effect_signs(loadCaseNames, signKnownLoadCases= None):
+    ''' Return an array with the sign of the effect of each load case
+        (+1 or -1 for the sign-known load cases, 0 for the rest).
+
+    :param loadCaseNames: names of the load cases.
+    :param signKnownLoadCases: list with the names of the load cases
+                               whose effect grows with the factor or
+                               dictionary (load case name -> sign of its
+                               effect: +1 or -1).
+    '''
+    if signKnownLoadCases is None:
+        signKnownLoadCases= list()
+    if not isinstance(signKnownLoadCases, dict):
+        signKnownLoadCases= {lcName: 1.0 for lcName in signKnownLoadCases}
+    return np.array([np.sign(signKnownLoadCases.get(lcName, 0.0)) for lcName in loadCaseNames], dtype= float)
+
+def get_dominance_matrix(factors, effectSigns, tol= 1e-9):
+    ''' Return a boolean matrix whose (i,j) element is True if the
+        combination j dominates (or is equal to) the combination i.
+
+    :param factors: matrix of factors (number of combinations x number
+                    of load cases).
+    :param effectSigns: array with the sign of the effect of each load
+                        case (+1 or -1 if it is known, 0 otherwise).
+    :param tol: tolerance when comparing factors.
+    '''
+    factors= np.asarray(factors, dtype= float)
+    effectSigns= np.asarray(effectSigns, dtype= float)
+    signKnown= effectSigns!=0.0
+    numCombs= factors.shape[0]
+    retval= np.zeros((numCombs, numCombs), dtype= bool)
+    contributions= factors*effectSigns
+    for i in range(numCombs):
+        fi= factors[i]
+        # Equal or larger contribution to the effect for the sign-known
+        # load cases.
+        knownOk= contributions>=contributions[i]-tol
+        # Same factor for the rest.
+        equal= np.abs(factors-fi)<=tol
+        retval[i]= np.all(np.where(signKnown, knownOk, equal), axis= 1)
+    return retval
+
+def _get_pruned(dominates):
+    ''' Return a boolean array, True for the combinations that are
+        dominated by another one.
+
+    :param dominates: dominance matrix (see get_dominance_matrix).
+    '''
+    numCombs= dominates.shape[0]
+    # Combination i is pruned if there is another combination j that
+    # dominates it and is not dominated by it (or that is equal to it
+    # and appears first).
+    index= np.arange(numCombs)
+    strict= dominates & ~dominates.T
+    duplicated= dominates & dominates.T & (index[None,:]<index[:,None])
+    return np.any(strict | duplicated, axis= 1)
+
+def prune_dominated(combNames, loadCaseNames, factors, signKnownLoadCases= None, tol= 1e-9, bothSigns= False):
+    ''' Return the names of the combinations that are not dominated by
+        other combination and a dictionary with the combination that
+        dominates each of the pruned ones.
+
+    :param combNames: names of the combinations (rows of the factor
+                      matrix).
+    :param loadCaseNames: names of the load cases (columns of the factor
+                          matrix).
+    :param factors: matrix of factors (number of combinations x number
+                    of load cases).
+    :param signKnownLoadCases: list with the names of the load cases
+                               whose effect grows with the factor or
+                               dictionary (load case name -> sign of its
+                               effect: +1 or -1).
+    :param tol: tolerance when comparing factors.
+    :param bothSigns: if True, both the maximum and the minimum of the
+                      effect are checked, so a combination is pruned
+                      only if it is dominated for the effect signs
+                      and for the opposite ones (the dominating
+                      combinations are separated by ' / ' in the
+                      mapping).
+    '''
+    effectSigns= get_effect_signs(loadCaseNames, signKnownLoadCases)
+    signsList= [effectSigns, -effectSigns] if bothSigns else [effectSigns]
+    dominances= [get_dominance_matrix(factors, signs, tol) for signs in signsList]
+    pruned= np.all([_get_pruned(dominates) for dominates in dominances], axis= 0)
+    kept= [name for name, p in zip(combNames, pruned) if not p]
+    prunedMap= dict()
+    for i in np.where(pruned)[0]:
+        dominatingCombs= list()
+        for dominates in dominances:
+            # The dominance is a partial order, so one of the
+            # combinations that are not dominated for these signs
+            # dominates the pruned one.
+            candidates= np.where(~_get_pruned(dominates))[0]
+            j= candidates[np.argmax(dominates[i, candidates])]
+            if combNames[j] not in dominatingCombs:
+                dominatingCombs.append(combNames[j])
+        prunedMap[combNames[i]]= ' / '.join(dominatingCombs)
+    return kept, prunedMap
+
+def prune_expressions(combExprs, signKnownLoadCases= None, tol= 1e-9, bothSigns= False):
+    ''' Return the combination expressions of the argument that are not
+        dominated and the mapping of the pruned ones (see
+        prune_dominated).
+
+    :param combExprs: list of combination expressions.
+    :param signKnownLoadCases: list with the names of the load cases
+                               whose effect grows with the factor or
+                               dictionary (load case name -> sign of its
+                               effect: +1 or -1).
+    :param tol: tolerance when comparing factors.
+    :param bothSigns: if True, prune only the combinations dominated for
+                      both signs of the effect (see prune_dominated).
+    '''
+    combMatrix= CombinationMatrix.fromExpressions(combExprs)
+    return prune_dominated(combMatrix.combNames, combMatrix.loadCaseNames, combMatrix.getDenseFactors(), signKnownLoadCases, tol, bothSigns)
+
+def have_same_sign(values, sign= None, relTol= 1e-6):
+    ''' Return true if all the values argument have the same sign (the
+        values smaller than relTol times the maximum absolute value are
+        considered zero). Used to check the sign-known assumption with
+        the computed effects of the load cases.
+
+    :param values: values to check.
+    :param sign: if not None, sign that the values must have (+1 or -1).
+    :param relTol: relative tolerance.
+    '''
+    values= np.asarray(values, dtype= float)
+    if len(values)==0:
+        return True
+    threshold= relTol*np.max(np.abs(values))
+    positive= np.any(values>threshold)
+    negative= np.any(values<-threshold)
+    if sign is None:
+        return not (positive and negative)
+    elif sign>0:
+        return not negative
+    else:
+        return not positive
+
+def prune_combinations(combinations, signKnownLoadCases= None, tol= 1e-9, bothSigns= False):
+    ''' Return the names of the combinations of the dictionary argument
+        that are not dominated and the mapping of the pruned ones (see
+        prune_dominated).
+
+    :param combinations: dictionary of load combinations (objects with
+                         name and expr attributes).
+    :param signKnownLoadCases: list with the names of the load cases
+                               whose effect grows with the factor or
+                               dictionary (load case name -> sign of its
+                               effect: +1 or -1).
+    :param tol: tolerance when comparing factors.
+    :param bothSigns: if True, prune only the combinations dominated for
+                      both signs of the effect (see prune_dominated).
+    '''
+    combNames= list(combinations.keys())
+    loadCaseNames, factors= lsup.get_factor_matrix(combinations)
+    return prune_dominated(combNames, loadCaseNames, factors, signKnownLoadCases, tol, bothSigns)
+
+def prune_comb_container(combContainer, signKnownLoadCases= None, tol= 1e-9, bothSigns= False):
+    ''' Remove the dominated combinations from each of the situations
+        of the container argument and return the mapping of the removed
+        combinations to the combinations that dominate them.
+
+    :param combContainer: container of load combinations.
+    :param signKnownLoadCases: list with the names of the load cases
+                               whose effect grows with the factor or
+                               dictionary (load case name -> sign of its
+                               effect: +1 or -1).
+    :param tol: tolerance when comparing factors.
+    :param bothSigns: if True, prune only the combinations dominated for
+                      both signs of the effect (see prune_dominated).
+    '''
+    retval= dict()
+    for limitStateCombs, situations in [(combContainer.SLS, slsSituations), (combContainer.ULS, ulsSituations)]:
+        for situation in situations:
+            situationCombs= getattr(limitStateCombs, situation, None)
+            if situationCombs and len(situationCombs)>1:
+                kept, prunedMap= prune_combinations(situationCombs, signKnownLoadCases, tol, bothSigns)
+                for name in prunedMap:
+                    situationCombs.pop(name)
+                retval.update(prunedMap)
+    return retval
+
+def write_pruning_report(prunedMap, fileName):
+    ''' Write the pruned combinations and the combinations that dominate
+        them in a CSV file.
+
+    :param prunedMap: dictionary (pruned combination -> dominating
+                      combination).
+    :param fileName: name of the output file.
+    '''
+    with open(fileName, 'w', newline= '') as f:
+        writer= csv.writer(f)
+        writer.writerow(['pruned_combination', 'dominated_by'])
+        for name in prunedMap:
+            writer.writerow([name, prunedMap[name]])
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+''' Dependency tracking between load patterns, combinations and limit
+state results for incremental re-analysis.
+
+When only some load patterns change (i.e. the position of the wheels of
+a VehicleDistrLoad in xc_roadway_loads.py) there is no need to solve again
+the rest of the load patterns nor to rewrite the results of the limit
+states whose combinations don't use the changed ones. The tracker keeps
+in a JSON manifest:
+
+- the fingerprint (hash) of the definition of each load pattern.
+- for each limit state, the fingerprint of its results (computed from
+  the expressions of its combinations and the fingerprints of the load
+  patterns they use).
+- for each verification, the fingerprint of the limit state results
+  that were verified and of its input files (the internal forces file
+  is included, so a verification is not skipped when the internal
+  forces are rewritten by a non-incremental run that doesn't update the
+  manifest).
+
+Comparing the current fingerprints with the stored ones it gives the
+changed load patterns, the affected combinations and the limit states
+whose results (and verifications) must be rebuilt.
+
+Usage:
+
+    tracker= DependencyTracker(manifestFileName, modelFingerprint, get_load_case_fingerprints(loadDefinitions))
+    if tracker.isLimitStateAffected(ls, combContainer):
+        ...
+        tracker.setLimitStateUpdated(ls, combContainer)
+    tracker.write()
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import os
+import json
+import types
+import hashlib
+import numpy as np
+from support_functions import comb_parser
+
+def _get_xc_values(obj):
+    ''' Return the numeric values of the XC (or geom) object argument
+        (i.e. the components of an xc.Vector or the coordinates of a
+        geom.Pos3d) or None if they are unknown.
+
+    :param obj: XC object.
+    '''
+    typeName= type(obj).__name__
+    try:
+        if typeName.endswith('Matrix') and hasattr(obj, 'noRows'):
+            return np.array([[obj(i, j) for j in range(obj.noCols)] for i in range(obj.noRows)], dtype= float)
+        if hasattr(obj, '__len__') and hasattr(obj, '__getitem__'):
+            values= list(obj)
+            if all(isinstance(v, (int, float)) for v in values):
+                return np.array(values, dtype= float)
+        coordinates= [getattr(obj, attr) for attr in ['x', 'y', 'z'] if hasattr(obj, attr)]
+        if coordinates and all(isinstance(v, (int, float)) for v in coordinates):
+            return np.array(coordinates, dtype= float)
+    except Exception:
+        pass
+    return None
+
+def _update_hash(h, obj, visited, depth= 0, maxDepth= 8):
+    ''' Update the hash argument with the definition of the object.
+
+    :param h: hash object.
+    :param obj: object to hash.
+    :param visited: identifiers of the objects already hashed (avoids
+                    infinite recursion on cyclic references).
+    :param depth: current recursion depth.
+    :param maxDepth: maximum recursion depth.
+    '''
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        h.update(repr(obj).encode('utf-8'))
+    elif isinstance(obj, np.ndarray):
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, types.CodeType):
+        h.update(obj.co_code)
+        h.update(repr(obj.co_names).encode('utf-8'))
+        for const in obj.co_consts:
+            _update_hash(h, const, visited, depth+1, maxDepth)
+    elif isinstance(obj, (types.ModuleType, type)):
+        h.update(getattr(obj, '__name__', '').encode('utf-8'))
+    elif depth>=maxDepth or id(obj) in visited:
+        h.update(type(obj).__name__.encode('utf-8'))
+    elif isinstance(obj, dict):
+        visited.add(id(obj))
+        for key in sorted(obj.keys(), key= str):
+            h.update(str(key).encode('utf-8'))
+            _update_hash(h, obj[key], visited, depth+1, maxDepth)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        visited.add(id(obj))
+        items= sorted(obj, key= repr) if isinstance(obj, (set, frozenset)) else obj
+        for item in items:
+            _update_hash(h, item, visited, depth+1, maxDepth)
+    elif callable(obj) and hasattr(obj, '__code__'):
+        # Code, default values, closure and the global variables used.
+        visited.add(id(obj))
+        code= obj.__code__
+        _update_hash(h, code, visited, depth+1, maxDepth)
+        _update_hash(h, obj.__defaults__, visited, depth+1, maxDepth)
+        if obj.__closure__:
+            for cell in obj.__closure__:
+                _update_hash(h, cell.cell_contents, visited, depth+1, maxDepth)
+        objGlobals= getattr(obj, '__globals__', dict())
+        for name in code.co_names:
+            if name in objGlobals:
+                h.update(name.encode('utf-8'))
+                _update_hash(h, objGlobals[name], visited, depth+1, maxDepth)
+    elif type(type(obj)).__module__=='Boost.Python':
+        # XC object: numeric values (i.e. load vectors) or name and
+        # entities (i.e. sets).
+        visited.add(id(obj))
+        h.update(type(obj).__name__.encode('utf-8'))
+        values= _get_xc_values(obj)
+        if values is not None:
+            h.update(values.tobytes())
+        else:
+            h.update(str(getattr(obj, 'name', '')).encode('utf-8'))
+            for attr in ['nodes', 'elements']:
+                if hasattr(obj, attr):
+                    h.update(str(sorted([item.tag for item in getattr(obj, attr)])).encode('utf-8'))
+    elif hasattr(obj, '__dict__'):
+        visited.add(id(obj))
+        h.update(type(obj).__name__.encode('utf-8'))
+        _update_hash(h, vars(obj), visited, depth+1, maxDepth)
+    else:
+        h.update(repr(obj).encode('utf-8'))
+
+def get_fingerprint(obj):
+    ''' Return a hash of the definition of the object argument (numbers,
+        strings, arrays, containers, the attributes of Python objects and
+        the code, closure and global variables of functions). The XC
+        vectors, matrices and points are hashed by their values, the rest
+        of XC objects are identified by their name and entities.
+
+    :param obj: object to hash.
+    '''
+    h= hashlib.sha256()
+    _update_hash(h, obj, set())
+    return h.hexdigest()
+
+def get_files_fingerprint(fileNames):
+    ''' Return a hash of the contents of the files argument.
+
+    :param fileNames: names of the files.
+    '''
+    h= hashlib.sha256()
+    for fileName in fileNames:
+        with open(fileName, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def get_load_case_fingerprints(loadDefinitions):
+    ''' Return a dictionary with the fingerprint of each of the load cases
+        of the argument.
+
+    :param loadDefinitions: dictionary (load case name -> list of the
+                            loads of the load case).
+    '''
+    return {lcName: get_fingerprint(loadDefinitions[lcName]) for lcName in loadDefinitions}
+
+class DependencyTracker(object):
+    ''' Track the dependencies between load patterns, combinations and
+        limit state results.
+
+    :ivar manifestFileName: name of the file that stores the fingerprints
+                            of the previous run.
+    :ivar modelFingerprint: hash of the model (without the loads). If it
+                            changes all the load cases are considered
+                            changed.
+    :ivar loadCaseFingerprints: current fingerprints of the load cases.
+    :ivar manifest: fingerprints of the previous run.
+    '''
+    def __init__(self, manifestFileName, modelFingerprint, loadCaseFingerprints):
+        ''' Constructor.
+
+        :param manifestFileName: name of the file that stores the
+                                 fingerprints of the previous run.
+        :param modelFingerprint: hash of the model (without the loads).
+        :param loadCaseFingerprints: current fingerprints of the load
+                                     cases (dictionary: load case name ->
+                                     fingerprint).
+        '''
+        self.manifestFileName= manifestFileName
+        self.modelFingerprint= modelFingerprint
+        self.loadCaseFingerprints= dict(loadCaseFingerprints)
+        self.manifest= self.read(manifestFileName)
+        if(self.manifest.get('model')!=modelFingerprint):
+            # The model has changed: nothing can be reused.
+            self.manifest= {'model': modelFingerprint, 'loadCases': dict(), 'limitStates': dict()}
+        self.updatedLoadCases= set()
+
+    @staticmethod
+    def read(manifestFileName):
+        ''' Return the contents of the manifest file (an empty manifest if
+            the file doesn't exists).
+
+        :param manifestFileName: name of the manifest file.
+        '''
+        if os.path.isfile(manifestFileName):
+            with open(manifestFileName, 'r') as f:
+                return json.load(f)
+        return {'model': None, 'loadCases': dict(), 'limitStates': dict()}
+
+    def write(self):
+        ''' Write the manifest file.'''
+        with open(self.manifestFileName, 'w') as f:
+            json.dump(self.manifest, f, indent= 1)
+
+    def getChangedLoadCases(self):
+        ''' Return the names of the load cases whose definition has changed
+            since the previous run (or that are new).'''
+        stored= self.manifest['loadCases']
+        return [lcName for lcName in self.loadCaseFingerprints if stored.get(lcName)!=self.loadCaseFingerprints[lcName]]
+
+    def isLoadCaseChanged(self, loadCaseName):
+        ''' Return true if the definition of the load case has changed since
+            the results were stored.
+
+        :param loadCaseName: name of the load case.
+        '''
+        if loadCaseName in self.updatedLoadCases:
+            return False
+        if loadCaseName not in self.loadCaseFingerprints:
+            return True # not tracked.
+        return self.manifest['loadCases'].get(loadCaseName)!=self.loadCaseFingerprints[loadCaseName]
+
+    def setLoadCaseUpdated(self, loadCaseName):
+        ''' Record that the stored results of the load case correspond to
+            its current definition.
+
+        :param loadCaseName: name of the load case.
+        '''
+        if loadCaseName in self.loadCaseFingerprints:
+            self.manifest['loadCases'][loadCaseName]= self.loadCaseFingerprints[loadCaseName]
+        self.updatedLoadCases.add(loadCaseName)
+
+    def getAffectedCombinations(self, combinations):
+        ''' Return the names of the combinations of the argument that use
+            some of the changed load cases.
+
+        :param combinations: dictionary of load combinations (objects with
+                             name and expr attributes).
+        '''
+        combMatrix= comb_parser.CombinationMatrix.fromDict(combinations)
+        changed= set(self.getChangedLoadCases())
+        changedColumns= [j for j, lcName in enumerate(combMatrix.loadCaseNames) if lcName in changed]
+        if not changedColumns:
+            return list()
+        affected= combMatrix.factors[:, changedColumns].getnnz(axis= 1)>0
+        return [name for name, a in zip(combMatrix.combNames, affected) if a]
+
+    def getResultsFingerprint(self, limitState, combContainer):
+        ''' Return the fingerprint of the results of the limit state
+            argument (computed from its combinations and the fingerprints
+            of the load cases they use). Return None if some of the load
+            cases is not tracked.
+
+        :param limitState: limit state data.
+        :param combContainer: container of load combinations.
+        '''
+        combinations= limitState.getCorrespondingLoadCombinations(combContainer)
+        combMatrix= comb_parser.CombinationMatrix.fromDict(combinations)
+        if any(lcName not in self.loadCaseFingerprints for lcName in combMatrix.loadCaseNames):
+            return None
+        definition= [self.modelFingerprint, getattr(limitState, 'woodArmerAlsoForAxialForces', None)]
+        definition.append([(name, combMatrix.getCombinationDict(name)) for name in combMatrix.combNames])
+        definition.append([self.loadCaseFingerprints.get(lcName, lcName) for lcName in combMatrix.loadCaseNames])
+        return get_fingerprint(definition)
+
+    def isLimitStateAffected(self, limitState, combContainer):
+        ''' Return true if the results of the limit state argument must be
+            rebuilt.
+
+        :param limitState: limit state data.
+        :param combContainer: container of load combinations.
+        '''
+        stored= self.manifest['limitStates'].get(limitState.label, dict())
+        resultsFingerprint= self.getResultsFingerprint(limitState, combContainer)
+        return (resultsFingerprint is None) or (stored.get('results')!=resultsFingerprint)
+
+    def setLimitStateUpdated(self, limitState, combContainer):
+        ''' Record that the results of the limit state have been rebuilt
+            (the previous verifications are no longer valid).
+
+        :param limitState: limit state data.
+        :param combContainer: container of load combinations.
+        '''
+        self.manifest['limitStates'][limitState.label]= {'results': self.getResultsFingerprint(limitState, combContainer), 'verified': dict()}
+
+    @staticmethod
+    def isVerificationUpToDate(manifestFileName, limitStateLabel, verificationName, inputFingerprint= ''):
+        ''' Return true if the verification argument has been performed
+            with the current results of the limit state (used by the
+            verification scripts to skip the checking).
+
+        :param manifestFileName: name of the manifest file.
+        :param limitStateLabel: label of the limit state.
+        :param verificationName: name of the verification.
+        :param inputFingerprint: hash of the rest of the data of the
+                                 verification (i.e. the reinforced concrete
+                                 sections and the internal forces file).
+        '''
+        stored= DependencyTracker.read(manifestFileName)['limitStates'].get(limitStateLabel)
+        if stored is None:
+            return False
+        return stored['verified'].get(verificationName)==stored['results']+inputFingerprint
+
+    @staticmethod
+    def setVerified(manifestFileName, limitStateLabel, verificationName, inputFingerprint= ''):
+        ''' Record that the verification argument has been performed with
+            the current results of the limit state.
+
+        :param manifestFileName: name of the manifest file.
+        :param limitStateLabel: label of the limit state.
+        :param verificationName: name of the verification.
+        :param inputFingerprint: hash of the rest of the data of the
+                                 verification.
+        '''
+        manifest= DependencyTracker.read(manifestFileName)
+        stored= manifest['limitStates'].get(limitStateLabel)
+        if stored is not None:
+            stored['verified'][verificationName]= stored['results']+inputFingerprint
+            with open(manifestFileName, 'w') as f:
+                json.dump(manifest, f, indent= 1)
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+''' On-disk cache of the results of the simple load cases.
+
+The report, display and verification scripts rebuild the model and solve
+again the simple load cases listed in LC_graph.yaml. The results of each
+load case (nodal displacements, reactions and, optionally, element
+results) are stored in a NumPy .npz file whose name contains a hash
+(fingerprint) of the model and of the load definition, so they are
+reused by any later script until the model changes.
+
+Only the nodal displacements are put back in the model when the results
+are read from the cache: the state of the elements and materials is not
+restored. So the element results (i.e. internal forces) must be stored
+with elementResultsFunction and the cache is intended for linear
+analysis; in nonlinear models the state of the elements after a cached
+load case is not the solved one.
+
+The fingerprint is computed from:
+
+- the mesh: node tags and coordinates, element tags, types and
+  connectivity.
+- the contents of the files that define the model (materials,
+  boundary conditions, loads and load patterns). By default the
+  data_*.py and xc_*.py modules of the working directory.
+
+Usage:
+
+    lcCache= LoadCaseResultsCache.fromModel(cacheDir, modelSpace, modelSet, definitionFiles)
+    modelSpace.removeAllLoadPatternsFromDomain()
+    modelSpace.revertToStart()
+    modelSpace.addLoadCaseToDomain(lcName)
+    results= lcCache.solve(lcName, analysis)
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import os
+import sys
+import glob
+import hashlib
+import numpy as np
+import xc
+from misc_utils import log_messages as lmsg
+
+def get_model_definition_files(workingDirectory, patterns= ['data_*.py', 'xc_*.py']):
+    ''' Return the (sorted) list of the files that define the model.
+
+    :param workingDirectory: directory of the model.
+    :param patterns: patterns of the file names.
+    '''
+    retval= list()
+    for pattern in patterns:
+        retval.extend(glob.glob(os.path.join(workingDirectory, pattern)))
+    return sorted(set(retval))
+
+def get_model_fingerprint(modelSet, definitionFiles= None):
+    ''' Return a hash of the mesh of the set argument and of the contents
+        of the files that define the model.
+
+    :param modelSet: set with the nodes and elements of the model.
+    :param definitionFiles: files that define materials, constraints and
+                            loads.
+    '''
+    h= hashlib.sha256()
+    nodeData= list()
+    for n in modelSet.nodes:
+        pos= n.getInitialPos3d
+        nodeData.append([n.tag, pos.x, pos.y, pos.z])
+    nodeData.sort()
+    h.update(np.array(nodeData, dtype= float).tobytes())
+    elementData= list()
+    for e in modelSet.elements:
+        elementData.append(str(e.tag)+':'+e.type()+':'+str(list(e.getNodes.getExternalNodes)))
+    elementData.sort()
+    h.update('\n'.join(elementData).encode('utf-8'))
+    if definitionFiles:
+        for fileName in definitionFiles:
+            with open(fileName, 'rb') as f:
+                h.update(os.path.basename(fileName).encode('utf-8'))
+                h.update(f.read())
+    return h.hexdigest()
+
+class LoadCaseResultsCache(object):
+    ''' Cache of the results of the simple load cases of a model.
+
+    :ivar cacheDir: directory where the results are stored.
+    :ivar modelSpace: model space of the problem.
+    :ivar fingerprint: hash of the model and the load definitions.
+    :ivar nodes: nodes whose displacements are stored.
+    :ivar constrainedNodes: nodes whose reactions are stored.
+    :ivar reactionCheckTolerance: tolerance when checking reaction values.
+    '''
+    def __init__(self, cacheDir, modelSpace, fingerprint, nodes, constrainedNodes= None, reactionCheckTolerance= 1e-7):
+        ''' Constructor.
+
+        :param cacheDir: directory where the results are stored.
+        :param modelSpace: model space of the problem.
+        :param fingerprint: hash of the model and the load definitions.
+        :param nodes: nodes whose displacements are stored.
+        :param constrainedNodes: nodes whose reactions are stored.
+        :param reactionCheckTolerance: tolerance when checking reaction values.
+        '''
+        self.cacheDir= cacheDir
+        self.modelSpace= modelSpace
+        self.fingerprint= fingerprint
+        self.reactionCheckTolerance= reactionCheckTolerance
+        self.nodes= list(nodes)
+        self.constrainedNodes= list(constrainedNodes) if constrainedNodes else list()
+        if not os.path.isdir(self.cacheDir):
+            os.makedirs(self.cacheDir)
+
+    @classmethod
+    def fromModel(cls, cacheDir, modelSpace, modelSet, definitionFiles= None, constrainedNodeSet= None):
+        ''' Create the cache for the model argument.
+
+        :param cacheDir: directory where the results are stored.
+        :param modelSpace: model space of the problem.
+        :param modelSet: set with the nodes and elements of the model.
+        :param definitionFiles: files that define materials, constraints and
+                                loads.
+        :param constrainedNodeSet: set of constrained nodes whose reactions
+                                   are stored.
+        '''
+        fingerprint= get_model_fingerprint(modelSet, definitionFiles)
+        constrainedNodes= constrainedNodeSet.nodes if constrainedNodeSet else None
+        return cls(cacheDir, modelSpace, fingerprint, modelSet.nodes, constrainedNodes)
+
+    def getFileName(self, loadCaseName):
+        ''' Return the name of the file that stores the results of the load
+            case argument.
+
+        :param loadCaseName: name of the load case.
+        '''
+        return os.path.join(self.cacheDir, loadCaseName+'_'+self.fingerprint[:16]+'.npz')
+
+    def hasResults(self, loadCaseName):
+        ''' Return true if the results of the load case are stored.
+
+        :param loadCaseName: name of the load case.
+        '''
+        return os.path.isfile(self.getFileName(loadCaseName))
+
+    def save(self, loadCaseName, elementResults= None):
+        ''' Store the current results of the model for the load case
+            argument.
+
+        :param loadCaseName: name of the load case.
+        :param elementResults: dictionary (name -> list of values) with the
+                               results of the elements to store.
+        '''
+        arrays= {'fingerprint': np.array(self.fingerprint),
+                 'nodeTags': np.array([n.tag for n in self.nodes], dtype= int),
+                 'disp': np.array([list(n.getDisp) for n in self.nodes], dtype= float),
+                 'reactionTags': np.array([n.tag for n in self.constrainedNodes], dtype= int),
+                 'reactions': np.array([list(n.getReaction) for n in self.constrainedNodes], dtype= float)}
+        if elementResults:
+            for key in elementResults:
+                arrays['elem_'+key]= np.array(elementResults[key], dtype= float)
+        # Write to a temporary file first, so an interrupted run doesn't
+        # leave a corrupted entry.
+        fileName= self.getFileName(loadCaseName)
+        tmpFileName= fileName[:-4]+'_'+str(os.getpid())+'.tmp.npz'
+        np.savez(tmpFileName, **arrays)
+        os.replace(tmpFileName, fileName)
+
+    def load(self, loadCaseName):
+        ''' Return the stored results of the load case argument as a
+            dictionary with the keys: nodeTags, disp, reactionTags, reactions
+            and elementResults.
+
+        :param loadCaseName: name of the load case.
+        '''
+        with np.load(self.getFileName(loadCaseName)) as data:
+            if(str(data['fingerprint'])!=self.fingerprint):
+                className= type(self).__name__
+                methodName= sys._getframe(0).f_code.co_name
+                lmsg.error(className+'.'+methodName+'; stored results of: '+loadCaseName+' correspond to other model.')
+                return None
+            retval= {key: data[key] for key in ['nodeTags', 'disp', 'reactionTags', 'reactions']}
+            retval['elementResults']= {key[5:]: data[key] for key in data.files if key.startswith('elem_')}
+        return retval
+
+    def restoreDisplacements(self, results):
+        ''' Put the stored displacements in the nodes of the model (to
+            display them or to write them in the reports). The state of
+            the elements is not restored.
+
+        :param results: stored results of a load case.
+        '''
+        dispByTag= dict(zip(results['nodeTags'].tolist(), results['disp']))
+        for n in self.nodes:
+            if n.tag in dispByTag:
+                n.setTrialDisp(xc.Vector(dispByTag[n.tag].tolist()))
+        self.modelSpace.preprocessor.getDomain.commit()
+
+    def solve(self, loadCaseName, analysis, elementResultsFunction= None):
+        ''' Return the results of the load case argument. If they are not
+            stored, the model is analyzed (the load case must be already
+            added to the domain) and its results are stored; otherwise the
+            stored displacements are put in the nodes of the model (the
+            state of the elements is not restored, so the element results
+            must be read from the returned elementResults).
+
+        :param loadCaseName: name of the load case.
+        :param analysis: analysis used to solve the model.
+        :param elementResultsFunction: function that returns the results of
+                                       the elements to store (dictionary
+                                       name -> list of values).
+        '''
+        if self.hasResults(loadCaseName):
+            retval= self.load(loadCaseName)
+            if retval is not None:
+                self.restoreDisplacements(retval)
+                return retval
+        result= analysis.analyze(1)
+        if(result!=0):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            lmsg.error(className+'.'+methodName+"; can't solve for: "+loadCaseName)
+            exit(1)
+        if self.constrainedNodes:
+            self.modelSpace.calculateNodalReactions(includeInertia= False, reactionCheckTolerance= self.reactionCheckTolerance)
+        elementResults= elementResultsFunction() if elementResultsFunction else None
+        self.save(loadCaseName, elementResults)
+        return self.load(loadCaseName)
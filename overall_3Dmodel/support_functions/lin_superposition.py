@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+''' Linear superposition of load cases.
+
+For linear analyses the results of a load combination are the linear
+combination of the results of its load cases. Instead of solving the
+finite element model once for each combination (as in
+LimitStateData.saveAll) each elementary load case is solved only once
+and the results of every combination (internal forces, displacements and
+reactions) are obtained as the matrix product of the factor matrix
+(number of combinations x number of load cases) and the matrix with the
+results of the load cases (number of load cases x number of values).
+
+The Wood-Armer transformation of the shell internal forces is not linear,
+so the raw internal forces of the shells are superposed and the
+transformation is applied afterwards to the result of each combination.
+
+The solution procedure (and its analysis and system of equations) is
+set up once and reused for all the load cases. Nevertheless, the linear
+solution algorithm of XC forms and factorizes the stiffness matrix in
+each analysis step, so there is still one factorization for each load
+case (a single factorization for all the right-hand sides is not
+achieved). The saving comes from the number of solves: one for each
+load case instead of one for each combination.
+
+Usage:
+
+    engine= LinearSuperposition(FEcase, modelSpace, setCalc)
+    for ls in limitStates:
+        engine.saveAll(limitState= ls, combContainer= combContainer)
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import os
+import sys
+import pickle
+import numpy as np
+import xc
+from misc_utils import log_messages as lmsg
+from solution import predefined_solutions
+from postprocess import internal_forces
+from support_functions import comb_parser
+
+# Internal forces of the shell elements that are superposed before
+# computing the Wood-Armer values.
+shellInternalForceComponents= ['n1', 'n2', 'n12', 'm1', 'm2', 'm12', 'q13', 'q23']
+# Internal forces that are superposed in the dictionaries returned by
+# LimitStateData.getInternalForcesDict (the rest of the values, i.e.
+# the buckling reduction factors chiLT and chiN, are not linear and they
+# are copied from the results of the first load case).
+internalForceComponents= ['N', 'Vy', 'Vz', 'T', 'My', 'Mz', 'n1', 'n2', 'n12', 'm1', 'm2', 'm12', 'q13', 'q23']
+
+def get_factor_matrix(combinations, loadCaseNames= None):
+    ''' Return the names of the load cases and the matrix of factors
+        (number of combinations x number of load cases) of the
+        combinations argument.
+
+    :param combinations: dictionary of load combinations (objects with
+                         name and expr attributes).
+    :param loadCaseNames: list of load case names (columns of the
+                          matrix). If None, the load cases that appear
+                          in the combinations are used, in order of
+                          appearance.
+    '''
+    combMatrix= comb_parser.CombinationMatrix.fromDict(combinations, loadCaseNames)
+    return combMatrix.loadCaseNames, combMatrix.getDenseFactors()
+
+def flatten_dict(dct, prefix= (), components= internalForceComponents):
+    ''' Return the paths and the values of the numeric leaves of the
+        nested dictionary argument whose key is one of the components
+        argument.
+
+    :param dct: nested dictionary.
+    :param prefix: path of the dictionary.
+    :param components: keys of the leaves to return.
+    '''
+    paths= list()
+    values= list()
+    for key in dct:
+        value= dct[key]
+        path= prefix+(key,)
+        if isinstance(value, dict):
+            subPaths, subValues= flatten_dict(value, path, components)
+            paths.extend(subPaths)
+            values.extend(subValues)
+        elif (key in components) and isinstance(value, (int, float)) and not isinstance(value, bool):
+            paths.append(path)
+            values.append(value)
+    return paths, values
+
+def fill_dict(template, paths, values):
+    ''' Return a copy of the nested dictionary template with the values
+        of the leaves in paths replaced by those of the values argument
+        (the rest of the leaves keep the values of the template).
+
+    :param template: nested dictionary.
+    :param paths: paths of the leaves to replace.
+    :param values: new values of the leaves.
+    '''
+    def copy(dct):
+        return {key: copy(value) if isinstance(value, dict) else value for key, value in dct.items()}
+    retval= copy(template)
+    for path, value in zip(paths, values):
+        dct= retval
+        for key in path[:-1]:
+            dct= dct[key]
+        dct[path[-1]]= float(value)
+    return retval
+
+class NodeResults(object):
+    ''' Results of a node in a load combination. Exposes the same
+        attributes of the nodes that are used by the limit state
+        writers (tag, getDisp and getReaction).
+
+    :ivar tag: node identifier.
+    :ivar getDisp: node displacement.
+    :ivar getReaction: node reaction.
+    '''
+    def __init__(self, tag, disp, reaction= None):
+        ''' Constructor.
+
+        :param tag: node identifier.
+        :param disp: node displacement.
+        :param reaction: node reaction.
+        '''
+        self.tag= tag
+        self.getDisp= xc.Vector(list(disp))
+        if reaction is None:
+            reaction= np.zeros(len(disp))
+        self.getReaction= xc.Vector(list(reaction))
+
+class LinearSuperposition(object):
+    ''' Compute the results of the load combinations of a linear
+        model by superposition of the results of its load cases.
+
+    :ivar modelSpace: model space of the problem.
+    :ivar setCalc: set of entities for which the results are computed.
+    :ivar constrainedNodeSet: set of constrained nodes for which the
+                              reactions are computed (if None the
+                              reactions are not written).
+    :ivar solutionProcedure: solution procedure used for all the load
+                             cases.
+    :ivar analysis: analysis of the solution procedure (created once).
+    :ivar loadCaseNames: names of the solved load cases.
+    '''
+    def __init__(self, feProblem, modelSpace, setCalc, constrainedNodeSet= None, solutionProcedureType= predefined_solutions.SimpleStaticLinear, reactionCheckTolerance= 1e-7):
+        ''' Constructor.
+
+        :param feProblem: finite element problem.
+        :param modelSpace: model space of the problem.
+        :param setCalc: set of entities for which the results are computed.
+        :param constrainedNodeSet: set of constrained nodes for which the
+                                   reactions are computed.
+        :param solutionProcedureType: type of the solution procedure (must
+                                      be linear).
+        :param reactionCheckTolerance: tolerance when checking reaction values.
+        '''
+        self.modelSpace= modelSpace
+        self.setCalc= setCalc
+        self.constrainedNodeSet= constrainedNodeSet
+        self.reactionCheckTolerance= reactionCheckTolerance
+        self.solutionProcedure= solutionProcedureType(feProblem)
+        self.solutionProcedure.setup()
+        self.analysis= self.solutionProcedure.analysis
+        # Entities.
+        self.nodes= list(setCalc.nodes)
+        self.constrainedNodes= list(constrainedNodeSet.nodes) if constrainedNodeSet else list()
+        elements= list(setCalc.elements)
+        self.shellElements= [e for e in elements if 'Shell' in e.type()]
+        self.otherElements= [e for e in elements if 'Shell' not in e.type()]
+        # Results of the load cases.
+        self.loadCaseNames= list()
+        self.displacements= list() # (number of nodes, 6) for each load case.
+        self.reactions= list() # (number of constrained nodes, 6) for each load case.
+        self.shellForces= list() # (number of shells, 8, number of points) for each load case.
+        self.otherForces= list() # flattened internal forces dict for each load case.
+        self.otherForcesTemplate= None
+        self.otherForcesPaths= None
+        # Storage of the load case results between runs.
+        self.storageDir= None
+        self.tracker= None
+
+    def setStorage(self, storageDir, tracker):
+        ''' Store the results of the solved load cases in the directory
+            argument and reuse them in later runs while the tracker
+            doesn't report a change in their definition.
+
+        :param storageDir: directory where the results are stored.
+        :param tracker: dependency tracker (see lc_dependencies module).
+        '''
+        self.storageDir= storageDir
+        self.tracker= tracker
+        if not os.path.isdir(self.storageDir):
+            os.makedirs(self.storageDir)
+
+    def getStorageFileName(self, loadCaseName):
+        ''' Return the name of the file that stores the results of the load
+            case argument.
+
+        :param loadCaseName: name of the load case.
+        '''
+        return os.path.join(self.storageDir, loadCaseName+'.pkl')
+
+    def writeLoadCaseResults(self, loadCaseName):
+        ''' Write the results of the load case argument in the storage
+            directory.
+
+        :param loadCaseName: name of the load case.
+        '''
+        i= self.getLoadCaseIndex(loadCaseName)
+        data= {'nodeTags': [n.tag for n in self.nodes],
+               'constrainedNodeTags': [n.tag for n in self.constrainedNodes],
+               'shellTags': [e.tag for e in self.shellElements],
+               'displacements': self.displacements[i],
+               'reactions': self.reactions[i],
+               'shellForces': self.shellForces[i],
+               'otherForces': self.otherForces[i],
+               'otherForcesTemplate': self.otherForcesTemplate,
+               'otherForcesPaths': self.otherForcesPaths,
+               'components': internalForceComponents}
+        with open(self.getStorageFileName(loadCaseName), 'wb') as f:
+            pickle.dump(data, f)
+
+    def readLoadCaseResults(self, loadCaseName):
+        ''' Read the results of the load case argument from the storage
+            directory. Return false if there are no results for the
+            current entities.
+
+        :param loadCaseName: name of the load case.
+        '''
+        fileName= self.getStorageFileName(loadCaseName)
+        if not os.path.isfile(fileName):
+            return False
+        with open(fileName, 'rb') as f:
+            data= pickle.load(f)
+        if(data.get('components')!=internalForceComponents):
+            return False # stored with other superposed components.
+        sameEntities= (data['nodeTags']==[n.tag for n in self.nodes]) and (data['constrainedNodeTags']==[n.tag for n in self.constrainedNodes]) and (data['shellTags']==[e.tag for e in self.shellElements])
+        if(not sameEntities or ((self.otherForcesPaths is not None) and (data['otherForcesPaths']!=self.otherForcesPaths))):
+            return False
+        self.displacements.append(data['displacements'])
+        self.reactions.append(data['reactions'])
+        self.shellForces.append(data['shellForces'])
+        self.otherForces.append(data['otherForces'])
+        if self.otherForcesTemplate is None:
+            self.otherForcesTemplate= data['otherForcesTemplate']
+            self.otherForcesPaths= data['otherForcesPaths']
+        self.loadCaseNames.append(loadCaseName)
+        return True
+
+    def getLoadCaseIndex(self, loadCaseName):
+        ''' Return the index of the load case argument in the result
+            matrices.
+
+        :param loadCaseName: name of the load case.
+        '''
+        return self.loadCaseNames.index(loadCaseName)
+
+    def getShellRawInternalForces(self):
+        ''' Return the raw (before Wood-Armer) internal forces of the
+            shell elements in an array with shape (number of shells,
+            number of components, number of points).'''
+        retval= list()
+        for e in self.shellElements:
+            internalForces= internal_forces.ShellMaterialInternalForces()
+            internalForces.setFromAverageInShellElement(e)
+            retval.append([getattr(internalForces, c) for c in shellInternalForceComponents])
+        return np.array(retval, dtype= float)
+
+    def solveLoadCase(self, loadCaseName, limitState):
+        ''' Solve the model for the load case argument and store its
+            results.
+
+        :param loadCaseName: name of the load case.
+        :param limitState: limit state used to extract the internal forces
+                           of the elements that are not shells.
+        '''
+        self.modelSpace.removeAllLoadPatternsFromDomain()
+        self.modelSpace.revertToStart()
+        self.modelSpace.addLoadCaseToDomain(loadCaseName)
+        analOk= self.analysis.analyze(1)
+        if(analOk!=0):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            lmsg.error(className+'.'+methodName+"; can't solve for: "+loadCaseName)
+            exit(1)
+        if self.constrainedNodes:
+            self.modelSpace.calculateNodalReactions(includeInertia= False, reactionCheckTolerance= self.reactionCheckTolerance)
+        self.displacements.append(np.array([list(n.getDisp) for n in self.nodes], dtype= float))
+        self.reactions.append(np.array([list(n.getReaction) for n in self.constrainedNodes], dtype= float))
+        self.shellForces.append(self.getShellRawInternalForces())
+        otherForcesDict= limitState.getInternalForcesDict(loadCaseName, self.otherElements)[loadCaseName]
+        paths, values= flatten_dict(otherForcesDict)
+        if self.otherForcesTemplate is None:
+            self.otherForcesTemplate= otherForcesDict
+            self.otherForcesPaths= paths
+        self.otherForces.append(np.array(values, dtype= float))
+        self.loadCaseNames.append(loadCaseName)
+        self.modelSpace.removeAllLoadPatternsFromDomain()
+
+    def solveLoadCases(self, loadCaseNames, limitState):
+        ''' Solve the load cases that have not been solved yet.
+
+        :param loadCaseNames: names of the load cases.
+        :param limitState: limit state used to extract the internal forces
+                           of the elements that are not shells.
+        '''
+        for lcName in loadCaseNames:
+            if lcName not in self.loadCaseNames:
+                if self.storageDir is not None:
+                    if(self.tracker.isLoadCaseChanged(lcName) or not self.readLoadCaseResults(lcName)):
+                        self.solveLoadCase(lcName, limitState)
+                        self.writeLoadCaseResults(lcName)
+                        self.tracker.setLoadCaseUpdated(lcName)
+                else:
+                    self.solveLoadCase(lcName, limitState)
+        self.modelSpace.revertToStart()
+
+    def getCombinationResults(self, factors):
+        ''' Return the displacements, reactions, raw shell internal forces
+            and flattened internal forces of the rest of the elements for
+            the combinations defined by the rows of the factor matrix.
+
+        :param factors: matrix of factors (number of combinations x number
+                        of solved load cases).
+        '''
+        factors= np.asarray(factors)
+        disp= np.tensordot(factors, np.array(self.displacements), axes= 1)
+        reactions= np.tensordot(factors, np.array(self.reactions), axes= 1)
+        shellForces= np.tensordot(factors, np.array(self.shellForces), axes= 1)
+        otherForces= factors @ np.array(self.otherForces)
+        return disp, reactions, shellForces, otherForces
+
+    def getInternalForcesDict(self, combName, limitState, shellForces, otherForces):
+        ''' Return the internal forces dictionary of the combination in the
+            format of LimitStateData.getInternalForcesDict.
+
+        :param combName: name of the combination.
+        :param limitState: limit state data.
+        :param shellForces: raw internal forces of the shells for the
+                            combination.
+        :param otherForces: flattened internal forces of the rest of the
+                            elements for the combination.
+        '''
+        retval= fill_dict(self.otherForcesTemplate, self.otherForcesPaths, otherForces)
+        for e, values in zip(self.shellElements, shellForces):
+            internalForces= internal_forces.ShellMaterialInternalForces()
+            for c, componentValues in zip(shellInternalForceComponents, values):
+                setattr(internalForces, c, componentValues.tolist())
+            woodArmer= internalForces.getWoodArmer(limitState.woodArmerAlsoForAxialForces)
+            retval[e.tag]= {'type': e.type(), 'internalForces': {i: force.getDict() for i, force in enumerate(woodArmer)}}
+        return {combName: retval}
+
+    def saveAll(self, limitState, combContainer):
+        ''' Write the internal forces, displacements and reactions of the
+            combinations of the limit state argument.
+
+        :param limitState: limit state data.
+        :param combContainer: container of load combinations.
+        '''
+        combinations= limitState.getCorrespondingLoadCombinations(combContainer)
+        combNames= list(combinations.keys())
+        loadCaseNames, factors= get_factor_matrix(combinations)
+        self.solveLoadCases(loadCaseNames, limitState)
+        # Reorder the columns to match the stored results.
+        allFactors= np.zeros((len(combNames), len(self.loadCaseNames)))
+        for j, lcName in enumerate(loadCaseNames):
+            allFactors[:, self.getLoadCaseIndex(lcName)]= factors[:, j]
+        disp, reactions, shellForces, otherForces= self.getCombinationResults(allFactors)
+        # Write results.
+        limitState.createOutputFiles()
+        internalForcesDict= dict()
+        reactionsDict= dict()
+        for i, combName in enumerate(combNames):
+            internalForcesDict.update(self.getInternalForcesDict(combName, limitState, shellForces[i], otherForces[i]))
+            nodeResults= [NodeResults(n.tag, d) for n, d in zip(self.nodes, disp[i])]
+            limitState.writeDisplacements(combName, nodeResults)
+            if(self.constrainedNodes):
+                nodeResults= [NodeResults(n.tag, np.zeros(6), r) for n, r in zip(self.constrainedNodes, reactions[i])]
+                reactionsDict.update(limitState.getReactionsDict(combName, nodeResults))
+        limitState.writeInternalForces(internalForcesDict)
+        if(self.constrainedNodes):
+            limitState.writeReactions(reactionsDict)
+        return combNames
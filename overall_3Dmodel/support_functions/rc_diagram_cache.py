@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+''' Persistent, content-addressed cache of the interaction diagrams of
+the reinforced concrete sections.
+
+The interaction diagrams are rebuilt from the fiber models of the
+sections on every verification run, although the section definitions
+barely change. Here the surface of each diagram (see
+batched_rc_check.InteractionSurface) is stored in a .npz file whose name
+is a hash of the definition of the section (geometry, materials and
+rebars), the type of material diagrams and the sampling parameters, so
+any change in the section produces a new entry and the old one is
+simply not used anymore.
+
+Other section results (i.e. cracking parameters) can be stored with the
+same keys using get and put.
+
+Usage:
+
+    cache= InteractionDiagramCache(cacheDir)
+    checker= batched_rc_check.BatchedNormalStressChecker(reinfConcreteSections, prep, diagramCache= cache)
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import os
+import numpy as np
+from support_functions import lc_dependencies as ldep
+
+def get_parent_section(sectionDefinition, sectionName):
+    ''' Return the section definition (i.e. RCSlabBeamSection) that
+        generates the section argument (the one with the longest name that
+        is a prefix of the section name).
+
+    :param sectionDefinition: container of the section definitions.
+    :param sectionName: name of the section.
+    '''
+    retval= None
+    for s in sectionDefinition.sections:
+        if sectionName.startswith(s.name) and ((retval is None) or (len(s.name)>len(retval.name))):
+            retval= s
+    return retval
+
+def get_section_key(sectionDefinition, sectionName, *parameters):
+    ''' Return the content-addressed key of the section argument.
+
+    :param sectionDefinition: container of the section definitions.
+    :param sectionName: name of the section.
+    :param parameters: other parameters that affect the stored results
+                       (i.e. type of material diagrams).
+    '''
+    return ldep.get_fingerprint([sectionName, get_parent_section(sectionDefinition, sectionName), list(parameters)])
+
+class InteractionDiagramCache(object):
+    ''' Content-addressed storage of section results.
+
+    :ivar cacheDir: directory where the results are stored.
+    '''
+    def __init__(self, cacheDir):
+        ''' Constructor.
+
+        :param cacheDir: directory where the results are stored.
+        '''
+        self.cacheDir= cacheDir
+        if not os.path.isdir(self.cacheDir):
+            os.makedirs(self.cacheDir)
+
+    def getFileName(self, key):
+        ''' Return the name of the file of the key argument.
+
+        :param key: key of the results.
+        '''
+        return os.path.join(self.cacheDir, key+'.npz')
+
+    def get(self, key):
+        ''' Return the stored arrays (dictionary) of the key argument or
+            None if they are not stored.
+
+        :param key: key of the results.
+        '''
+        fileName= self.getFileName(key)
+        if not os.path.isfile(fileName):
+            return None
+        with np.load(fileName) as data:
+            return {name: data[name] for name in data.files}
+
+    def put(self, key, **arrays):
+        ''' Store the arrays argument with the key argument.
+
+        :param key: key of the results.
+        :param arrays: arrays to store.
+        '''
+        fileName= self.getFileName(key)
+        tmpFileName= fileName[:-4]+'_'+str(os.getpid())+'.tmp.npz'
+        np.savez(tmpFileName, **arrays)
+        os.replace(tmpFileName, fileName)
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+''' Compute the internal forces, displacements and reactions of several
+limit states solving each distinct load combination only once.
+
+Calling LimitStateData.saveAll for each limit state solves the model once
+per combination and limit state, so the combinations shared by several
+limit states (i.e. the ULS combinations used by normalStressesResistance,
+shearResistance and torsionResistance) are solved several times. Here the
+union of the combinations of all the limit states is solved and the
+results of each combination are written in the output files of every
+limit state that uses it.
+
+Usage:
+
+    save_all_limit_states(FEcase, modelSpace, limitStates, combContainer, setCalc)
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import os
+import sys
+import multiprocessing
+import concurrent.futures
+from misc_utils import log_messages as lmsg
+from solution import predefined_solutions
+from support_functions import lin_superposition as lsup
+
+def get_distinct_combinations(limitStates, combContainer):
+    ''' Return the distinct combinations of the limit states argument
+        (dictionary: combination name -> combination, in order of
+        appearance) and the names of the limit states that use each
+        of them (dictionary: combination name -> list of limit state
+        labels).
+
+    :param limitStates: list of limit state data objects.
+    :param combContainer: container of load combinations.
+    '''
+    combinations= dict()
+    users= dict()
+    for ls in limitStates:
+        lsCombinations= ls.getCorrespondingLoadCombinations(combContainer)
+        for key in lsCombinations:
+            comb= lsCombinations[key]
+            if comb.name in combinations:
+                if(combinations[comb.name].expr!=comb.expr):
+                    methodName= sys._getframe(0).f_code.co_name
+                    lmsg.error(methodName+'; combination: '+comb.name+' has different expressions: '+combinations[comb.name].expr+' and '+comb.expr)
+                    exit(1)
+            else:
+                combinations[comb.name]= comb
+                users[comb.name]= list()
+            users[comb.name].append(ls.label)
+    return combinations, users
+
+# Data shared with the worker processes (they are forked from the
+# process that built the model, so each one works on its own replica of
+# the finite element model).
+_context= dict()
+
+def _get_solution_procedure():
+    ''' Return the solution procedure of the current process. It is
+        created the first time it is needed in each process, so the
+        workers don't share a solver (i.e. MUMPS) created before the
+        fork.
+    '''
+    pid= os.getpid()
+    if _context.get('solutionProcedurePid')!=pid:
+        _context['solutionProcedure']= _context['solutionProcedureType'](_context['feProblem'])
+        _context['solutionProcedurePid']= pid
+    return _context['solutionProcedure']
+
+def _solve_combination(combName):
+    ''' Solve the combination argument and return its results for each
+        of the limit states that use it.
+
+    :param combName: name of the combination.
+    :returns: list of (limit state label, internal forces dictionary,
+              reactions dictionary, displacements) tuples, where
+              displacements is a list of (node tag, displacement) pairs.
+    '''
+    modelSpace= _context['modelSpace']
+    comb= _context['combinations'][combName]
+    constrainedNodeSet= _context['constrainedNodeSet']
+    loadCombinations= modelSpace.preprocessor.getLoadHandler.getLoadCombinations
+    modelSpace.removeAllLoadPatternsFromDomain()
+    modelSpace.revertToStart()
+    newCombination= comb.name not in loadCombinations.getKeys()
+    if(newCombination):
+        modelSpace.addNewLoadCaseToDomain(comb.name, comb.expr)
+    else: # already defined.
+        modelSpace.addLoadCaseToDomain(comb.name)
+    analOk= _get_solution_procedure().solve(calculateNodalReactions= (constrainedNodeSet is not None), reactionCheckTolerance= _context['reactionCheckTolerance'])
+    if(analOk!=0):
+        methodName= sys._getframe(0).f_code.co_name
+        lmsg.error(methodName+"; can't solve for: "+comb.name)
+        exit(1)
+    # Buckling reduction factors of the members (used by the steel limit
+    # states as in LimitStateData.saveAll).
+    if _context['bucklingMembers'] is not None:
+        for bm in _context['bucklingMembers']:
+            bm.updateReductionFactors()
+    retval= list()
+    displacements= [(n.tag, list(n.getDisp)) for n in _context['setCalc'].nodes]
+    for label in _context['users'][combName]:
+        ls= _context['limitStates'][label]
+        internalForcesDict= ls.getInternalForcesDict(comb.name, _context['setCalc'].elements)
+        reactionsDict= dict()
+        if constrainedNodeSet is not None:
+            reactionsDict= ls.getReactionsDict(comb.name, constrainedNodeSet.nodes)
+        retval.append((label, internalForcesDict, reactionsDict, displacements))
+    modelSpace.removeAllLoadPatternsFromDomain()
+    if(newCombination):
+        loadCombinations.remove(comb.name)
+    return retval
+
+def _solve_combination_chunk(combNames):
+    ''' Solve the combinations argument (worker process task).
+
+    :param combNames: names of the combinations to solve.
+    '''
+    return [_solve_combination(combName) for combName in combNames]
+
+def get_chunks(items, numChunks):
+    ''' Split the items argument in numChunks contiguous chunks of
+        (almost) the same size.
+
+    :param items: list of items.
+    :param numChunks: number of chunks.
+    '''
+    numChunks= max(1, min(numChunks, len(items)))
+    size, remainder= divmod(len(items), numChunks)
+    retval= list()
+    start= 0
+    for i in range(numChunks):
+        end= start+size+(1 if i<remainder else 0)
+        retval.append(items[start:end])
+        start= end
+    return retval
+
+def save_all_limit_states(feProblem, modelSpace, limitStates, combContainer, setCalc, solutionProcedureType= predefined_solutions.SimpleStaticLinear, bucklingMembers= None, constrainedNodeSet= None, reactionCheckTolerance= 1e-7, numProcesses= 1):
+    ''' Write the internal forces, displacements and reactions of the
+        limit states argument solving each distinct combination only
+        once.
+
+    If numProcesses is greater than one the combinations are split in
+    contiguous chunks that are solved by a pool of worker processes. The
+    workers are forked from the current process, so each one inherits its
+    own replica of the model (fork start method, only available on
+    POSIX systems) and creates its own solution procedure. The results are written in the order of the
+    combinations, so the output files are the same as in serial
+    execution.
+
+    :param feProblem: finite element problem.
+    :param modelSpace: model space of the problem.
+    :param limitStates: list of limit state data objects.
+    :param combContainer: container of load combinations.
+    :param setCalc: set of entities for which the results are computed.
+    :param solutionProcedureType: type of the solution procedure.
+    :param bucklingMembers: list of members whose buckling reduction
+                            factors are updated after solving each
+                            combination (see LimitStateData.saveAll).
+    :param constrainedNodeSet: set of constrained nodes for which the
+                               reactions are computed (if None the
+                               reactions are not written).
+    :param reactionCheckTolerance: tolerance when checking reaction values.
+    :param numProcesses: number of worker processes (if None, the number
+                         of processors of the machine).
+    :returns: dictionary with the names of the limit states that use each
+              of the solved combinations.
+    '''
+    combinations, users= get_distinct_combinations(limitStates, combContainer)
+    combNames= list(combinations.keys())
+    _context.update({'modelSpace': modelSpace, 'combinations': combinations, 'users': users, 'limitStates': {ls.label: ls for ls in limitStates}, 'setCalc': setCalc, 'bucklingMembers': bucklingMembers, 'constrainedNodeSet': constrainedNodeSet, 'reactionCheckTolerance': reactionCheckTolerance, 'feProblem': feProblem, 'solutionProcedureType': solutionProcedureType})
+    if numProcesses is None:
+        numProcesses= os.cpu_count()
+    if(numProcesses>1 and len(combNames)>1):
+        chunks= get_chunks(combNames, numProcesses)
+        mpContext= multiprocessing.get_context('fork')
+        with concurrent.futures.ProcessPoolExecutor(max_workers= len(chunks), mp_context= mpContext) as executor:
+            chunkResults= list(executor.map(_solve_combination_chunk, chunks))
+        results= [combResults for chunkResult in chunkResults for combResults in chunkResult]
+    else:
+        results= _solve_combination_chunk(combNames)
+    modelSpace.removeAllLoadPatternsFromDomain()
+    modelSpace.revertToStart()
+
+    # Write the results in the order of the combinations.
+    internalForcesDicts= {ls.label: dict() for ls in limitStates}
+    reactionsDicts= {ls.label: dict() for ls in limitStates}
+    for ls in limitStates:
+        ls.createOutputFiles()
+    for combName, combResults in zip(combNames, results):
+        for label, internalForcesDict, reactionsDict, displacements in combResults:
+            ls= _context['limitStates'][label]
+            internalForcesDicts[label].update(internalForcesDict)
+            reactionsDicts[label].update(reactionsDict)
+            ls.writeDisplacements(combName, [lsup.NodeResults(tag, disp) for tag, disp in displacements])
+    for ls in limitStates:
+        ls.writeInternalForces(internalForcesDicts[ls.label])
+        if constrainedNodeSet is not None:
+            ls.writeReactions(reactionsDicts[ls.label])
+    _context.clear()
+    return users
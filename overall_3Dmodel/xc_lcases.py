@@ -13,9 +13,21 @@ import xc_sets
 # Common variables
 out=xc_init.out ; modelSpace=xc_init.modelSpace ; prep=xc_init.prep
 
+# Loads of each load case (their fingerprints are used to detect the
+# load cases that change between runs, see support_functions/lc_dependencies.py)
+lcLoadDefinitions=dict()
+def addLoads(loadCase,loads):
+    ''' Add the loads to the load case and record them in lcLoadDefinitions.
+
+    :param loadCase: load case.
+    :param loads: list of loads.
+    '''
+    loadCase.addLstLoads(loads)
+    lcLoadDefinitions[loadCase.name]=loads
+
 GselfWeight=lcases.LoadCase(preprocessor=prep,name="GselfWeight",loadPType="default",timeSType="constant_ts")
 GselfWeight.create()
-GselfWeight.addLstLoads([xcL.selfWeight])
+addLoads(GselfWeight,[xcL.selfWeight])
 '''
 # display
 modelSpace.addLoadCaseToDomain("GselfWeight")
@@ -33,27 +45,27 @@ modelSpace.addLoadCaseToDomain(selfWeight.name) # añadirla al dominio antes de
 
 Qdecks=lcases.LoadCase(preprocessor=prep,name="Qdecks")
 Qdecks.create()
-Qdecks.addLstLoads([xcL.unifLoadDeck1,xcL.unifLoadDeck2])
+addLoads(Qdecks,[xcL.unifLoadDeck1,xcL.unifLoadDeck2])
 
 QearthPressWall=lcases.LoadCase(preprocessor=prep,name="QearthPressWall",loadPType="default",timeSType="constant_ts")
 QearthPressWall.create()
-QearthPressWall.addLstLoads([xcL.earthPressLoadWall])
+addLoads(QearthPressWall,[xcL.earthPressLoadWall])
 
 QearthPWallStrL=lcases.LoadCase(preprocessor=prep,name="QearthPWallStrL",loadPType="default",timeSType="constant_ts")
 QearthPWallStrL.create()
-QearthPWallStrL.addLstLoads([xcL.earthPWallStrL])
+addLoads(QearthPWallStrL,[xcL.earthPWallStrL])
 
 QearthPWallLinL=lcases.LoadCase(preprocessor=prep,name="QearthPWallLinL",loadPType="default",timeSType="constant_ts")
 QearthPWallLinL.create()    
-QearthPWallLinL.addLstLoads([xcL.earthPWallLinL])
+addLoads(QearthPWallLinL,[xcL.earthPWallLinL])
 
 QearthPWallHrzL=lcases.LoadCase(preprocessor=prep,name="QearthPWallHrzL",loadPType="default",timeSType="constant_ts")
 QearthPWallHrzL.create()
-QearthPWallHrzL.addLstLoads([xcL.earthPWallHrzL])
+addLoads(QearthPWallHrzL,[xcL.earthPWallHrzL])
 
 qunifBeams=lcases.LoadCase(preprocessor=prep,name="qunifBeams",loadPType="default",timeSType="constant_ts")
 qunifBeams.create()
-qunifBeams.addLstLoads([xcL.unifLoadBeamsY])
+addLoads(qunifBeams,[xcL.unifLoadBeamsY])
 '''
 modelSpace.addLoadCaseToDomain("datL.qunifBeams")
 out.displayLoads(beams)
@@ -62,29 +74,29 @@ modelSpace.removeLoadCaseFromDomain("datL.qunifBeams")
 
 QpntBeams=lcases.LoadCase(preprocessor=prep,name="QpntBeams",loadPType="default",timeSType="constant_ts")
 QpntBeams.create()
-QpntBeams.addLstLoads([xcL.QpuntBeams])
+addLoads(QpntBeams,[xcL.QpuntBeams])
 
 qlinDeck=lcases.LoadCase(preprocessor=prep,name="qlinDeck",loadPType="default",timeSType="constant_ts")
 qlinDeck.create()
-qlinDeck.addLstLoads([xcL.unifLoadLinDeck2])
+addLoads(qlinDeck,[xcL.unifLoadLinDeck2])
 
 QwheelDeck1=lcases.LoadCase(preprocessor=prep,name="QwheelDeck1",loadPType="default",timeSType="constant_ts")
 QwheelDeck1.create()
-QwheelDeck1.addLstLoads([xcL.wheelDeck1])
+addLoads(QwheelDeck1,[xcL.wheelDeck1])
 
 QvehicleDeck1=lcases.LoadCase(preprocessor=prep,name="QvehicleDeck1",loadPType="default",timeSType="constant_ts")
 QvehicleDeck1.create()
-QvehicleDeck1.addLstLoads([xcLr.vehicleDeck1])
+addLoads(QvehicleDeck1,[xcLr.vehicleDeck1])
 
 LS1=lcases.LoadCase(preprocessor=prep,name="LS1",loadPType="default",timeSType="constant_ts")
 LS1.create()
-LS1.addLstLoads([xcL.selfWeight,xcL.unifLoadDeck1,xcL.unifLoadDeck2,xcL.earthPressLoadWall,xcL.earthPWallStrL,xcL.earthPWallLinL])
+addLoads(LS1,[xcL.selfWeight,xcL.unifLoadDeck1,xcL.unifLoadDeck2,xcL.earthPressLoadWall,xcL.earthPWallStrL,xcL.earthPWallLinL])
 
 
 
 LS2=lcases.LoadCase(preprocessor=prep,name="LS2",loadPType="default",timeSType="constant_ts")
 LS2.create()
-LS2.addLstLoads([xcL.selfWeight,xcL.earthPWallHrzL,xcL.unifLoadBeamsY,xcL.QpuntBeams,xcL.unifLoadLinDeck2,xcL.wheelDeck1])
+addLoads(LS2,[xcL.selfWeight,xcL.earthPWallHrzL,xcL.unifLoadBeamsY,xcL.QpuntBeams,xcL.unifLoadLinDeck2,xcL.wheelDeck1])
 
 '''
 for lc in [LS1,LS2]:
@@ -110,5 +122,4 @@ lstLC=[GselfWeight,Qdecks,QearthPressWall,QearthPWallStrL,QearthPWallLinL,Qearth
 Gshrink=lcases.LoadCase(preprocessor=prep,name="Gshrink",loadPType="default",timeSType="constant_ts")
 Gshrink.create()
 modelSpace.setCurrentLoadPattern(Gshrink.name)
-Gshrink.addLstLoads([xcL.shrinkage])
-
+addLoads(Gshrink,[xcL.shrinkage])
@@ -26,9 +26,15 @@ lsd.quasiPermanentLoadsCrackControl, # RC crack control under quasi-permanent lo
 #lsd.fatigueResistance # Fatigue resistance.
 ]
 
-initStateStorage= InitialStateStorage()
+numProcesses= 1 # Number of worker processes (None: all the processors of the machine).
+columnarDir= None # If not None, directory where the results are written in columnar format (see columnar_results.py).
+inMemoryStates= False # If True, the initial states are stored in memory instead of the database file.
+linearizedCombinations= False # If True, superpose the responses to the variable loads from each initial state (see InitialStateStorage.solveLinearized).
+initStateStorage= InitialStateStorage(inMemory= inMemoryStates, linearized= linearizedCombinations)
 lsd.normalStressesResistance.woodArmerAlsoForAxialForces= True
 for ls in limitStates:
     lmsg.log(ls.label+'; use Wood-Armer method also for axial forces: '+str(ls.woodArmerAlsoForAxialForces))
-    initStateStorage.computeResponses(combContainer, displayFunction= None, limitState= ls, setCalc= setCalc)
-
+    initStateStorage.computeResponses(combContainer, displayFunction= None, limitState= ls, setCalc= setCalc, numProcesses= numProcesses, columnarDir= columnarDir)
+    if(initStateStorage.fullSolveCombinations):
+        lmsg.log(ls.label+'; combinations solved with the nonlinear procedure: '+str(initStateStorage.fullSolveCombinations))
+        initStateStorage.fullSolveCombinations.clear()
@@ -25,6 +25,14 @@ stcalc= concreteSet
 outCfg= lsd.VerifOutVars(setCalc=stcalc,appendToResFile='N',listFile='N',calcMeanCF='N')
 
 limitState=lsd.normalStressesResistance
+columnarDir= None # Directory of the results in columnar format (see calc_internal_forces.py).
+if(columnarDir):
+    import columnar_results
+    # Write the internal forces of the elements to check only (the
+    # controller reads them from the intForce JSON file of the limit
+    # state, so the cost of writing and reading back that file remains
+    # for the exported elements and combinations).
+    columnar_results.ColumnarLimitStateResults(columnarDir, limitState.label).exportToLimitState(limitState, elementTags= [e.tag for e in stcalc.elements], internalForcesOnly= True)
 outCfg.controller= lscheck.BiaxialBendingNormalStressController(limitState.label)
 lsd.normalStressesResistance.check(reinfConcreteSections,outCfg)
 
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+''' Columnar storage of the results of the load combinations.
+
+LimitStateData.writeInternalForces, writeReactions and writeDisplacements
+build nested dictionaries for every combination and element and dump
+them as text. Here each combination is a row of a binary matrix whose
+columns are the numeric values of the results (element x section x
+component for the internal forces, node x degree of freedom for the
+reactions and displacements). The rows are appended to the file as soon
+as each combination is solved, and the reader maps the file in memory
+(np.memmap) so it can read single rows or columns (i.e. a component of
+the internal forces of some elements for all the combinations) without
+loading the rest.
+
+For each store there are three files:
+
+- <fileName>.idx.pkl: columns (path of each value in the results
+  dictionary) and template of the dictionary of a combination.
+- <fileName>.bin: values (float64), one row for each combination.
+- <fileName>.combs: names of the combinations, one per line.
+
+The check methods of the limit states (LimitStateData.check and the XC
+controllers) read the internal forces from the text files of the limit
+state, so before checking the results must be exported to them
+(exportToLimitState). The export can be restricted to the elements and
+combinations to check, and to the internal forces, but the cost of
+writing and reading back those files remains for the exported data.
+'''
+
+from __future__ import division
+from __future__ import print_function
+
+__author__= "Ana Ortega (AO_O) Luis C. Pérez Tato"
+__copyright__= "Copyright 2026, AO_O LCPT"
+__license__= "GPL"
+__version__= "3.0"
+__email__= "ana.Ortega@ciccp.es l.pereztato@ciccp.es"
+
+import os
+import sys
+import pickle
+import numpy as np
+import xc
+from misc_utils import log_messages as lmsg
+
+def flatten_results(results, prefix= ()):
+    ''' Return the paths and the values of the numeric leaves of the
+        nested dictionary (or list) argument.
+
+    :param results: nested dictionary or list.
+    :param prefix: path of the argument.
+    '''
+    paths= list()
+    values= list()
+    items= results.items() if isinstance(results, dict) else enumerate(results)
+    for key, value in items:
+        path= prefix+(key,)
+        if isinstance(value, (dict, list, tuple)):
+            subPaths, subValues= flatten_results(value, path)
+            paths.extend(subPaths)
+            values.extend(subValues)
+        elif isinstance(value, (int, float, np.floating)) and not isinstance(value, bool):
+            paths.append(path)
+            values.append(value)
+    return paths, values
+
+def fill_results(template, paths, values):
+    ''' Return a copy of the template argument with the values of the
+        leaves in paths replaced by those of the values argument.
+
+    :param template: nested dictionary or list.
+    :param paths: paths of the leaves to replace.
+    :param values: new values of the leaves.
+    '''
+    def copy(obj):
+        if isinstance(obj, dict):
+            return {key: copy(value) for key, value in obj.items()}
+        elif isinstance(obj, (list, tuple)):
+            return [copy(value) for value in obj]
+        return obj
+    retval= copy(template)
+    for path, value in zip(paths, values):
+        obj= retval
+        for key in path[:-1]:
+            obj= obj[key]
+        obj[path[-1]]= int(value) if isinstance(obj[path[-1]], int) else float(value)
+    return retval
+
+class ColumnarResultsWriter(object):
+    ''' Append the results of the combinations (one row for each
+        combination) to a columnar store.
+
+    :ivar fileName: name of the store (without extension).
+    :ivar paths: paths of the values (columns) in the results dictionary.
+    :ivar combNames: names of the combinations written.
+    '''
+    def __init__(self, fileName):
+        ''' Constructor.
+
+        :param fileName: name of the store (without extension).
+        '''
+        self.fileName= fileName
+        self.paths= None
+        self.combNames= list()
+        for ext in ['.idx.pkl', '.bin', '.combs']:
+            if os.path.isfile(fileName+ext):
+                os.remove(fileName+ext)
+        self.dataFile= None
+        self.combsFile= None
+
+    def appendRow(self, combName, results):
+        ''' Append the results of the combination argument.
+
+        :param combName: name of the combination.
+        :param results: nested dictionary (or list) with the results of the
+                        combination. Its structure must be the same for all
+                        the combinations.
+        '''
+        paths, values= flatten_results(results)
+        if self.paths is None:
+            self.paths= paths
+            self.dataFile= open(self.fileName+'.bin', 'ab')
+            self.combsFile= open(self.fileName+'.combs', 'a')
+            with open(self.fileName+'.idx.pkl', 'wb') as f:
+                pickle.dump({'paths': paths, 'template': results}, f)
+        elif(paths!=self.paths):
+            className= type(self).__name__
+            methodName= sys._getframe(0).f_code.co_name
+            lmsg.error(className+'.'+methodName+'; results of combination: '+combName+' have a different structure.')
+            exit(1)
+        # Values first, so a reader never finds a name without its row.
+        self.dataFile.write(np.asarray(values, dtype= np.float64).tobytes())
+        self.dataFile.flush()
+        self.combsFile.write(combName+'\n')
+        self.combsFile.flush()
+        self.combNames.append(combName)
+
+    def close(self):
+        ''' Close the files of the store.'''
+        for f in [self.dataFile, self.combsFile]:
+            if f is not None:
+                f.close()
+        self.dataFile= None
+        self.combsFile= None
+
+class ColumnarResultsReader(object):
+    ''' Lazy reader of a columnar store. The rows written after the reader
+        is created are available when calling refresh.
+
+    :ivar fileName: name of the store (without extension).
+    :ivar paths: paths of the values (columns) in the results dictionary.
+    :ivar template: dictionary of results of a combination.
+    :ivar combNames: names of the combinations (rows).
+    '''
+    def __init__(self, fileName):
+        ''' Constructor.
+
+        :param fileName: name of the store (without extension).
+        '''
+        self.fileName= fileName
+        with open(fileName+'.idx.pkl', 'rb') as f:
+            index= pickle.load(f)
+        self.paths= index['paths']
+        self.template= index['template']
+        self.columnIndexes= {path: j for j, path in enumerate(self.paths)}
+        self.combNames= list()
+        self.combIndexes= dict()
+        self.data= None
+        self.refresh()
+
+    def refresh(self):
+        ''' Update the rows available (the store may be being written).'''
+        with open(self.fileName+'.combs', 'r') as f:
+            combNames= f.read().splitlines()
+        numColumns= len(self.paths)
+        rowSize= numColumns*np.dtype(np.float64).itemsize
+        if(rowSize>0):
+            numRows= min(len(combNames), os.path.getsize(self.fileName+'.bin')//rowSize)
+        else: # no numeric values (i.e. no constrained nodes).
+            numRows= len(combNames)
+        self.combNames= combNames[:numRows]
+        self.combIndexes= {name: i for i, name in enumerate(self.combNames)}
+        if(numRows>0 and rowSize>0):
+            self.data= np.memmap(self.fileName+'.bin', dtype= np.float64, mode= 'r', shape= (numRows, numColumns))
+        else:
+            self.data= np.zeros((numRows, numColumns))
+
+    def getNumberOfRows(self):
+        ''' Return the number of combinations available.'''
+        return len(self.combNames)
+
+    def getRow(self, combName):
+        ''' Return the values of the combination argument.
+
+        :param combName: name of the combination.
+        '''
+        return np.asarray(self.data[self.combIndexes[combName]])
+
+    def iterRows(self, start= 0):
+        ''' Iterate over the (combination name, values) pairs.
+
+        :param start: index of the first row.
+        '''
+        for i in range(start, len(self.combNames)):
+            yield self.combNames[i], np.asarray(self.data[i])
+
+    @staticmethod
+    def _get_tag_set(entityTags):
+        ''' Return the set of tags of the argument (the tags can be keys of
+            the results dictionary as integers or as strings).
+
+        :param entityTags: tags of the elements or nodes.
+        '''
+        retval= set(entityTags)
+        retval.update([str(tag) for tag in entityTags])
+        return retval
+
+    def getColumnIndexes(self, entityTags= None, component= None):
+        ''' Return the indexes of the columns of the entities and
+            component argument (the first and the last key of the path of
+            the values).
+
+        :param entityTags: tags of the elements or nodes (all if None).
+        :param component: name of the component (i.e. 'My') or index of
+                          the degree of freedom (all if None).
+        '''
+        if entityTags is not None:
+            entityTags= self._get_tag_set(entityTags)
+        return [j for j, path in enumerate(self.paths) if ((entityTags is None) or (path[0] in entityTags)) and ((component is None) or (path[-1]==component))]
+
+    def getColumns(self, entityTags= None, component= None):
+        ''' Return the paths and the values (number of combinations x
+            number of columns) of the entities and component argument.
+
+        :param entityTags: tags of the elements or nodes (all if None).
+        :param component: name of the component (i.e. 'My') or index of
+                          the degree of freedom (all if None).
+        '''
+        columns= self.getColumnIndexes(entityTags, component)
+        return [self.paths[j] for j in columns], np.asarray(self.data[:, columns])
+
+    def iterResultsDicts(self, combNames= None, entityTags= None):
+        ''' Iterate over the (combination name, dictionary of results)
+            pairs of the combinations argument. Only the values of the
+            entities argument are read and copied to the dictionaries.
+
+        :param combNames: names of the combinations (all if None).
+        :param entityTags: tags of the elements or nodes to include (all
+                           if None).
+        '''
+        if combNames is None:
+            combNames= self.combNames
+        template= self.template
+        columns= list(range(len(self.paths)))
+        if(entityTags is not None and isinstance(template, dict)):
+            tags= self._get_tag_set(entityTags)
+            template= {key: value for key, value in template.items() if key in tags}
+            columns= self.getColumnIndexes(entityTags)
+        paths= [self.paths[j] for j in columns]
+        for combName in combNames:
+            values= np.asarray(self.data[self.combIndexes[combName], columns])
+            yield combName, fill_results(template, paths, values)
+
+    def getResultsDict(self, combName, entityTags= None):
+        ''' Return the dictionary of results of the combination argument
+            (with the structure of the dictionaries that were written).
+
+        :param combName: name of the combination.
+        :param entityTags: tags of the elements or nodes to include (all
+                           if None).
+        '''
+        return next(self.iterResultsDicts([combName], entityTags))[1]
+
+class NodeResults(object):
+    ''' Node displacement read from a store. Exposes the attributes of
+        the nodes used by LimitStateData.writeDisplacements.
+
+    :ivar tag: node identifier.
+    :ivar getDisp: node displacement.
+    '''
+    def __init__(self, tag, disp):
+        ''' Constructor.
+
+        :param tag: node identifier.
+        :param disp: node displacement.
+        '''
+        self.tag= tag
+        self.getDisp= xc.Vector(list(disp))
+
+class ColumnarLimitStateResults(object):
+    ''' Internal forces, reactions and displacements of the combinations
+        of a limit state in columnar stores.
+
+    :ivar fileNameBase: name of the stores without the suffix.
+    '''
+    def __init__(self, directory, limitStateLabel):
+        ''' Constructor.
+
+        :param directory: directory of the stores.
+        :param limitStateLabel: label of the limit state.
+        '''
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.fileNameBase= os.path.join(directory, limitStateLabel)
+        self.writers= None
+
+    def getStoreFileName(self, kind):
+        ''' Return the name of the store of the results argument.
+
+        :param kind: type of results ('internalForces', 'reactions' or
+                     'displacements').
+        '''
+        return self.fileNameBase+'_'+kind
+
+    def appendCombination(self, combName, internalForcesDict, reactionsDict, displacements):
+        ''' Append the results of the combination argument.
+
+        :param combName: name of the combination.
+        :param internalForcesDict: internal forces (as returned by
+                                   LimitStateData.getInternalForcesDict).
+        :param reactionsDict: reactions (as returned by
+                              LimitStateData.getReactionsDict).
+        :param displacements: list of (node tag, displacement) pairs.
+        '''
+        if self.writers is None:
+            self.writers= {kind: ColumnarResultsWriter(self.getStoreFileName(kind)) for kind in ['internalForces', 'reactions', 'displacements']}
+        self.writers['internalForces'].appendRow(combName, internalForcesDict[combName])
+        self.writers['reactions'].appendRow(combName, reactionsDict.get(combName, dict()))
+        self.writers['displacements'].appendRow(combName, {tag: list(disp) for tag, disp in displacements})
+
+    def close(self):
+        ''' Close the stores.'''
+        if self.writers is not None:
+            for kind in self.writers:
+                self.writers[kind].close()
+        self.writers= None
+
+    def getReader(self, kind):
+        ''' Return a reader of the store of the results argument.
+
+        :param kind: type of results ('internalForces', 'reactions' or
+                     'displacements').
+        '''
+        return ColumnarResultsReader(self.getStoreFileName(kind))
+
+    def exportToLimitState(self, limitState, elementTags= None, combNames= None, internalForcesOnly= False):
+        ''' Write the results in the output files of the limit state (the
+            files read by LimitStateData.check). Only the values of the
+            elements and combinations argument are read from the stores.
+
+        :param limitState: limit state data.
+        :param elementTags: tags of the elements whose internal forces are
+                            written (all if None). Writing only the
+                            elements to check reduces the size of the
+                            files.
+        :param combNames: names of the combinations to write (all if
+                          None).
+        :param internalForcesOnly: if True, don't write the reactions and
+                                   the displacements (not needed by the
+                                   checks of the cross sections).
+        '''
+        internalForces= self.getReader('internalForces')
+        if combNames is None:
+            combNames= internalForces.combNames
+        limitState.createOutputFiles()
+        internalForcesDict= dict(internalForces.iterResultsDicts(combNames, elementTags))
+        limitState.writeInternalForces(internalForcesDict)
+        if(not internalForcesOnly):
+            reactions= self.getReader('reactions')
+            displacements= self.getReader('displacements')
+            reactionsDict= dict(reactions.iterResultsDicts(combNames))
+            for combName, nodeDisp in displacements.iterResultsDicts(combNames):
+                limitState.writeDisplacements(combName, [NodeResults(tag, nodeDisp[tag]) for tag in nodeDisp])
+            limitState.writeReactions(reactionsDict)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import re
+import numpy as np
 from actions import loads
 
 # Loads cases.
@@ -81,31 +82,77 @@ deckShrinkage= 2.93e-4 # Shrinkage on girders.
 setStrainLoad(bridgeDeckSet, [deckShrinkage,deckShrinkage])
 
 ## Creep
-def setCreepLoad(setList, concreteAge, concreteAgeAtLoading):
-    ''' Define the creep load for the elements of the set.
+def getCreepStrains(gSet, rcSection, concreteAge, concreteAgeAtLoading):
+    ''' Return the tags of the elements of the set and the creep strains
+        (number of elements x 2 array) corresponding to their mean n1 and
+        n2 stresses.
+
+    :param gSet: set containing the elements that creep.
+    :param rcSection: reinforced concrete section of the elements.
+    :param concreteAge: concrete age in days at the moment considered.
+    :param concreteAgeAtLoading: age of concrete in days at loading.
+    '''
+    concrType= rcSection.concrType
+    elements= [e for e in gSet.getElements]
+    tags= np.array([e.tag for e in elements], dtype= int)
+    avgStresses= np.array([[e.getMeanInternalForce("n1"), e.getMeanInternalForce("n2")] for e in elements], dtype= float).reshape(-1, 2)/rcSection.depth
+    numSmall= np.count_nonzero(np.sum(avgStresses**2, axis= 1)<0.1)
+    if(numSmall>0):
+        lmsg.warning('Concrete stresses are very small in '+str(numSmall)+' elements of set: '+gSet.name+'. No creep expected.')
+    def creep(sigma):
+        return concrType.getCreepDeformation(concreteAgeAtLoading,concreteAge,HR*100,rcSection.depth,sigma)
+    # If the creep strain is proportional to the stress (linear creep) the
+    # creep function is evaluated only for a unit stress. The linearity is
+    # checked at the extreme stresses of the set (the creep is not linear
+    # for high compressive stresses).
+    unitCreep= creep(1.0)
+    probeStresses= [avgStresses.min(), avgStresses.max()] if avgStresses.size else []
+    if any(abs(creep(float(sigma))-unitCreep*sigma)>1e-6*abs(unitCreep*sigma) for sigma in probeStresses):
+        eps= np.array([[creep(float(sigma)) for sigma in row] for row in avgStresses]).reshape(-1, 2)
+    else:
+        eps= unitCreep*avgStresses
+    return tags, eps
+
+def setCreepLoad(setList, concreteAge, concreteAgeAtLoading, relativeResolution= 0.01):
+    ''' Define the creep load for the elements of the set. The strains of
+        each set are rounded to a fraction of their range (max-min of each
+        component in the set) and the elements with the same rounded
+        strains share the same elemental load (with the mean of their
+        strains), so the error in the strain of each element is less than
+        relativeResolution times the range.
 
     :param setList: list of sets containing the elements that creep.
     :param concreteAge: concrete age in days at the moment considered.
     :param concreteAgeAtLoading: age of concrete in days at loading.
+    :param relativeResolution: resolution of the strains as a fraction of
+                               their range in the set (if None, only the
+                               elements with exactly the same strains share
+                               the load).
     '''
     cLC= loadCaseManager.setCurrentLoadCase('G3CREEP')
     for gSet in setList:
         sectionName= gSet.getProp('sectionName')
         rcSection= rcSectionDict[sectionName]
-        concrType= rcSection.concrType
-        for e in gSet.getElements:
-            avgStress1= e.getMeanInternalForce("n1")/rcSection.depth
-            avgStress2= e.getMeanInternalForce("n2")/rcSection.depth
-            if((avgStress1**2+avgStress2**2)<0.1):
-                lmsg.warning('Concrete stresses are very small. No creep expected.') 
-            eps1= concrType.getCreepDeformation(concreteAgeAtLoading,concreteAge,HR*100,rcSection.depth,avgStress1)
-            eps2= concrType.getCreepDeformation(concreteAgeAtLoading,concreteAge,HR*100,rcSection.depth,avgStress2)
-            strainValues= [eps1,eps2]
+        tags, eps= getCreepStrains(gSet, rcSection, concreteAge, concreteAgeAtLoading)
+        if(len(tags)==0):
+            continue
+        if(relativeResolution):
+            strainRange= eps.max(axis= 0)-eps.min(axis= 0)
+            resolution= np.where(strainRange>0.0, relativeResolution*strainRange, 1.0)
+            keys= np.round((eps-eps.min(axis= 0))/resolution)
+        else:
+            keys= eps
+        uniqueKeys, groups= np.unique(keys, axis= 0, return_inverse= True)
+        groups= groups.reshape(-1)
+        for i in range(len(uniqueKeys)):
+            rows= np.where(groups==i)[0]
+            strainValues= eps[rows].mean(axis= 0)
             eleLoad= cLC.newElementalLoad("shell_strain_load")
-            eleLoad.elementTags= xc.ID([e.tag])
+            eleLoad.elementTags= xc.ID(tags[rows].tolist())
             for gp in [0,1,2,3]: # for each Gauss point.
                 for c in [0,1]: # for each component.
-                    eleLoad.setStrainComp(gp,c,strainValues[c]) #(id of Gauss point, id of component, value)
+                    eleLoad.setStrainComp(gp,c,float(strainValues[c])) #(id of Gauss point, id of component, value)
+        lmsg.log('creep load of set: '+gSet.name+'; '+str(len(tags))+' elements, '+str(len(uniqueKeys))+' elemental loads.')
 
 deckLength= 24.76 # Length of the deck edge.
 
@@ -415,64 +462,111 @@ def tempGradient(z, Ttop, Tbottom, zTop, zBottom):
     '''
     return (Ttop-Tbottom)/(zTop-zBottom)*(z-zBottom)+Tbottom
 
+def getThermalLoadGeometry(shellSet, trussSet):
+    ''' Return the geometry needed to define the thermal loads (it doesn't
+        depend on the temperatures, so it can be reused for all the
+        thermal load cases).
+
+    :param shellSet: set of shell elements.
+    :param trussSet: set of truss elements (prestressing chords).
+    :returns: dictionary with the tags of the shell elements, the z
+              coordinates of their Gauss points (number of elements x
+              number of Gauss points), the tags of the truss elements and
+              the z coordinates of their nodes (number of elements x 2).
+    '''
+    shellTags= list()
+    shellGaussPointsZ= list()
+    for e in shellSet.elements:
+        shellTags.append(e.tag)
+        gaussPoints= e.getGaussModel().getGaussPoints()
+        shellGaussPointsZ.append([e.getCartesianCoordinates(p, True).z for p in gaussPoints])
+    trussTags= list()
+    trussNodesZ= list()
+    for e in trussSet.elements:
+        trussTags.append(e.tag)
+        nodes= e.getNodes
+        trussNodesZ.append([nodes[0].getInitialPos3d.z, nodes[1].getInitialPos3d.z])
+    return {'shellTags': np.array(shellTags, dtype= int),
+            'shellGaussPointsZ': np.array(shellGaussPointsZ, dtype= float).reshape(len(shellTags), -1),
+            'trussTags': np.array(trussTags, dtype= int),
+            'trussNodesZ': np.array(trussNodesZ, dtype= float).reshape(-1, 2)}
+
+def groupEqualRows(values):
+    ''' Return a list of (row values, row indexes) with the indexes of the
+        equal rows of the array argument.
+
+    :param values: two-dimensional array.
+    '''
+    if(len(values)==0):
+        return list()
+    uniqueRows, groups= np.unique(values, axis= 0, return_inverse= True)
+    groups= groups.reshape(-1)
+    return [(uniqueRows[i], np.where(groups==i)[0]) for i in range(len(uniqueRows))]
+
+def applyThermalLoads(thermalCases, zTop, zBottom, geometry= None):
+    ''' Define the thermal load cases argument. The strains are computed
+        for all the elements at once and the elements with the same strains
+        share the same elemental load.
+
+    :param thermalCases: list of (load case name, description, Ttop,
+                         Tbottom) tuples where Ttop and Tbottom are the
+                         temperatures at the top and at the bottom of the
+                         deck.
+    :param zTop: z coordinate of the top of the deck.
+    :param zBottom: z coordinate of the bottom of the deck.
+    :param geometry: geometry of the elements (see getThermalLoadGeometry),
+                     if None it's computed from concreteSet and tendonSet.
+    '''
+    if geometry is None:
+        geometry= getThermalLoadGeometry(concreteSet, tendonSet)
+    shellTags= geometry['shellTags']
+    trussTags= geometry['trussTags']
+    for lcName, description, Ttop, Tbottom in thermalCases:
+        cLC= loadCaseManager.setCurrentLoadCase(lcName)
+        cLC.description= description
+        # Shell elements.
+        shellStrains= alpha*tempGradient(geometry['shellGaussPointsZ'], Ttop, Tbottom, zTop, zBottom)
+        for strains, rows in groupEqualRows(shellStrains):
+            eleLoad= cLC.newElementalLoad("shell_strain_load")
+            eleLoad.elementTags= xc.ID(shellTags[rows].tolist())
+            for i, eps in enumerate(strains): # for each Gauss point.
+                eleLoad.setStrainComp(i,0,float(eps))
+                eleLoad.setStrainComp(i,1,float(eps))
+        # Truss elements (prestressing chords)
+        trussStrains= alpha*tempGradient(geometry['trussNodesZ'], Ttop, Tbottom, zTop, zBottom)
+        for strains, rows in groupEqualRows(trussStrains):
+            eleLoad= cLC.newElementalLoad("truss_strain_load")
+            eleLoad.elementTags= xc.ID(trussTags[rows].tolist())
+            eleLoad.eps1= float(strains[0])
+            eleLoad.eps2= float(strains[1])
+
 def applyThermalLoad(Ttop, Tbottom, zTop, zBottom):
-    ''' Apply to the model the thermal load defined by the arguments.
+    ''' Apply to the model the thermal load defined by the arguments
+        (in the current load case).
 
     :param Ttop: temperature at the top of the deck.
     :param Tbottom: temperature at the bottom of the deck.
     :param zTop: z coordinate of the top of the deck.
     :param zBottom: z coordinate of the bottom of the deck.
     '''
-    # Shell elements.
-    for e in concreteSet.elements:
-        eleLoad= cLC.newElementalLoad("shell_strain_load")
-        eleLoad.elementTags= xc.ID([e.tag])
-        # Gauss points positions
-        gaussPoints= e.getGaussModel().getGaussPoints()
-        for i, p in enumerate(gaussPoints):
-            gpPos= e.getCartesianCoordinates(p, True)
-            AT= tempGradient(gpPos.z, Ttop, Tbottom, zTop, zBottom)
-            eleLoad.setStrainComp(i,0,alpha*AT)
-            eleLoad.setStrainComp(i,1,alpha*AT)
-
-    # Truss elements (prestressing chords)
-    for e in tendonSet.elements:
-        eleLoad= cLC.newElementalLoad("truss_strain_load")
-        eleLoad.elementTags= xc.ID([e.tag])
-        nodes= e.getNodes
-        pos1= nodes[0].getInitialPos3d
-        AT1= tempGradient(pos1.z, Ttop, Tbottom, zTop, zBottom)
-        pos2= nodes[1].getInitialPos3d
-        AT2= tempGradient(pos2.z, Ttop, Tbottom, zTop, zBottom)
-        eleLoad.eps1= alpha*AT1
-        eleLoad.eps2= alpha*AT2
-
-## Thermal contraction.
-cLC= loadCaseManager.setCurrentLoadCase('Q31')
-cLC.description= 'Thermal contraction.'
+    applyThermalLoads([(cLC.name, cLC.description, Ttop, Tbottom)], zTop, zBottom)
+
+## Thermal contraction and expansion.
+thermalCases= list()
 Ttop= -10.33 # Temperature at top side (Celsius degrees)
 Tbottom= Ttop-5.0 # Temperature at bottom side (Celsius degrees)
-applyThermalLoad(Ttop, Tbottom, zTop, zBottom)
+thermalCases.append(('Q31', 'Thermal contraction.', Ttop, Tbottom))
 
-cLC= loadCaseManager.setCurrentLoadCase('Q31neopr')
-cLC.description= 'Thermal contraction (bearings design).'
 Ttop= -10.33+15.0 # Temperature at top side (Celsius degrees)
 Tbottom= Ttop-5.0+15.0 # Temperature at bottom side (Celsius degrees)
-applyThermalLoad(Ttop, Tbottom, zTop, zBottom)
+thermalCases.append(('Q31neopr', 'Thermal contraction (bearings design).', Ttop, Tbottom))
 
-## Thermal expansion.
-cLC= loadCaseManager.setCurrentLoadCase('Q32')
-cLC.description= 'Thermal expansion.'
 Ttop= 47.7 # Temperature at top side (Celsius degrees)
 Tbottom= Ttop-10.0 # Temperature at bottom side (Celsius degrees)
+thermalCases.append(('Q32', 'Thermal expansion.', Ttop, Tbottom))
 
-applyThermalLoad(Ttop, Tbottom, zTop, zBottom)
-
-cLC= loadCaseManager.setCurrentLoadCase('Q32neopr')
-cLC.description= 'Thermal expansion (bearings design).'
 Ttop= 47.7+15.0 # Temperature at top side (Celsius degrees)
 Tbottom= Ttop-10.0+15.0 # Temperature at bottom side (Celsius degrees)
+thermalCases.append(('Q32neopr', 'Thermal expansion (bearings design).', Ttop, Tbottom))
 
-applyThermalLoad(Ttop, Tbottom, zTop, zBottom)
-
-
+applyThermalLoads(thermalCases, zTop, zBottom)
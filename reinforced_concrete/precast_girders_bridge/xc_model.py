@@ -4,8 +4,12 @@ from __future__ import division
 from __future__ import print_function
 
 import os
+import sys
 import math
 import re
+import multiprocessing
+import concurrent.futures
+import numpy as np
 import geom
 import xc
 
@@ -61,8 +65,11 @@ def connectNodesToConcrete(nodes, elementSet, connectorSet):
         connectorSet.elements.append(connectorElement)
 
 workingDirectory= default_config.setWorkingDirectory()
+if workingDirectory not in sys.path:
+    sys.path.append(workingDirectory) # local modules.
 
 import env_config
+import columnar_results
 FEcase= xc.FEProblem()
 fname= os.path.abspath(__file__).strip('.py')
 FEcase.title= 'Test'
@@ -341,134 +348,305 @@ rightWindGirderWebFaceSet.fillDownwards()
 # Solution
 
 #solProc= predefined_solutions.PenaltyModifiedNewtonUMF(FEcase, convergenceTestTol= .01, printFlag= 2, convTestType= 'norm_unbalance_conv_test', numberingMethod= 'rcm')
-solProc= predefined_solutions.PenaltyModifiedNewtonMUMPS(FEcase, convergenceTestTol= .005, printFlag= 0, convTestType= 'norm_disp_incr_conv_test', numberingMethod= 'rcm')
+def new_solution_procedure(name= None):
+    ''' Return a new solution procedure for the model.
+
+    :param name: name of the solution procedure.
+    '''
+    return predefined_solutions.PenaltyModifiedNewtonMUMPS(FEcase, name= name, convergenceTestTol= .005, printFlag= 0, convTestType= 'norm_disp_incr_conv_test', numberingMethod= 'rcm')
+
+solProc= new_solution_procedure()
 #solProc= predefined_solutions.PenaltyModifiedNewtonUMF(FEcase, convergenceTestTol= .005, printFlag= 2, convTestType= 'norm_disp_incr_conv_test', numberingMethod= 'rcm')
 
 reactionCheckTol= 5.0
 
-def solve_for_initial_state(loadCombExpr:str):
-    ''' Compute solution for the initial state.
+def get_initial_state_stages(loadCombExpr:str):
+    ''' Return the stages of the construction sequence for the initial
+        state as a list of (stage name, load factor) tuples. The factor is
+        None for the stages without loads.
 
     loadCombExpr: string containing the expression of the load combination
     to analyze.
     '''
-    modelSpace.removeAllLoadPatternsFromDomain()
-    modelSpace.revertToStart()
-    modelSpace.deactivateElements(bridgeDeckSet) # Deactivate bridge deck.
-
     combDict= utils.get_combination_dict(loadCombExpr)
     g1factor= float(combDict['G1']) # Self weight factor.
-    g2factor= float(combDict['G2']) # Dead load factor.
     g3factor= float(combDict['G3']) # Creep and shrinkage effects factor.
     pFactor= float(combDict['P1']) # Prestressing factor.
-
     if(pFactor!=1.0):
         lmsg.warning('Factor for presstressing action different from 1.0 ('+str(pFactor)+') not implemented (it will be ignored).\n')
-    analOk= solProc.solve()
-    if(analOk!=0):
-        lmsg.error('Can\'t solve for prestressing.')
-        quit()
-    else:
-        print('prestressing.')
-
-    lc0= modelSpace.addLoadCaseToDomain('G1A')
-    lc0.gammaF= g1factor
-    analOk= solProc.solve()
-    if(analOk!=0):
-        lmsg.error('Can\'t solve for: '+lc0.name)
-        quit()
+    return [('prestressing', None), # Prestressing.
+            ('G1A', g1factor), # Girders in place.
+            ('G3SHRA', g3factor), # Girders initial shrinkage.
+            ('bearings', None), # Remove stresses on bridge bearings.
+            ('G1B', g1factor), # Activate bridge deck.
+            ('G3SHRB', g3factor), # Shrinkage.
+            ('G3CREEP', g3factor)] # Creep.
+
+def solve_initial_state_stage(stage):
+    ''' Compute the solution for the stage argument of the construction
+        sequence (the previous stages must be already solved).
+
+    stage: (stage name, load factor) tuple (see get_initial_state_stages).
+    '''
+    stageName, factor= stage
+    if(stageName=='prestressing'):
+        modelSpace.removeAllLoadPatternsFromDomain()
+        modelSpace.revertToStart()
+        modelSpace.deactivateElements(bridgeDeckSet) # Deactivate bridge deck.
+    elif(stageName=='bearings'):
+        # Remove stresses on bridge bearings.
+        for e in bearingSet.elements:
+            e.revertToStart()
     else:
-        print('girders in place')
-
-    # Girders initial shrinkage
-    lcG3SHRA= modelSpace.addLoadCaseToDomain('G3SHRA')
-    lcG3SHRA.gammaF= g3factor
-    analOk= solProc.solve()
-    if(analOk!=0):
-        lmsg.error('Can\'t solve for: '+lcG3SHRA.name)
-        quit()
+        if(stageName=='G1B'):
+            # Activate bridge deck.
+            modelSpace.activateElements(bridgeDeckSet) 
+        elif(stageName=='G3CREEP'):
+            lcG3CREEP= modelSpace.getLoadPattern('G3CREEP')
+            # If not already defined, define creep
+            if(lcG3CREEP.getNumLoads==0):
+                setCreepLoad(girderSets, concreteAge, girdersConcreteAgeAtLoading)
+                setCreepLoad(bridgeDeckSets, concreteAge, deckConcreteAgeAtLoading)
+        lc= modelSpace.addLoadCaseToDomain(stageName)
+        lc.gammaF= factor
+    if(stageName=='G3CREEP'):
+        analOk= solProc.solve(calculateNodalReactions= True, reactionCheckTolerance= reactionCheckTol)
     else:
-        print('girders initial shrinkage')
-    
-    # Remove stresses on bridge bearings.
-    for e in bearingSet.elements:
-        e.revertToStart()
-    analOk= solProc.solve()
+        analOk= solProc.solve()
     if(analOk!=0):
-        lmsg.error('Can\'t solve for bearings reset.')
+        lmsg.error('Can\'t solve for stage: '+stageName)
         quit()
     else:
-        print('removed stresses on bridge bearings')
+        print(stageName)
+    return analOk
 
-    # Activate bridge deck.
-    modelSpace.activateElements(bridgeDeckSet) 
-    lc0B= modelSpace.addLoadCaseToDomain('G1B')
-    lc0B.gammaF= g1factor
-    analOk= solProc.solve()
-    if(analOk!=0):
-        lmsg.error('Can\'t solve for: '+lc0B.name)
-        quit()
-    else:
-        print('activate bridge deck')
+def solve_for_initial_state(loadCombExpr:str):
+    ''' Compute solution for the initial state.
 
-    # Shrinkage
-    lcG3SHRB= modelSpace.addLoadCaseToDomain('G3SHRB')
-    lcG3SHRB.gammaF= g3factor
-    analOk= solProc.solve()
-    if(analOk!=0):
-        lmsg.error('Can\'t solve for: '+lcG3SHRB.name)
-        quit()
-    else:
-        print('shrinkage')
-    
-    # Creep.
-    lcG3CREEP= modelSpace.getLoadPattern('G3CREEP')
-    lcG3CREEP.gammaF= g3factor
-    # If not already defined, define creep
-    if(lcG3CREEP.getNumLoads==0):
-        setCreepLoad(girderSets, concreteAge, girdersConcreteAgeAtLoading)
-        setCreepLoad(bridgeDeckSets, concreteAge, deckConcreteAgeAtLoading)
-    lcG3CREEP= modelSpace.addLoadCaseToDomain('G3CREEP')
-    analOk= solProc.solve(calculateNodalReactions= True, reactionCheckTolerance= reactionCheckTol)
-    if(analOk!=0):
-        lmsg.error('Can\'t solve for: '+lcG3CREEP.name)
-        quit()
-    else:
-        print('creep')
+    loadCombExpr: string containing the expression of the load combination
+    to analyze.
+    '''
+    for stage in get_initial_state_stages(loadCombExpr):
+        analOk= solve_initial_state_stage(stage)
     return analOk
 
+def get_available_memory():
+    ''' Return the memory available in the machine (bytes).'''
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1])*1024
+    except OSError:
+        pass
+    return os.sysconf('SC_AVPHYS_PAGES')*os.sysconf('SC_PAGE_SIZE')
+
 class InitialStateStorage(object):
 
-    def __init__(self):
-        ''' Constructor.'''
+    def __init__(self, dbFileName= '../aux1/initial_state.db', inMemory= False, minFreeMemory= 2e9, linearized= False, residualTolerance= None):
+        ''' Constructor.
+
+        :param dbFileName: name of the database used to store the
+                           initial states.
+        :param inMemory: if true, store the initial states in an in-memory
+                         database (no disk I/O when saving and restoring
+                         the state of the domain). If the available memory
+                         falls below minFreeMemory the states are stored
+                         in the dbFileName database from then on.
+        :param minFreeMemory: minimum available memory (bytes) to keep
+                              storing the states in memory.
+        :param linearized: if true, the response to the variable loads of
+                           each combination is obtained by superposition of
+                           the responses to each load pattern computed from
+                           its initial state (see solveLinearized).
+        :param residualTolerance: maximum unbalanced force in the free nodes
+                                  accepted for a superposed solution (if
+                                  None, reactionCheckTol).
+        '''
         self.storedStates= dict()
         self.initialStateLoads= ['G1', 'G2', 'G3', 'P1']
-        self.db= modelSpace.getNewDatabase('../aux1/initial_state.db')
+        self.dbFileName= dbFileName
+        self.inMemory= inMemory
+        self.minFreeMemory= minFreeMemory
+        self.linearized= linearized
+        self.residualTolerance= residualTolerance if residualTolerance is not None else reactionCheckTol
+        self.nodes= None
+        self.initialDisplacements= dict()
+        self.loadIncrements= dict()
+        self.fullSolveCombinations= list()
+        if(self.inMemory):
+            self.db= modelSpace.getNewDatabase(':memory:') # SQLite in-memory database.
+        else:
+            self.db= modelSpace.getNewDatabase(dbFileName)
+
+    def saveState(self, stagesKey):
+        ''' Store the current state of the domain.
+
+        :param stagesKey: key of the state (see getStagesKey).
+        '''
+        if(self.inMemory and get_available_memory()<self.minFreeMemory):
+            lmsg.warning('Low memory, initial states will be stored in: '+self.dbFileName)
+            # The states stored in memory are lost with the database.
+            self.db= modelSpace.getNewDatabase(self.dbFileName)
+            self.inMemory= False
+            self.storedStates.clear()
+        pseudoTime= 100+len(self.storedStates)
+        modelSpace.save(pseudoTime)
+        self.storedStates[stagesKey]= pseudoTime
+
+    def getInitialStateKey(self, combExpr):
+        ''' Return the key of the initial state of the combination
+            expression argument.
+
+        :param combExpr: load combination expression.
+        '''
+        initialState, loadState= utils.split_combination(combExpr, self.initialStateLoads)
+        return utils.get_file_name_from_combination_expresion(initialState)
+
+    def getStagesKey(self, stages):
+        ''' Return the key of the state reached after the stages argument.
+
+        :param stages: list of (stage name, load factor) tuples (see
+                       get_initial_state_stages).
+        '''
+        return ';'.join([stageName+('' if factor is None else '='+repr(factor)) for stageName, factor in stages])
 
     def solveForInitialState(self, initialState):
         ''' Compute and store the solution for the initial state argument.
 
+        The states reached after the stages of the construction sequence
+        are stored in a tree (the key of each node is the sequence of
+        stages and factors applied), so the solution restarts from the
+        deepest stored stage shared with the initial state argument
+        (i.e. the initial states that differ only on the creep and
+        shrinkage factor reuse the state after the deck activation).
+
         :param initialState: load combination corresponding to an initial state.
         '''
-        initStateKey= utils.get_file_name_from_combination_expresion(initialState)
-        if initStateKey in self.storedStates:
-            pseudoTime= self.storedStates[initStateKey]
-            modelSpace.restore(pseudoTime)
-        else:
-            result= solve_for_initial_state(initialState)
+        stages= get_initial_state_stages(initialState)
+        # Deepest stored stage.
+        firstStage= 0
+        for n in range(len(stages), 0, -1):
+            stagesKey= self.getStagesKey(stages[:n])
+            if stagesKey in self.storedStates:
+                modelSpace.restore(self.storedStates[stagesKey])
+                firstStage= n
+                break
+        # Remaining stages.
+        for n in range(firstStage, len(stages)):
+            result= solve_initial_state_stage(stages[n])
             if(result!= 0):
                 lmsg.error('Error when solving for: '+initialState+'(analOk='+str(result)+')')
                 quit()
-            pseudoTime= 100+len(self.storedStates)
-            modelSpace.save(pseudoTime)
-            self.storedStates[initStateKey]= pseudoTime
+            # Store the state if the initial states can branch from it
+            # (next stage with load factor) or it is the final one.
+            lastStage= (n==len(stages)-1)
+            if(lastStage or stages[n+1][1] is not None):
+                self.saveState(self.getStagesKey(stages[:n+1]))
+
+    def getNodalDisplacements(self):
+        ''' Return the displacements of the nodes of the model in a single
+            array.'''
+        if self.nodes is None:
+            self.nodes= [n for n in xcTotalSet.nodes]
+        return np.concatenate([list(n.getDisp) for n in self.nodes])
+
+    def setNodalDisplacements(self, disp):
+        ''' Put the displacements argument as trial displacements of the
+            nodes of the model and update the state of the elements.
+
+        :param disp: displacements (see getNodalDisplacements).
+        '''
+        offset= 0
+        for n in self.nodes:
+            numDOFs= n.getNumberDOF
+            n.setTrialDisp(xc.Vector(disp[offset:offset+numDOFs].tolist()))
+            offset+= numDOFs
+        modelSpace.preprocessor.getDomain.update()
+
+    def getLoadIncrement(self, stateKey, loadPatternName):
+        ''' Return the increment of the nodal displacements produced by
+            the load pattern argument (unit factor) from the initial state
+            argument. The increment is computed only the first time
+            (the tangent stiffness of the initial state is factorized once
+            for each load pattern instead of once for each combination).
+
+        :param stateKey: key of the initial state (see getStagesKey).
+        :param loadPatternName: name of the load pattern.
+        '''
+        increments= self.loadIncrements.setdefault(stateKey, dict())
+        if loadPatternName not in increments:
+            pseudoTime= self.storedStates[stateKey]
+            modelSpace.restore(pseudoTime)
+            lp= modelSpace.addLoadCaseToDomain(loadPatternName)
+            lp.gammaF= 1.0
+            analOk= solProc.solve()
+            if(analOk!=0):
+                lmsg.error('Can\'t solve for: '+loadPatternName)
+                quit()
+            increments[loadPatternName]= self.getNodalDisplacements()-self.initialDisplacements[stateKey]
+            modelSpace.removeLoadCaseFromDomain(loadPatternName)
+            modelSpace.restore(pseudoTime)
+        return increments[loadPatternName]
+
+    def getMaxResidual(self):
+        ''' Return the maximum unbalanced force in the free nodes of the
+            model (computed as the reactions in those nodes).'''
+        modelSpace.calculateNodalReactions(includeInertia= False, reactionCheckTolerance= 1e30)
+        fixedNodeTags= set([n.tag for n in fixedNodeSet.nodes])
+        retval= 0.0
+        for n in self.nodes:
+            if n.tag not in fixedNodeTags:
+                retval= max(retval, n.getReaction.Norm())
+        return retval
+
+    def solveLinearized(self, combName, combExpr):
+        ''' Solve for the comb expression argument superposing the
+            responses to the variable load patterns computed from its
+            initial state (see getLoadIncrement). If the unbalanced forces
+            of the superposed solution exceed the residual tolerance, the
+            combination is solved again with the nonlinear solution
+            procedure (and its name is appended to fullSolveCombinations).
 
-    def solve(self, combName, combExpr):
+        :param combName: load combination name.
+        :param combExpr: load combination expression.
+        '''
+        initialState, loadState= utils.split_combination(combExpr, self.initialStateLoads)
+        print(combName, 'initial state: ', initialState, ' load state:', loadState)
+        self.solveForInitialState(initialState) # initial state.
+        stateKey= self.getStagesKey(get_initial_state_stages(initialState))
+        if stateKey not in self.initialDisplacements:
+            self.initialDisplacements[stateKey]= self.getNodalDisplacements()
+        loadPatternDict= utils.get_combination_dict(loadState)
+        disp= self.initialDisplacements[stateKey].copy()
+        for key in loadPatternDict:
+            disp+= float(loadPatternDict[key])*self.getLoadIncrement(stateKey, key)
+        for key in loadPatternDict: # rest of the loads.
+            lp= modelSpace.addLoadCaseToDomain(key)
+            lp.gammaF= loadPatternDict[key]
+        self.setNodalDisplacements(disp)
+        residual= self.getMaxResidual()
+        if(residual>self.residualTolerance):
+            lmsg.warning(combName+'; unbalanced force: '+str(residual)+' greater than '+str(self.residualTolerance)+', solving with the nonlinear procedure.')
+            self.fullSolveCombinations.append(combName)
+            modelSpace.removeAllLoadPatternsFromDomain()
+            return self.solve(combName, combExpr, linearized= False)
+        modelSpace.preprocessor.getDomain.commit()
+        print(combName)
+        return 0
+
+    def solve(self, combName, combExpr, linearized= None):
         ''' Solve for the comb expression argument.
 
         :param combName: load combination name.
         :param combExpr: load combination expression.
+        :param linearized: if true, use solveLinearized (if None, use the
+                           value of the linearized attribute).
         '''
+        if linearized is None:
+            linearized= self.linearized
+        if(linearized):
+            return self.solveLinearized(combName, combExpr)
         initialState, loadState= utils.split_combination(combExpr, self.initialStateLoads)
         print(combName, 'initial state: ', initialState, ' load state:', loadState)
         self.solveForInitialState(initialState) # initial state.
@@ -486,15 +664,29 @@ class InitialStateStorage(object):
             print(combName)
         return analOk
         
-    def computeResponses(self, combContainer, limitState, displayFunction= None, setCalc= None):
+    def computeResponses(self, combContainer, limitState, displayFunction= None, setCalc= None, numProcesses= 1, columnarDir= None):
         ''' Compute response for the serviciability limit states in the 
             container.
 
         :param combContainer: object containing the load combinations to 
                               solve for.
+        :param numProcesses: if greater than one, solve the combinations
+                             with a pool of worker processes (see
+                             computeResponsesInParallel).
+        :param columnarDir: if not None, directory where the results are
+                            written in columnar format (see
+                            columnar_results module) as each combination
+                            is solved, instead of the output files of the
+                            limit state.
         '''
+        if(numProcesses is None or numProcesses>1):
+            return self.computeResponsesInParallel(combContainer, limitState, setCalc= setCalc, numProcesses= numProcesses, columnarDir= columnarDir)
+        columnarResults= None
         if(limitState):
-            limitState.createOutputFiles()
+            if columnarDir is None:
+                limitState.createOutputFiles()
+            else:
+                columnarResults= columnar_results.ColumnarLimitStateResults(columnarDir, limitState.label)
             internalForcesDict= dict()
             reactionsDict= dict()
             combinations= limitState.getCorrespondingLoadCombinations(combContainer)
@@ -509,17 +701,146 @@ class InitialStateStorage(object):
             # Write/display results.
             if(displayFunction):
                 displayFunction()
-            if(limitState):
+            if(columnarResults):
+                columnarResults.appendCombination(comb.name, limitState.getInternalForcesDict(comb.name, setCalc.elements), limitState.getReactionsDict(comb.name, fixedNodeSet.nodes), [(n.tag, list(n.getDisp)) for n in setCalc.nodes])
+            elif(limitState):
                 internalForcesDict.update(limitState.getInternalForcesDict(comb.name, setCalc.elements))
                 reactionsDict.update(limitState.getReactionsDict(comb.name, fixedNodeSet.nodes))
                 limitState.writeDisplacements(comb.name, setCalc.nodes)
                 
             modelSpace.removeAllLoadPatternsFromDomain()
-        if(limitState):
+        if(columnarResults):
+            columnarResults.close()
+        elif(limitState):
             limitState.writeInternalForces(internalForcesDict)
             limitState.writeReactions(reactionsDict)
         return result
 
+    def computeResponsesInParallel(self, combContainer, limitState, setCalc, numProcesses= None, columnarDir= None):
+        ''' Compute response for the limit state argument solving the
+            combinations with a pool of worker processes. The workers are
+            forked from this process, so each one has its own replica of
+            the model, its own solution procedure (created in the worker,
+            so the MUMPS solver of this process is not shared with the
+            forked processes) and its own initial state database (deleted
+            when the pool finishes). The
+            combinations are sorted by initial state and split in
+            contiguous chunks, so each worker computes as few initial
+            states as possible. The results are written in the order of
+            the combinations in the container (the output files are the
+            same as those of computeResponses).
+
+        :param combContainer: object containing the load combinations to 
+                              solve for.
+        :param limitState: limit state to compute the responses for.
+        :param setCalc: set of entities for which the results are computed.
+        :param numProcesses: number of worker processes (if None, the number
+                             of processors of the machine).
+        :param columnarDir: if not None, directory where the results are
+                            written in columnar format instead of the
+                            output files of the limit state.
+        '''
+        combinations= limitState.getCorrespondingLoadCombinations(combContainer)
+        combNames= list(combinations.keys())
+        # Group the combinations by initial state.
+        initialStateKeys= list()
+        for key in combNames:
+            initialStateKey= self.getInitialStateKey(combinations[key].expr)
+            if initialStateKey not in initialStateKeys:
+                initialStateKeys.append(initialStateKey)
+        sortedItems= sorted([(key, combinations[key].expr) for key in combNames], key= lambda item: initialStateKeys.index(self.getInitialStateKey(item[1])))
+        if numProcesses is None:
+            numProcesses= os.cpu_count()
+        numChunks= max(1, min(numProcesses, len(sortedItems)))
+        chunks= [sortedItems[i*len(sortedItems)//numChunks:(i+1)*len(sortedItems)//numChunks] for i in range(numChunks)]
+        _parallelContext.update({'limitState': limitState, 'setCalc': setCalc, 'dbFileName': os.path.splitext(self.dbFileName)[0], 'inMemory': self.inMemory, 'minFreeMemory': self.minFreeMemory, 'linearized': self.linearized, 'residualTolerance': self.residualTolerance})
+        mpContext= multiprocessing.get_context('fork')
+        with concurrent.futures.ProcessPoolExecutor(max_workers= numChunks, mp_context= mpContext) as executor:
+            chunkResults= list(executor.map(_solve_combination_chunk, chunks))
+        results= dict()
+        workerDbFileNames= set()
+        for dbFileName, chunkResult in chunkResults:
+            results.update(chunkResult)
+            workerDbFileNames.add(dbFileName)
+        # Remove the databases of the workers.
+        for dbFileName in workerDbFileNames:
+            if os.path.isfile(dbFileName):
+                os.remove(dbFileName)
+        # Write results in the order of the container.
+        if columnarDir is not None:
+            columnarResults= columnar_results.ColumnarLimitStateResults(columnarDir, limitState.label)
+            for key in combNames:
+                columnarResults.appendCombination(key, *results[key])
+            columnarResults.close()
+            _parallelContext.clear()
+            return 0
+        limitState.createOutputFiles()
+        internalForcesDict= dict()
+        reactionsDict= dict()
+        for key in combNames:
+            combInternalForces, combReactions, displacements= results[key]
+            internalForcesDict.update(combInternalForces)
+            reactionsDict.update(combReactions)
+            limitState.writeDisplacements(key, [NodeResults(tag, disp) for tag, disp in displacements])
+        limitState.writeInternalForces(internalForcesDict)
+        limitState.writeReactions(reactionsDict)
+        _parallelContext.clear()
+        return 0
+
+class NodeResults(object):
+    ''' Results of a node computed in a worker process. Exposes the
+        attributes of the nodes used by the limit state writers.
+
+    :ivar tag: node identifier.
+    :ivar getDisp: node displacement.
+    '''
+    def __init__(self, tag, disp):
+        ''' Constructor.
+
+        :param tag: node identifier.
+        :param disp: node displacement.
+        '''
+        self.tag= tag
+        self.getDisp= xc.Vector(disp)
+
+# Data shared with the worker processes of
+# InitialStateStorage.computeResponsesInParallel.
+_parallelContext= dict()
+
+def _solve_combination_chunk(combItems):
+    ''' Solve the combinations argument in a worker process and return
+        their results.
+
+    :param combItems: list of (combination name, combination expression)
+                      tuples.
+    :returns: name of the initial state database of the worker and
+              dictionary with the internal forces, reactions and
+              displacements of each combination.
+    '''
+    global solProc
+    if 'initStateStorage' not in _parallelContext:
+        # Each worker uses its own solution procedure (the worker is forked
+        # after the solution procedure of the parent process is created,
+        # so its MUMPS solver is not reused) and its own database.
+        solProc= new_solution_procedure(name= 'solProc_'+str(os.getpid()))
+        dbFileName= _parallelContext['dbFileName']+'_'+str(os.getpid())+'.db'
+        _parallelContext['initStateStorage']= InitialStateStorage(dbFileName= dbFileName, inMemory= _parallelContext['inMemory'], minFreeMemory= _parallelContext['minFreeMemory'], linearized= _parallelContext['linearized'], residualTolerance= _parallelContext['residualTolerance'])
+    initStateStorage= _parallelContext['initStateStorage']
+    limitState= _parallelContext['limitState']
+    setCalc= _parallelContext['setCalc']
+    retval= dict()
+    for combName, combExpr in combItems:
+        result= initStateStorage.solve(combName, combExpr)
+        if(result!= 0):
+            lmsg.error('Error when solving for: '+combName+'(analOk='+str(result)+')')
+            quit()
+        internalForces= limitState.getInternalForcesDict(combName, setCalc.elements)
+        reactions= limitState.getReactionsDict(combName, fixedNodeSet.nodes)
+        displacements= [(n.tag, list(n.getDisp)) for n in setCalc.nodes]
+        retval[combName]= (internalForces, reactions, displacements)
+        modelSpace.removeAllLoadPatternsFromDomain()
+    return initStateStorage.dbFileName, retval
+
 def solve(loadCaseName, computeInitialState= False):
     ''' Compute solution for the load case argument.
 